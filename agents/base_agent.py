@@ -1,7 +1,7 @@
 import os
 import sys
 import logging
-from typing import Optional, TypeVar, Type
+from typing import Callable, Iterator, Optional, TypeVar, Type
 from pydantic import BaseModel
 
 # Generic type for Pydantic models
@@ -11,7 +11,7 @@ T = TypeVar('T', bound=BaseModel)
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
-from utils.openai_api import OpenAIAPI
+from utils.llm_backend import LLMBackend, create_backend
 
 # Configure basic logging if not already configured by the main script
 # This is a failsafe; ideally, the main script configures logging.
@@ -19,28 +19,49 @@ if not logging.getLogger().hasHandlers():
     logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(name)s - %(funcName)s - %(message)s')
 
 class BaseAgent:
-    def __init__(self, model="gpt-4o"):
+    def __init__(self, model="gpt-4o", backend: Optional[LLMBackend] = None):
         self.model = model
         self.logger = logging.getLogger(__name__)
         self.logger.debug(f"Initializing BaseAgent with model: {self.model}")
         try:
-            self.openai_api = OpenAIAPI(model)
-            self.logger.debug("OpenAIAPI initialized successfully.")
+            # The backend is chosen by LLM_BACKEND unless one is passed in
+            # (e.g. a ReplayBackend shared by all agents of a profiling run).
+            self.openai_api = backend or create_backend(model)
+            self.logger.debug(f"{type(self.openai_api).__name__} initialized successfully.")
         except Exception as e:
-            self.logger.error(f"Failed to initialize OpenAIAPI: {e}", exc_info=True)
+            self.logger.error(f"Failed to initialize LLM backend: {e}", exc_info=True)
             raise
 
-    def get_response(self, system_content: str, user_content: str) -> Optional[str]:
+    def get_response(
+        self,
+        system_content: str,
+        user_content: str,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> Optional[str]:
         system_preview = system_content[:50] + "..." if system_content else "None"
         user_preview = user_content[:50] + "..." if user_content else "None"
         self.logger.debug(f"BaseAgent getting response. System: '{system_preview}', User: '{user_preview}'")
-        response = self.openai_api.get_completion(system_content, user_content)
+        if on_token is None:
+            response = self.openai_api.get_completion(system_content, user_content)
+        else:
+            # Stream the response, handing each chunk to on_token as it arrives.
+            chunks = []
+            for chunk in self.get_response_stream(system_content, user_content):
+                on_token(chunk)
+                chunks.append(chunk)
+            response = "".join(chunks) or None
         if response is None:
             self.logger.error("No response received from OpenAI API.")
             return None
         self.logger.debug(f"BaseAgent received response: '{str(response)[:100]}...'")
         return response
 
+    def get_response_stream(self, system_content: str, user_content: str) -> Iterator[str]:
+        system_preview = system_content[:50] + "..." if system_content else "None"
+        user_preview = user_content[:50] + "..." if user_content else "None"
+        self.logger.debug(f"BaseAgent streaming response. System: '{system_preview}', User: '{user_preview}'")
+        return self.openai_api.get_completion_stream(system_content, user_content)
+
     def get_json_response(
         self,
         base_model: Type[T],
@@ -50,7 +71,34 @@ class BaseAgent:
         system_preview = system_content[:50] + "..." if system_content else "None"
         user_preview = user_content[:50] + "..." if user_content else "None"
         self.logger.debug(f"BaseAgent getting JSON response. Schema: {base_model.__name__}, System: '{system_preview}', User: '{user_preview}'")
-        json_response = self.openai_api.get_structured_output(base_model, system_content, user_content)
+        json_response = self.openai_api.get_structured_output(base_model, user_content, system_content)
+        if json_response is None:
+            self.logger.error("No JSON response received from OpenAI API.")
+            return None
+        self.logger.debug(f"BaseAgent received JSON response: {json_response}")
+        return json_response
+
+    async def get_response_async(self, system_content: str, user_content: str) -> Optional[str]:
+        system_preview = system_content[:50] + "..." if system_content else "None"
+        user_preview = user_content[:50] + "..." if user_content else "None"
+        self.logger.debug(f"BaseAgent getting async response. System: '{system_preview}', User: '{user_preview}'")
+        response = await self.openai_api.get_completion_async(system_content, user_content)
+        if response is None:
+            self.logger.error("No response received from OpenAI API.")
+            return None
+        self.logger.debug(f"BaseAgent received response: '{str(response)[:100]}...'")
+        return response
+
+    async def get_json_response_async(
+        self,
+        base_model: Type[T],
+        system_content: str,
+        user_content: str,
+    ) -> Optional[Type[T]]:
+        system_preview = system_content[:50] + "..." if system_content else "None"
+        user_preview = user_content[:50] + "..." if user_content else "None"
+        self.logger.debug(f"BaseAgent getting async JSON response. Schema: {base_model.__name__}, System: '{system_preview}', User: '{user_preview}'")
+        json_response = await self.openai_api.get_structured_output_async(base_model, user_content, system_content)
         if json_response is None:
             self.logger.error("No JSON response received from OpenAI API.")
             return None
@@ -73,6 +121,13 @@ if __name__ == "__main__":
         print(response)
         print()
 
+        # Test get_response_stream method
+        print("BaseAgent get_response_stream Test:")
+        for chunk in agent.get_response_stream(system_content, "Name three cities in France."):
+            print(chunk, end="", flush=True)
+        print()
+        print()
+
         # Test get_json_response method
         from pydantic import BaseModel, Field
 
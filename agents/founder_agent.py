@@ -1,9 +1,7 @@
 import os
 import sys
 import numpy as np
-from typing import Union
-from sklearn.metrics.pairwise import cosine_similarity
-from tensorflow.keras.models import load_model
+from typing import Optional, Sequence, Union
 
 # Add the project root directory to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -12,30 +10,48 @@ sys.path.insert(0, project_root)
 from shared.types import StartupInfoDict
 
 from agents.base_agent import BaseAgent
+from utils.llm_backend import LLMBackend
+from utils.openai_batch import run_concurrently
+from utils.idea_fit_model import check_embedding_settings, get_default_idea_fit_model
 from schemas.founder_schema import FounderAnalysis, AdvancedFounderAnalysis, FounderSegmentation
 from prompts.founder_prompt import ANALYSIS_PROMPT, SEGMENTATION_PROMPT
 
 class FounderAgent(BaseAgent):
-    def __init__(self, model="gpt-4o"):
-        super().__init__(model)
+    def __init__(self, model="gpt-4o", backend: Optional[LLMBackend] = None):
+        super().__init__(model, backend)
         try:
-            self.neural_network = load_model(os.path.join(project_root, 'models', 'neural_network.keras'))
+            self.neural_network = get_default_idea_fit_model()
         except Exception as e:
             print(f"Warning: Could not load neural network model: {e}")
             print("The founder agent will continue without neural network support.")
             self.neural_network = None
+        if self.neural_network is not None:
+            check_embedding_settings(self.neural_network, self.openai_api.embedding_model, self.openai_api.embedding_dimensions)
 
     def analyze(
         self,
         startup_info: StartupInfoDict, 
         mode: str,
     ) -> Union[FounderAnalysis, AdvancedFounderAnalysis]:
+        """
+        Analyze the founding team. The advanced mode is the full founder
+        pipeline: the analysis together with segmentation, cosine similarity
+        and idea fit, so callers need no separate segment_founder or
+        calculate_idea_fit calls. Its three parts run concurrently; the
+        neural network step waits only for the embeddings it needs.
+        """
         founder_info = self._get_founder_info(startup_info)
         
         if mode == "advanced":
-            basic_analysis = self.get_json_response(FounderAnalysis, ANALYSIS_PROMPT, founder_info)
-            segmentation = self.segment_founder(founder_info)
-            idea_fit, cosine_similarity = self.calculate_idea_fit(startup_info, founder_info)
+            # The analysis, the segmentation and the embeddings behind idea fit
+            # are independent, so they run side by side.
+            basic_analysis, segmentation, (idea_fit, cosine_similarity) = run_concurrently([
+                lambda: self.analyze(startup_info, "basic"),
+                lambda: self.segment_founder(founder_info),
+                lambda: self.calculate_idea_fit(startup_info, founder_info),
+            ])
+            if basic_analysis is None:
+                raise RuntimeError("Could not get the founder analysis")
             
             return AdvancedFounderAnalysis(
                 **basic_analysis.model_dump(),
@@ -53,35 +69,77 @@ class FounderAgent(BaseAgent):
                f"Vision and Alignment: {startup_info.get('vision_alignment', '')}"
 
     def segment_founder(self, founder_info: str) -> FounderSegmentation:
-        return self.get_json_response(FounderSegmentation, SEGMENTATION_PROMPT, founder_info).segmentation
+        segmentation = self.get_json_response(FounderSegmentation, SEGMENTATION_PROMPT, founder_info)
+        if segmentation is None:
+            raise RuntimeError("Could not get the founder segmentation")
+        return segmentation.segmentation
 
     def calculate_idea_fit(
         self,
         startup_info: StartupInfoDict,
         founder_info: str
     ) -> tuple[float, float]:
-        founder_embedding = self.openai_api.get_embeddings(founder_info)
-        startup_embedding = self.openai_api.get_embeddings(startup_info['description'])
-        cosine_sim = self._calculate_cosine_similarity(founder_embedding, startup_embedding)
-        
+        embeddings = self.openai_api.get_embeddings_batch([founder_info, startup_info['description']])
+        if embeddings is None:
+            raise RuntimeError("Could not get embeddings for the idea-fit pairs")
+        founder_embedding, startup_embedding = embeddings
+        idea_fit, cosine_sim = self._score_idea_fit(
+            np.asarray(founder_embedding).reshape(1, -1),
+            np.asarray(startup_embedding).reshape(1, -1),
+        )
+        return float(idea_fit[0]), float(cosine_sim[0])
+
+    def calculate_idea_fit_batch(
+        self,
+        pairs: Sequence[tuple[StartupInfoDict, str]]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score many (startup_info, founder_info) pairs at once. All texts are
+        embedded in bulk and the network runs once over the whole batch.
+        Returns the idea fit and cosine similarity arrays in input order.
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+        texts = [founder_info for _, founder_info in pairs] + [startup_info['description'] for startup_info, _ in pairs]
+        embeddings = self.openai_api.get_embeddings_batch(texts)
+        if embeddings is None:
+            raise RuntimeError("Could not get embeddings for the idea-fit pairs")
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        return self._score_idea_fit(embeddings[:len(pairs)], embeddings[len(pairs):])
+
+    def _score_idea_fit(
+        self,
+        founder_embeddings: np.ndarray,
+        startup_embeddings: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Row-wise cosine similarity of the embeddings and the network's idea
+        fit for each row.
+        """
+        cosine_sim = self._row_cosine_similarity(founder_embeddings, startup_embeddings)
+
         # Prepare input for neural network
-        X_new_embeddings = np.array(founder_embedding).reshape(1, -1)
-        X_new_embeddings_2 = np.array(startup_embedding).reshape(1, -1)
-        X_new_cosine = np.array([[cosine_sim]])
-        X_new = np.concatenate([X_new_embeddings, X_new_embeddings_2, X_new_cosine], axis=1)
+        X_new = np.concatenate([founder_embeddings, startup_embeddings, cosine_sim.reshape(-1, 1)], axis=1)
 
         # Predict using the neural network
         if self.neural_network is not None:
-            idea_fit = self.neural_network.predict(X_new)[0][0]
+            idea_fit = np.asarray(self.neural_network.predict(X_new), dtype=np.float32).reshape(-1)
         else:
             # Fallback: use cosine similarity as a simple approximation
             idea_fit = cosine_sim
-        return float(idea_fit), cosine_sim
-
-    def _calculate_cosine_similarity(self, vec1: list[float], vec2: list[float]) -> float:
-        vec1 = np.array(vec1).reshape(1, -1)
-        vec2 = np.array(vec2).reshape(1, -1)
-        return cosine_similarity(vec1, vec2)[0][0]
+        return idea_fit, cosine_sim
+
+    @staticmethod
+    def _row_cosine_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        # Zero vectors get a similarity of 0, as in sklearn
+        a = np.asarray(a, dtype=np.float32)
+        b = np.asarray(b, dtype=np.float32)
+        a_norms = np.linalg.norm(a, axis=1, keepdims=True)
+        b_norms = np.linalg.norm(b, axis=1, keepdims=True)
+        a = np.divide(a, a_norms, out=np.zeros_like(a), where=a_norms > 0)
+        b = np.divide(b, b_norms, out=np.zeros_like(b), where=b_norms > 0)
+        return np.einsum("ij,ij->i", a, b)
 
 
 if __name__ == "__main__":
@@ -1,18 +1,26 @@
 import os
 import sys
 import logging
+from typing import Optional
 
 # Add the project root directory to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
 from agents.base_agent import BaseAgent
+from utils.llm_backend import LLMBackend
 from schemas.integration_schema import IntegratedAnalysis, QuantitativeDecision
-from prompts.integration_prompt import BASIC_INTEGRATION_PROMPT, PRO_INTEGRATION_PROMPT, QUANT_DECISION_PROMPT
+from prompts.integration_prompt import (
+    BASIC_INTEGRATION_PROMPT,
+    BASIC_INTEGRATION_INPUT,
+    PRO_INTEGRATION_PROMPT,
+    PRO_INTEGRATION_INPUT,
+    QUANT_DECISION_PROMPT,
+)
 
 class IntegrationAgent(BaseAgent):
-    def __init__(self, model="gpt-4o"):
-        super().__init__(model)
+    def __init__(self, model="gpt-4o", backend: Optional[LLMBackend] = None):
+        super().__init__(model, backend)
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
         handler = logging.StreamHandler()
@@ -28,13 +36,13 @@ class IntegrationAgent(BaseAgent):
     ):
         self.logger.info("Starting basic integrated analysis")
         
-        user_prompt = BASIC_INTEGRATION_PROMPT.format(
+        user_prompt = BASIC_INTEGRATION_INPUT.format(
             market_info=market_info,
             product_info=product_info,
             founder_info=founder_info
         )
         
-        integrated_analysis = self.get_json_response(IntegratedAnalysis, user_prompt, "Be professional.")
+        integrated_analysis = self.get_json_response(IntegratedAnalysis, BASIC_INTEGRATION_PROMPT, user_prompt)
         self.logger.info("Basic integrated analysis completed")
         
         return integrated_analysis
@@ -50,7 +58,7 @@ class IntegrationAgent(BaseAgent):
     ):
         self.logger.info("Starting pro integrated analysis")
         
-        user_prompt = PRO_INTEGRATION_PROMPT.format(
+        user_prompt = PRO_INTEGRATION_INPUT.format(
             market_info=market_info,
             product_info=product_info,
             founder_info=founder_info,
@@ -59,7 +67,7 @@ class IntegrationAgent(BaseAgent):
             rf_prediction=rf_prediction
         )
         
-        integrated_analysis = self.get_json_response(IntegratedAnalysis, user_prompt, "Be professional.")
+        integrated_analysis = self.get_json_response(IntegratedAnalysis, PRO_INTEGRATION_PROMPT, user_prompt)
         self.logger.info("Pro integrated analysis completed")
         
         return integrated_analysis
@@ -1,13 +1,16 @@
 import os
 import sys
 import logging
+from typing import Callable, Optional
 
 # Add the project root directory to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
 from agents.base_agent import BaseAgent
+from utils.llm_backend import LLMBackend
 from utils.google_search_api import GoogleSearchAPI
+from utils.search_evidence import SearchResult, assemble_evidence, to_search_results
 from schemas.market_schema import MarketAnalysis
 from prompts.market_prompt import (
     ANALYSIS_PROMPT,
@@ -17,9 +20,48 @@ from prompts.market_prompt import (
 )
 from shared.types import StartupInfoDict
 
+# One search result in the evidence given to the synthesis prompts
+MARKET_EVIDENCE_TEMPLATE = "Source: {source} ({date})\nTitle: {title}\nFinding: {snippet}\n\n"
+
+
+class MarketResearch:
+    """
+    Market research for one analysis, computed on first use and then shared.
+
+    The keywords, the search results and the structured market report are
+    each produced once, however many synthesis steps read them.
+    """
+
+    def __init__(self, agent: "MarketAgent", startup_info: StartupInfoDict):
+        self.agent = agent
+        self.startup_info = startup_info
+        self._keywords: Optional[str] = None
+        self._search_results: Optional[list[SearchResult]] = None
+        self._report: Optional[str] = None
+
+    @property
+    def keywords(self) -> str:
+        if self._keywords is None:
+            self._keywords = self.agent._generate_keywords(self.startup_info)
+            self.agent.logger.info(f"Search keywords generated: {self._keywords}")
+        return self._keywords
+
+    @property
+    def search_results(self) -> list[SearchResult]:
+        if self._search_results is None:
+            self._search_results = self.agent._search(self.keywords)
+        return self._search_results
+
+    @property
+    def report(self) -> str:
+        if self._report is None:
+            self._report = self.agent._write_market_report(self.search_results)
+        return self._report
+
+
 class MarketAgent(BaseAgent):
-    def __init__(self, model="gpt-4o"):
-        super().__init__(model)
+    def __init__(self, model="gpt-4o", backend: Optional[LLMBackend] = None):
+        super().__init__(model, backend)
         self.search_api = GoogleSearchAPI()
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
@@ -31,15 +73,15 @@ class MarketAgent(BaseAgent):
     def analyze(
         self,
         startup_info: StartupInfoDict,
-        mode: str
+        mode: str,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> MarketAnalysis:
         self.logger.info(f"Starting market analysis in {mode} mode")
         market_info = self._get_market_info(startup_info)
         self.logger.debug(f"Market info: {market_info}")
         
-        analysis = self.get_json_response(MarketAnalysis, ANALYSIS_PROMPT, market_info)
-        self.logger.info("Basic analysis completed")
-        
+        # The advanced modes answer from the research chain alone, so it
+        # starts right away instead of after a basic analysis.
         if mode == "advanced":
             self.logger.info("Starting advanced analysis")
             external_knowledge = self._get_external_knowledge(startup_info)
@@ -51,41 +93,29 @@ class MarketAgent(BaseAgent):
         if mode == "natural_language_advanced":
             self.logger.info("Starting advanced analysis")
 
-            # Generate and log keywords
-            keywords = self._generate_keywords(startup_info)
-            print("\nSearch Keywords Generated:")
-            print("-" * 40)
-            print(keywords)
-            
-            # Log raw search results before synthesis
-            print("\nRaw Search Results:")
-            print("-" * 40)
-            search_results = self.search_api.search(keywords)  # Raw search results
-            print(search_results)
-            
-            # Log synthesized knowledge
-            print("\nSynthesized External Knowledge:")
-            print("-" * 40)
-            synthesized_knowledge = self._synthesize_knowledge(search_results)
-            print(synthesized_knowledge)
+            # Both knowledge blocks come from the same keywords and search results
+            research = MarketResearch(self, startup_info)
+            external_knowledge = self._get_external_knowledge(startup_info, research)
+
+            synthesized_knowledge = self._synthesize_knowledge(research.search_results)
+            self.logger.debug(f"Synthesized external knowledge: {synthesized_knowledge}")
 
-            # Get external knowledge
-            external_knowledge = self._get_external_knowledge(startup_info)
-            
             prompt = NATURAL_LANGUAGE_ANALYSIS_PROMPT.format(
                 startup_info=startup_info,
                 market_info=market_info,
-                keywords=keywords,
+                keywords=research.keywords,
                 external_knowledge="Knowledge 1: " + external_knowledge + "\n" + "Knowledge 2: " + synthesized_knowledge
             )
             
-            nl_advanced_analysis = self.get_response(prompt, "Formulate a professional and comprehensive analysis please.")
+            nl_advanced_analysis = self.get_response(prompt, "Formulate a professional and comprehensive analysis please.", on_token=on_token)
             self.logger.info("Natural language analysis completed")
             return {
                 'analysis': nl_advanced_analysis,
                 'external_report': external_knowledge
             }
         
+        analysis = self.get_json_response(MarketAnalysis, ANALYSIS_PROMPT, market_info)
+        self.logger.info("Basic analysis completed")
         return analysis
 
     def _get_market_info(self, startup_info: StartupInfoDict) -> str:
@@ -94,49 +124,17 @@ class MarketAgent(BaseAgent):
                f"Market Growth Rate: {startup_info.get('growth_rate', '')}\n" \
                f"Market Trends: {startup_info.get('market_trends', '')}"
 
-    def _get_external_knowledge(self, startup_info: StartupInfoDict) -> str:
+    def _get_external_knowledge(self, startup_info: StartupInfoDict, research: Optional[MarketResearch] = None) -> str:
         """Get structured market report from external sources"""
         self.logger.info("Starting external knowledge gathering")
-        
-        # Log keyword generation
-        keywords = self._generate_keywords(startup_info)
-        self.logger.info(f"Generated keywords: {keywords}")
-        
-        # Log search API call
-        search_results = self.search_api.search(keywords)
-        self.logger.info("Raw search results received")
-        
-        # Log organic results details  
-        print("\nORGANIC RESULTS:")
-        print("-" * 40)
-        if isinstance(search_results, list):  # Direct list of results
-            organic_results = search_results[:20]
-            print(f"Number of organic results: {len(organic_results)}")
-            for i, result in enumerate(organic_results):
-                print(f"\nResult {i+1}:")
-                print(f"Source: {result.get('source', 'No source')}")
-                print(f"Title: {result.get('title', 'No title')}")
-                print(f"Date: {result.get('date', 'No date')}")
-                print(f"Snippet: {result.get('snippet', 'No snippet')}")
-        
-        # Compile structured knowledge
-        overall_knowledge = "Market Research Summary:\n\n"
-        if isinstance(search_results, list):
-            for result in search_results[:20]:
-                source = result.get('source', '')
-                date = result.get('date', '')
-                title = result.get('title', '')
-                snippet = result.get('snippet', '')
-                
-                # Only add entries that have actual content
-                if snippet:
-                    overall_knowledge += f"Source: {source} ({date})\n"
-                    overall_knowledge += f"Title: {title}\n"
-                    overall_knowledge += f"Finding: {snippet}\n\n"
-        
-        print("\nSTRUCTURED KNOWLEDGE:")
-        print("-" * 40)
-        print(overall_knowledge)
+        research = research or MarketResearch(self, startup_info)
+        return research.report
+
+    def _write_market_report(self, search_results: list[SearchResult]) -> str:
+        """Synthesize the search results into a structured market report"""
+        # Compile structured knowledge within the evidence token budget
+        overall_knowledge = "Market Research Summary:\n\n" + assemble_evidence(search_results, MARKET_EVIDENCE_TEMPLATE)
+        self.logger.debug(f"Structured knowledge: {overall_knowledge}")
         
         synthesis_prompt = """As a market research analyst, synthesize the following market data into a structured report.
         Focus on:
@@ -149,9 +147,7 @@ class MarketAgent(BaseAgent):
         Format your response as a clear, data-driven market report."""
         
         market_report = self.get_response(synthesis_prompt, overall_knowledge)
-        print("\nFINAL MARKET REPORT:")
-        print("-" * 40)
-        print(market_report)
+        self.logger.debug(f"Final market report: {market_report}")
         
         return market_report
 
@@ -163,8 +159,15 @@ class MarketAgent(BaseAgent):
         main_keyword = self.get_response(keyword_prompt, startup_info['description'])
         return f"{main_keyword}, Growth, Trend, Size, Revenue"
 
-    def _synthesize_knowledge(self, search_results):
-        synthesis_prompt = f"Synthesize the following search results into a concise market overview:\n\n{search_results}"
+    def _search(self, keywords: str) -> list[SearchResult]:
+        """Search the keywords and normalise the organic results"""
+        search_results = to_search_results(self.search_api.search(keywords))
+        self.logger.info(f"{len(search_results)} search results received")
+        return search_results
+
+    def _synthesize_knowledge(self, search_results: list[SearchResult]) -> str:
+        evidence = assemble_evidence(search_results, MARKET_EVIDENCE_TEMPLATE)
+        synthesis_prompt = f"Synthesize the following search results into a concise market overview:\n\n{evidence}"
         return self.get_response(SYNTHESIS_PROMPT, synthesis_prompt)
 
 
@@ -228,8 +231,9 @@ if __name__ == "__main__":
         # Log raw search results before synthesis
         print("\nRaw Search Results:")
         print("-" * 40)
-        search_results = agent.search_api.search(keywords)  # Raw search results
-        print(search_results)
+        search_results = agent._search(keywords)
+        for result in search_results:
+            print(result)
         
         # Log synthesized knowledge
         print("\nSynthesized External Knowledge:")
@@ -1,13 +1,18 @@
 import os
 import sys
+import re
 import logging
+from typing import Callable, Optional
 
 # Add the project root directory to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
 from agents.base_agent import BaseAgent
-from utils.google_search_api import GoogleSearchAPI
+from utils.llm_backend import LLMBackend
+from utils.google_search_api import GoogleSearchAPI, merge_results
+from utils.openai_batch import run_concurrently
+from utils.search_evidence import assemble_evidence, to_search_results
 from schemas.product_schema import ProductAnalysis
 from prompts.product_prompt import (
     ANALYSIS_PROMPT,
@@ -17,9 +22,12 @@ from prompts.product_prompt import (
 )
 from shared.types import StartupInfoDict
 
+# One search result in the evidence given to the synthesis prompt
+PRODUCT_EVIDENCE_TEMPLATE = "\nSource: {source}\nTitle: {title}\nSummary: {snippet}{related}\n"
+
 class ProductAgent(BaseAgent):
-    def __init__(self, model="gpt-4o"):
-        super().__init__(model)
+    def __init__(self, model="gpt-4o", backend: Optional[LLMBackend] = None):
+        super().__init__(model, backend)
         self.search_api = GoogleSearchAPI()
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
@@ -36,7 +44,12 @@ class ProductAgent(BaseAgent):
         self.external_knowledge_logger.addHandler(console_handler)
         self.external_knowledge_logger.setLevel(logging.INFO)
 
-    def analyze(self, startup_info: StartupInfoDict, mode: str) -> ProductAnalysis:
+    def analyze(
+        self,
+        startup_info: StartupInfoDict,
+        mode: str,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> ProductAnalysis:
         self.logger.info(f"Starting product analysis in {mode} mode")
         product_info = self._get_product_info(startup_info)
         
@@ -45,7 +58,7 @@ class ProductAgent(BaseAgent):
             keywords = self._generate_keywords(startup_info)
             
             # Get the structured product report
-            product_report = self._get_external_knowledge(startup_info)
+            product_report = self._get_external_knowledge(startup_info, keywords)
             self.logger.debug(f"Product report: {product_report}")
             
             prompt = NATURAL_LANGUAGE_ANALYSIS_PROMPT.format(
@@ -55,7 +68,7 @@ class ProductAgent(BaseAgent):
                 external_knowledge=product_report
             )
             
-            nl_advanced_analysis = self.get_response(prompt, "Write a comprehensive report about the product analysis from the VC perspective.")
+            nl_advanced_analysis = self.get_response(prompt, "Write a comprehensive report about the product analysis from the VC perspective.", on_token=on_token)
             self.logger.info("Natural language analysis completed")
             return {
                 'analysis': nl_advanced_analysis,
@@ -88,86 +101,36 @@ class ProductAgent(BaseAgent):
         return analysis
     
 
-    def _get_external_knowledge(self, startup_info: StartupInfoDict) -> str:
+    def _get_external_knowledge(self, startup_info: StartupInfoDict, keywords: Optional[str] = None) -> str:
         """Get structured product research from external sources"""
         self.logger.info("Starting external knowledge gathering")
         
-        # Generate keyword (simpler approach matching the pipeline)
-        keywords = startup_info.get('name', '')
-        keywords += " News"
-        self.logger.info(f"Generated keywords: {keywords}")
-        
-        # Get search results
-        search_results = self.search_api.search(keywords)[:20]
-        self.logger.info("Raw search results received")
-        print("\nRAW SEARCH RESULTS:")
-        print("-" * 40)
-        print(search_results)
-        
-        # Process organic results
-        organic_knowledge = ""
-        if isinstance(search_results, list):  # Direct list of results
-            organic_results = search_results[:10]
-            for result in organic_results:
-                # Extract the most valuable fields
-                title = result.get('title', '')
-                snippet = result.get('snippet', '')
-                source = result.get('source', '')
-                
-                # Include sitelinks if they exist (they often contain valuable additional info)
-                sitelinks = result.get('sitelinks', {}).get('expanded', [])
-                sitelinks_info = ""
-                if sitelinks:
-                    sitelinks_info = "\nRelated pages:\n" + "\n".join(
-                        [f"- {link['title']}: {link['snippet']}" 
-                         for link in sitelinks if 'snippet' in link][:3]
-                    )
-                
-                organic_knowledge += f"\nSource: {source}\nTitle: {title}\nSummary: {snippet}{sitelinks_info}\n"
-            
-            print("\nPROCESSED ORGANIC RESULTS:")
-            print("-" * 40)
-            print(organic_knowledge)
-        
-        # Process related questions (only if search_results is a dict)
-        brainstorm_results = ""
-        if isinstance(search_results, dict):
-            related_QAs = search_results.get("related_questions", [])
-            if related_QAs:
-                for qa in related_QAs:
-                    title = qa.get('title', "")
-                    question = qa.get('question', "")
-                    snippet = qa.get('snippet', "")
-                    date = qa.get('date', "")
-                    brainstorm_results += f"Title: {title} + Question: {question} + Snippet: {snippet} + Date: {date}\n"
-                print("\nPROCESSED RELATED QUESTIONS:")
-                print("-" * 40)
-                print(brainstorm_results)
-        
-        # Process related news (only if search_results is a dict)
-        related_news = " "
-        if isinstance(search_results, dict):
-            top_stories = search_results.get("top_stories", [])
-            if top_stories:
-                for story in top_stories:
-                    title = story.get('title', "")
-                    source = story.get('source', "")
-                    date = story.get('date', "")
-                    related_news += f"Title: {title} + Source: {source} + Date:{date} + \n"
-                print("\nPROCESSED RELATED NEWS:")
-                print("-" * 40)
-                print(related_news)
-        
-        # Compile overall knowledge
+        # Search the company news and every generated keyword concurrently
+        news_query = startup_info.get('name', '') + " News"
+        if keywords is None:
+            # The news search does not need the keywords, so it runs while they are generated
+            news_results, keywords = run_concurrently([
+                lambda: self.search_api.search_many([news_query]),
+                lambda: self._generate_keywords(startup_info),
+            ])
+            keyword_queries = self._parse_keywords(keywords)
+            result_lists = news_results + self.search_api.search_many(keyword_queries)
+        else:
+            keyword_queries = self._parse_keywords(keywords)
+            result_lists = self.search_api.search_many([news_query] + keyword_queries)
+        queries = [news_query] + keyword_queries
+        self.logger.info(f"Search queries: {queries}")
+        
+        # Get search results, deduplicated by URL
+        search_results = to_search_results(merge_results(result_lists, limit=20))
+        self.logger.info(f"{len(search_results)} unique search results received for {len(queries)} queries")
+        
+        # Compile overall knowledge within the evidence token budget
         overall_knowledge = (
-            "Here are the web search information about the company:\n" + organic_knowledge +
-            "\nHere are the contexts:\n" + brainstorm_results +
-            "\nHere are the related news:\n" + related_news
+            "Here are the web search information about the company:\n" +
+            assemble_evidence(search_results, PRODUCT_EVIDENCE_TEMPLATE)
         )
-        
-        print("\nSTRUCTURED KNOWLEDGE:")
-        print("-" * 40)
-        print(overall_knowledge)
+        self.logger.debug(f"Structured knowledge: {overall_knowledge}")
         
         synthesis_prompt = ("You will assist me in summarising the latest information and news about the company. "
                            "After google search, you are given important context information and data (most of the time). "
@@ -176,9 +139,7 @@ class ProductAgent(BaseAgent):
                            "Make your response structured and in detail.")
         
         product_report = self.get_response(synthesis_prompt, overall_knowledge)
-        print("\nFINAL PRODUCT REPORT:")
-        print("-" * 40)
-        print(product_report)
+        self.logger.debug(f"Final product report: {product_report}")
         
         return product_report
 
@@ -215,6 +176,20 @@ class ProductAgent(BaseAgent):
         keywords = self.get_response(KEYWORD_GENERATION_PROMPT, prompt)
         return keywords
 
+    @staticmethod
+    def _parse_keywords(keywords: Optional[str], limit: int = 5) -> list[str]:
+        """Split the generated keyword text (a bulleted, numbered or comma-separated list) into queries"""
+        if not keywords:
+            return []
+        lines = [line for line in keywords.splitlines() if line.strip()]
+        items = lines if len(lines) > 1 else re.split(r"[,、]", keywords)
+        parsed = []
+        for item in items:
+            item = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", item).strip().strip("\"'“”「」").strip()
+            if item and item.lower() not in (p.lower() for p in parsed):
+                parsed.append(item)
+        return parsed[:limit]
+
     def _get_product_info(self, startup_info: StartupInfoDict) -> str:
         return f"Product Description: {startup_info.get('product_details', '')}\n" \
                f"Key Features: {startup_info.get('product_details', '')}\n" \
@@ -1,6 +1,7 @@
 import os
 import sys
 import logging
+from typing import Optional
 import joblib
 import pandas as pd
 
@@ -9,6 +10,7 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
 from agents.base_agent import BaseAgent
+from utils.llm_backend import LLMBackend
 from schemas.vc_scout_schema import StartupInfo, StartupCategorization, StartupEvaluation
 from prompts.vc_scout_prompt import (
     PARSE_RECORD_PROMPT,
@@ -18,8 +20,8 @@ from prompts.vc_scout_prompt import (
 )
 
 class VCScoutAgent(BaseAgent):
-    def __init__(self, model="gpt-4o"):
-        super().__init__(model)
+    def __init__(self, model="gpt-4o", backend: Optional[LLMBackend] = None):
+        super().__init__(model, backend)
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
         handler = logging.StreamHandler()
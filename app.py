@@ -73,19 +73,18 @@ def analyze_startup_with_updates(
             st.write("Founder Analysis Complete")
             result['Founder Info'] = founder_analysis.dict()
 
-            update_status("Advanced founder analysis", 0.6)
-            founder_segmentation = framework.founder_agent.segment_founder(startup_info.founder_backgrounds)
-            founder_idea_fit = framework.founder_agent.calculate_idea_fit(startup_info.dict(), startup_info.founder_backgrounds)
-            st.write("Advanced Founder Analysis Complete")
+            # The advanced founder analysis already carries segmentation and idea fit
+            founder_segmentation = founder_analysis.segmentation
+            founder_idea_fit = founder_analysis.idea_fit
             result['Founder Segmentation'] = founder_segmentation
-            result['Founder Idea Fit'] = founder_idea_fit[0]
+            result['Founder Idea Fit'] = founder_idea_fit
 
             update_status("Integration", 0.8)
             integrated_analysis = framework.integration_agent.integrated_analysis_pro(
                 str(market_analysis.dict()),
                 str(product_analysis.dict()),
                 str(founder_analysis.dict()),
-                founder_idea_fit[0],
+                founder_idea_fit,
                 founder_segmentation,
                 prediction
             )
@@ -95,7 +94,7 @@ def analyze_startup_with_updates(
             update_status("Quantitative decision", 0.9)
             quant_decision = framework.integration_agent.getquantDecision(
                 prediction,
-                founder_idea_fit[0],
+                founder_idea_fit,
                 founder_segmentation
             )
             st.write("Quantitative Decision Complete")
@@ -11,6 +11,7 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
 from graph import SSFFGraph
+from shared.types import AnalysisMode
 
 
 @dataclass
@@ -24,6 +25,7 @@ class UIComponents:
     status_text: Any
     progress_placeholder: Any
     node_outputs_placeholder: Any
+    live_reports_placeholder: Any
 
 
 @dataclass
@@ -35,6 +37,7 @@ class AnalysisState:
     node_outputs: Dict[str, Dict[str, Any]]
     completed_node_list: List[str]
     start_time: float
+    live_reports: Dict[str, str]
 
 
 class MessageFormatter:
@@ -173,6 +176,23 @@ class NodeOutputRenderer:
             st.write(f"**Industry:** {cat.get('industry', 'N/A')}")
 
 
+class LiveReportRenderer:
+    """Handles rendering of reports while their tokens are streamed."""
+    
+    def __init__(self, ui_components: UIComponents):
+        self.ui = ui_components
+        self.placeholders: Dict[str, Any] = {}
+    
+    def append_token(self, node: str, token: str, live_reports: Dict[str, str]) -> None:
+        """Append a streamed token to a node's report and redraw it."""
+        live_reports[node] = live_reports.get(node, "") + token
+        if node not in self.placeholders:
+            with self.ui.live_reports_placeholder:
+                st.write(f"**{node.upper()} Report (generating...)**")
+                self.placeholders[node] = st.empty()
+        self.placeholders[node].markdown(live_reports[node])
+
+
 class ErrorHandler:
     """Handles error display and messaging."""
     
@@ -259,6 +279,9 @@ class FinalResultsRenderer:
         with tab:
             if final_state.get("market_analysis"):
                 market = final_state["market_analysis"]
+                if "analysis" in market:
+                    FinalResultsRenderer._render_natural_language_report(market)
+                    return
                 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -277,6 +300,9 @@ class FinalResultsRenderer:
         with tab:
             if final_state.get("product_analysis"):
                 product = final_state["product_analysis"]
+                if "analysis" in product:
+                    FinalResultsRenderer._render_natural_language_report(product)
+                    return
                 
                 col1, col2, col3 = st.columns(3)
                 with col1:
@@ -295,6 +321,14 @@ class FinalResultsRenderer:
                 st.write("**USP Assessment:**")
                 st.write(product.get('usp_assessment', 'N/A'))
     
+    @staticmethod
+    def _render_natural_language_report(report: Dict[str, Any]) -> None:
+        """Render a natural-language analysis report."""
+        st.markdown(report.get('analysis') or 'N/A')
+        if report.get('external_report'):
+            with st.expander("External Research Report", expanded=False):
+                st.markdown(report['external_report'])
+    
     @staticmethod
     def _render_founder_tab(tab, final_state: Dict[str, Any]) -> None:
         """Render founder analysis tab."""
@@ -400,6 +434,44 @@ class FinalResultsRenderer:
                     for step, times in step_times.items():
                         if isinstance(times, dict) and "start" in times and "end" in times:
                             st.write(f"- {step}: Completed")
+                
+                # Show how many searches actually reached SerpAPI
+                if progress.get("search_calls"):
+                    search_calls = progress["search_calls"]
+                    st.write(
+                        f"**Search Calls:** {search_calls['searches']} searches, "
+                        f"{search_calls['deduplicated']} shared within the run, "
+                        f"{search_calls['external_calls']} external calls"
+                    )
+                
+                # Show per-node LLM call accounting if available
+                if progress.get("llm_calls"):
+                    st.write("**LLM Calls:**")
+                    for step, summary in progress["llm_calls"].items():
+                        st.write(
+                            f"- {step}: {summary['calls']} calls, {summary['latency']:.1f}s, "
+                            f"{summary['prompt_tokens']} prompt / {summary['completion_tokens']} completion tokens "
+                            f"({summary['cached_tokens']} cached), {summary['retries']} retries"
+                        )
+                    
+                    # Per-call breakdown, e.g. to check prompt-cache hits on the long prompts
+                    with st.expander("LLM Call Details", expanded=False):
+                        st.dataframe([
+                            {
+                                "node": step,
+                                "call_site": record["call_site"],
+                                "model": record["model"],
+                                "latency (s)": round(record["latency"], 2),
+                                "prompt_tokens": record["prompt_tokens"],
+                                "cached_tokens": record["cached_tokens"],
+                                "cached %": round(100 * record["cached_tokens"] / record["prompt_tokens"], 1) if record["prompt_tokens"] else 0.0,
+                                "completion_tokens": record["completion_tokens"],
+                                "response_cache": record["cache_hit"],
+                                "hedged": record.get("hedged", False),
+                            }
+                            for step, summary in progress["llm_calls"].items()
+                            for record in summary.get("records", [])
+                        ])
 
 
 class StartupAnalyzer:
@@ -409,7 +481,7 @@ class StartupAnalyzer:
         self.graph = graph
         self.error_handler = ErrorHandler()
     
-    def analyze_with_stream(self, startup_info_str: str) -> None:
+    def analyze_with_stream(self, startup_info_str: str, mode: AnalysisMode = "advanced") -> None:
         """Analyze startup using the streaming graph workflow."""
         # Create UI components
         ui_components = self._create_ui_components()
@@ -421,17 +493,24 @@ class StartupAnalyzer:
             all_messages=[],
             node_outputs={},
             completed_node_list=[],
-            start_time=time.time()
+            start_time=time.time(),
+            live_reports={}
         )
         
         # Initialize helpers
         progress_tracker = ProgressTracker(ui_components, self.graph)
         node_renderer = NodeOutputRenderer(ui_components)
+        live_report_renderer = LiveReportRenderer(ui_components)
         formatter = MessageFormatter()
         
         try:
             # Stream the analysis
-            for step_output in self.graph.stream_analysis(startup_info_str):
+            for step_output in self.graph.stream_analysis(startup_info_str, mode):
+                if step_output.get("event") == "token":
+                    live_report_renderer.append_token(
+                        step_output["node"], step_output["token"], analysis_state.live_reports
+                    )
+                    continue
                 self._process_step_output(
                     step_output, 
                     analysis_state, 
@@ -465,6 +544,7 @@ class StartupAnalyzer:
             st.write("#### Detailed Progress")
             progress_placeholder = st.empty()
             st.write("---")
+            live_reports_placeholder = st.container()
             st.write("#### Node Outputs:")
             node_outputs_placeholder = st.empty()
         
@@ -476,7 +556,8 @@ class StartupAnalyzer:
             elapsed_time=elapsed_time,
             status_text=status_text,
             progress_placeholder=progress_placeholder,
-            node_outputs_placeholder=node_outputs_placeholder
+            node_outputs_placeholder=node_outputs_placeholder,
+            live_reports_placeholder=live_reports_placeholder
         )
     
     def _process_step_output(
@@ -590,6 +671,7 @@ class StartupAnalysisApp:
     
     def __init__(self):
         self.graph = None
+        self.mode: AnalysisMode = "advanced"
         self._initialize_graph()
     
     def _initialize_graph(self) -> None:
@@ -611,6 +693,13 @@ class StartupAnalysisApp:
             help="Provide a detailed description of the startup, including information about the product, market, founders, and any other relevant details."
         )
         
+        self.mode = st.radio(
+            "Analysis Mode",
+            options=["advanced", "natural_language_advanced"],
+            format_func=lambda mode: "Advanced (structured scores)" if mode == "advanced" else "Natural Language Advanced (streamed reports)",
+            horizontal=True
+        )
+        
         if st.button("Analyze Startup"):
             if startup_info_str:
                 return startup_info_str
@@ -625,7 +714,7 @@ class StartupAnalysisApp:
         
         if startup_info:
             analyzer = StartupAnalyzer(self.graph)
-            analyzer.analyze_with_stream(startup_info)
+            analyzer.analyze_with_stream(startup_info, self.mode)
 
 
 def main() -> None:
@@ -11,7 +11,8 @@ from nodes import (
     IntegrationNode
 )
 from states.overall_state import OverallState
-from shared.types import ProgressDict
+from shared.types import AnalysisMode, ProgressDict, SearchCallsDict
+from utils.search_broker import SearchBroker
 
 
 # Configure logging
@@ -59,11 +60,13 @@ class SSFFGraph:
     def create_initial_state(
         self,
         startup_info_str: str,
+        mode: AnalysisMode = "advanced",
     ) -> OverallState:
         """Create initial state for the workflow."""
         return OverallState(
             messages=[],
             startup_info_str=startup_info_str,
+            analysis_mode=mode,
             startup_info={},
             market_analysis=None,
             product_analysis=None,
@@ -80,22 +83,29 @@ class SSFFGraph:
                 start_time=datetime.now(),
                 step_times={},
                 status="running",
-                error_message=None
+                error_message=None,
+                llm_calls={},
+                search_calls=SearchCallsDict(searches=0, deduplicated=0, external_calls=0)
             ),
             next_step=None,
             should_continue=True
         )
 
-    def run_analysis(self, startup_info_str: str) -> dict[str, Any]:
+    @staticmethod
+    def _run_config() -> dict[str, Any]:
+        """Per-run config: a fresh search broker shared by the market and product nodes."""
+        return {"configurable": {"search_broker": SearchBroker()}}
+
+    def run_analysis(self, startup_info_str: str, mode: AnalysisMode = "advanced") -> dict[str, Any]:
         """Run the complete SSFF analysis workflow."""
         if self.graph is None:
             raise RuntimeError("Graph not initialized. Please install langgraph.")
         
         # Create initial state
-        initial_state = self.create_initial_state(startup_info_str)
+        initial_state = self.create_initial_state(startup_info_str, mode)
         
         # Run the workflow
-        final_state = self.graph.invoke(initial_state)
+        final_state = self.graph.invoke(initial_state, config=self._run_config())
         
         # Extract and format results
         result = {
@@ -110,21 +120,48 @@ class SSFFGraph:
             'Startup Info': final_state.get("startup_info", {}),
             'Basic Analysis': final_state.get("integrated_analysis_basic", {}),
             'Progress': final_state.get("progress", {}),
+            'LLM Calls': final_state.get("progress", {}).get("llm_calls", {}),
+            'Search Calls': final_state.get("progress", {}).get("search_calls", {}),
             'Messages': final_state.get("messages", [])
         }
         logger.info("SSFF analysis completed successfully")
         return result
 
-    def stream_analysis(self, startup_info_str: str) -> Generator[dict[str, Any], None, None]:
-        """Stream the SSFF analysis workflow with progress updates."""
+    def stream_analysis(
+        self,
+        startup_info_str: str,
+        mode: AnalysisMode = "advanced",
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Stream the SSFF analysis workflow with progress updates.
+
+        Yields {"event": "update", ...} when a node finishes and, in
+        natural_language_advanced mode, {"event": "token", "node", "token"}
+        for each chunk of the market and product reports as it is generated.
+        A report served from the LLM cache arrives as a single token event.
+        """
         if self.graph is None:
             raise RuntimeError("Graph not initialized. Please install langgraph.")
         
         # Create initial state
-        initial_state = self.create_initial_state(startup_info_str)
+        initial_state = self.create_initial_state(startup_info_str, mode)
         
         # Stream the workflow
-        for step_output in self.graph.stream(initial_state):
+        for stream_mode, step_output in self.graph.stream(
+            initial_state,
+            config=self._run_config(),
+            stream_mode=["updates", "custom"],
+        ):
+            # Token chunks written by the nodes
+            if stream_mode == "custom":
+                if isinstance(step_output, dict) and "token" in step_output:
+                    yield {
+                        "event": "token",
+                        "node": step_output.get("node", ""),
+                        "token": step_output["token"],
+                    }
+                continue
+            
             # Extract progress information
             if isinstance(step_output, dict):
                 # LangGraph returns {node_name: node_output}
@@ -134,6 +171,7 @@ class SSFFGraph:
                         messages = node_output.get("messages", [])
                         
                         yield {
+                            "event": "update",
                             "node": node_name,
                             "progress": progress,
                             "messages": messages,
@@ -1,9 +1,13 @@
 import logging
 import time
+import contextlib
 from datetime import datetime
 from pydantic import BaseModel
-from typing import Any, Optional, Literal
+from typing import Any, Callable, Optional, Literal
+from langgraph.config import get_config, get_stream_writer
 from states.overall_state import OverallState
+from utils.llm_metrics import start_llm_call_collection, stop_llm_call_collection, summarize_llm_calls
+from utils.search_broker import SearchBroker
 
 
 class ProgressUpdate(BaseModel):
@@ -91,6 +95,36 @@ class BaseNode:
         if self.name in progress.get("step_times", {}):
             progress["step_times"][self.name]["end"] = current_time
     
+    def _token_writer(self) -> Callable[[str], None]:
+        """Return a callback that forwards generated text chunks as custom stream events."""
+        writer = get_stream_writer()
+        return lambda chunk: writer({"node": self.name, "token": chunk})
+
+    def _start_llm_tracking(self) -> tuple[Any, list]:
+        """Start collecting the LLM calls made while this node runs."""
+        return start_llm_call_collection()
+
+    def _finish_llm_tracking(self, progress: dict, tracking: tuple[Any, list]) -> None:
+        """Stop collecting LLM calls and store this node's summary in progress."""
+        token, records = tracking
+        stop_llm_call_collection(token)
+        progress["llm_calls"] = {**progress.get("llm_calls", {}), self.name: summarize_llm_calls(records)}
+    
+    def _run_search_broker(self) -> Optional[SearchBroker]:
+        """Return the search broker SSFFGraph passed in for this run, if any."""
+        return get_config().get("configurable", {}).get("search_broker")
+
+    def _search_context(self) -> contextlib.AbstractContextManager:
+        """Route this node's searches through the run's shared search broker."""
+        broker = self._run_search_broker()
+        return broker.activate() if broker is not None else contextlib.nullcontext()
+
+    def _record_search_calls(self, progress: dict) -> None:
+        """Store the run's search counts so far in progress."""
+        broker = self._run_search_broker()
+        if broker is not None:
+            progress["search_calls"] = broker.stats()
+    
     def __call__(self, state: OverallState) -> dict[str, Any]:
         """Execute the node. Must be implemented by subclasses."""
         raise NotImplementedError("Subclasses must implement __call__ method")
@@ -22,6 +22,8 @@ class FounderNode(BaseNode):
             progress=input_state["progress"].copy()
         )
         
+        llm_tracking = self._start_llm_tracking()
+        
         try:
             # Update progress - starting
             progress_msg = self._create_progress_message("started", "Analyzing founder...")
@@ -35,36 +37,12 @@ class FounderNode(BaseNode):
             # Get startup info
             startup_info = input_state["startup_info"]
             
-            # Perform founder analysis
+            # Perform founder analysis, including segmentation and idea fit
             founder_analysis = self.founder_agent.analyze(startup_info, "advanced")
             
-            # Get founder backgrounds for segmentation and idea fit
-            founder_backgrounds = startup_info.get("founder_backgrounds", "")
-            if not founder_backgrounds:
-                # Use description if founder_backgrounds is not available
-                founder_backgrounds = startup_info.get("description", "")
-            
-            # Perform founder segmentation
-            founder_segmentation = self.founder_agent.segment_founder(founder_backgrounds)
-            
-            # Calculate founder-idea fit
-            founder_idea_fit = self.founder_agent.calculate_idea_fit(startup_info, founder_backgrounds)
-            
-            # Handle founder_idea_fit if it's a list
-            if isinstance(founder_idea_fit, list):
-                founder_idea_fit_value = founder_idea_fit[0]
-            else:
-                founder_idea_fit_value = founder_idea_fit
-            
-            # Convert founder_analysis to dict
-            if hasattr(founder_analysis, 'model_dump'):
-                founder_analysis_dict = founder_analysis.model_dump()
-            else:
-                founder_analysis_dict = founder_analysis
-            
-            # Add segmentation and fit data to analysis (convert to AdvancedFounderAnalysisDict)
-            founder_analysis_dict["segmentation"] = founder_segmentation
-            founder_analysis_dict["idea_fit"] = (founder_idea_fit_value, 0.0)  # Convert to tuple format
+            # Convert to AdvancedFounderAnalysisDict
+            founder_analysis_dict = founder_analysis.model_dump()
+            founder_analysis_dict["idea_fit"] = (founder_analysis.idea_fit, founder_analysis.cosine_similarity)
             
             self.logger.info("Founder analysis completed successfully")
             
@@ -77,8 +55,8 @@ class FounderNode(BaseNode):
                 "completed",
                 "Founder analysis completed",
                 data={
-                    "segmentation": founder_segmentation,
-                    "idea_fit": founder_idea_fit_value,
+                    "segmentation": founder_analysis.segmentation,
+                    "idea_fit": founder_analysis.idea_fit,
                     "competency_score": founder_analysis_dict.get("competency_score", 0)
                 }
             )
@@ -92,4 +70,6 @@ class FounderNode(BaseNode):
             error_progress = self._create_progress_message("error", error_msg)
             output["messages"].append(error_progress)
         
+        self._finish_llm_tracking(output["progress"], llm_tracking)
+        
         return output
@@ -26,6 +26,8 @@ class IntegrationNode(BaseNode):
             progress=input_state["progress"].copy()
         )
         
+        llm_tracking = self._start_llm_tracking()
+        
         try:
             # Update progress - starting
             progress_msg = self._create_progress_message("started", "Integrating all analyses...")
@@ -125,4 +127,6 @@ class IntegrationNode(BaseNode):
             error_progress = self._create_progress_message("error", error_msg)
             output["messages"].append(error_progress)
         
+        self._finish_llm_tracking(output["progress"], llm_tracking)
+        
         return output
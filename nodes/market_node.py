@@ -22,6 +22,8 @@ class MarketNode(BaseNode):
             progress=input_state["progress"].copy()
         )
         
+        llm_tracking = self._start_llm_tracking()
+        
         try:
             # Update progress - starting
             progress_msg = self._create_progress_message("started", "Analyzing market...")
@@ -32,8 +34,15 @@ class MarketNode(BaseNode):
             startup_info = input_state["startup_info"]
             
             # Perform analysis
-            market_analysis = self.market_agent.analyze(startup_info, "advanced")
-            market_analysis_dict = market_analysis.model_dump()
+            mode = input_state.get("analysis_mode", "advanced")
+            with self._search_context():
+                market_analysis = self.market_agent.analyze(startup_info, mode, on_token=self._token_writer())
+            
+            # Convert to dict if it's a model object
+            if hasattr(market_analysis, 'model_dump'):
+                market_analysis_dict = market_analysis.model_dump()
+            else:
+                market_analysis_dict = market_analysis
             
             self.logger.info("Market analysis completed successfully")
             
@@ -57,4 +66,7 @@ class MarketNode(BaseNode):
             error_progress = self._create_progress_message("error", error_msg)
             output["messages"].append(error_progress)
         
+        self._finish_llm_tracking(output["progress"], llm_tracking)
+        self._record_search_calls(output["progress"])
+        
         return output
@@ -23,6 +23,8 @@ class ParseNode(BaseNode):
             progress=input_state["progress"].copy()
         )
         
+        llm_tracking = self._start_llm_tracking()
+        
         try:
             # Update progress - starting
             progress_msg = self._create_progress_message("started", "Parsing startup information...")
@@ -65,4 +67,6 @@ class ParseNode(BaseNode):
             error_progress = self._create_progress_message("error", error_msg)
             output["messages"].append(error_progress)
         
+        self._finish_llm_tracking(output["progress"], llm_tracking)
+        
         return output
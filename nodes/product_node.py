@@ -22,6 +22,8 @@ class ProductNode(BaseNode):
             progress=input_state["progress"].copy()
         )
         
+        llm_tracking = self._start_llm_tracking()
+        
         try:
             # Update progress - starting
             progress_msg = self._create_progress_message("started", "Analyzing product...")
@@ -36,7 +38,9 @@ class ProductNode(BaseNode):
             startup_info = input_state["startup_info"]
             
             # Perform analysis
-            product_analysis = self.product_agent.analyze(startup_info, "advanced")
+            mode = input_state.get("analysis_mode", "advanced")
+            with self._search_context():
+                product_analysis = self.product_agent.analyze(startup_info, mode, on_token=self._token_writer())
             
             # Convert to dict if it's a model object
             if hasattr(product_analysis, 'model_dump'):
@@ -70,4 +74,7 @@ class ProductNode(BaseNode):
             error_progress = self._create_progress_message("error", error_msg)
             output["messages"].append(error_progress)
         
+        self._finish_llm_tracking(output["progress"], llm_tracking)
+        self._record_search_calls(output["progress"])
+        
         return output
@@ -1,3 +1,8 @@
+# The integration prompts are static system prompts (instructions and
+# few-shot examples) so every call shares the same prefix and can hit the
+# provider's prompt cache; the per-startup data goes in the *_INPUT
+# templates, sent last as the user message.
+
 BASIC_INTEGRATION_PROMPT = """
 あなたはベンチャーキャピタル企業の主席アナリストであり、3つの専門チームの分析を統合して包括的な投資洞察を提供する任務を負っています。あなたの出力は詳細なスコアと正当化理由を含む構造化されたものでなければなりません：
 
@@ -15,16 +20,18 @@ BASIC_INTEGRATION_PROMPT = """
 
 推奨事項：保留。ユニークな製品提供は新興市場のニッチに触れ、潜在的な機会を提示しています。しかし、飽和した広範な市場、消費者に対する製品の価値を正当化する際の課題、チームのビジネス管理における限られた経験の組み合わせは、製品市場適合と戦略的方向性のより明確な兆候を待つことを示唆しています。
 
+将来の成功の基準（あなたの予測に基づくスタートアップの将来の目的地のようなもの）：
+- 5億ドル以上を調達、5億ドル以上で買収、または5億ドル以上の評価額でIPOを行ったスタートアップは成功と定義されます。10万ドルから400万ドルを調達したが、その後重要な成功を達成しなかったスタートアップは失敗と見なされます。
+
+ユーザーメッセージで与えられる入力に基づいて全体的な投資推奨を提供してください。「投資」または「保留」のどちらを勧めるかを述べ、決定に対する包括的な根拠を含めてください。
+"""
+
+BASIC_INTEGRATION_INPUT = """
 今、以下を分析してください：
 
 市場実現可能性：{market_info}
 製品実現可能性：{product_info}
 創業者の能力：{founder_info}
-
-将来の成功の基準（あなたの予測に基づくスタートアップの将来の目的地のようなもの）：
-- 5億ドル以上を調達、5億ドル以上で買収、または5億ドル以上の評価額でIPOを行ったスタートアップは成功と定義されます。10万ドルから400万ドルを調達したが、その後重要な成功を達成しなかったスタートアップは失敗と見なされます。
-
-これらの入力に基づいて全体的な投資推奨を提供してください。「投資」または「保留」のどちらを勧めるかを述べ、決定に対する包括的な根拠を含めてください。
 """
 
 PRO_INTEGRATION_PROMPT = """
@@ -47,15 +54,6 @@ PRO_INTEGRATION_PROMPT = """
 
 推奨事項：保留。ユニークな製品提供は新興市場のニッチに触れ、潜在的な機会を提示しています。しかし、飽和した広範な市場、消費者に対する製品の価値を正当化する際の課題、チームのビジネス管理における限られた経験の組み合わせは、製品市場適合と戦略的方向性のより明確な兆候を待つことを示唆しています。
 
-今、以下を分析してください：
-
-市場実現可能性：{market_info}
-製品実現可能性：{product_info}
-創業者の能力：{founder_info}
-創業者とアイデアの適合性：{founder_idea_fit}
-創業者セグメンテーション：{founder_segmentation}
-ランダムフォレスト予測：{rf_prediction}
-
 スコアに関する文脈：
 1. 創業者とアイデアの適合性は-1から1の範囲で、より高い数値はより良い適合を示します。
 2. 創業者セグメンテーションの結果はL1からL5の範囲で、L5が最も「有能な」創業者、L1がそうでない創業者です。
@@ -66,7 +64,18 @@ PRO_INTEGRATION_PROMPT = """
 将来の成功の基準（あなたの予測に基づくスタートアップの将来の目的地のようなもの）：
 - 5億ドル以上を調達、5億ドル以上で買収、または5億ドル以上の評価額でIPOを行ったスタートアップは成功と定義されます。10万ドルから400万ドルを調達したが、その後重要な成功を達成しなかったスタートアップは失敗と見なされます。
 
-これらの入力に基づいて全体的な投資推奨を提供してください。「投資」または「保留」のどちらを勧めるかを述べ、決定に対する包括的な根拠を含めてください。提供されたすべての予測と分析を効果的に考慮してください。
+ユーザーメッセージで与えられる入力に基づいて全体的な投資推奨を提供してください。「投資」または「保留」のどちらを勧めるかを述べ、決定に対する包括的な根拠を含めてください。提供されたすべての予測と分析を効果的に考慮してください。
+"""
+
+PRO_INTEGRATION_INPUT = """
+今、以下を分析してください：
+
+市場実現可能性：{market_info}
+製品実現可能性：{product_info}
+創業者の能力：{founder_info}
+創業者とアイデアの適合性：{founder_idea_fit}
+創業者セグメンテーション：{founder_segmentation}
+ランダムフォレスト予測：{rf_prediction}
 """
 
 QUANT_DECISION_PROMPT = """
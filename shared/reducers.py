@@ -43,6 +43,15 @@ def merge_progress(left: ProgressDict, right: ProgressDict) -> ProgressDict:
     
     merged["step_times"] = left_times
     
+    # Merge per-node LLM call summaries (each node only reports its own)
+    merged["llm_calls"] = {**left.get("llm_calls", {}), **right.get("llm_calls", {})}
+    
+    # Search counts are run totals snapshotted by each node; keep the latest
+    left_searches = left.get("search_calls")
+    right_searches = right.get("search_calls")
+    if right_searches and (not left_searches or right_searches["searches"] >= left_searches["searches"]):
+        merged["search_calls"] = right_searches
+    
     # Use the most recent start_time
     if "start_time" in right:
         merged["start_time"] = right["start_time"]
@@ -2,6 +2,39 @@ from typing import TypedDict, Optional, Literal
 from datetime import datetime
 
 
+class LLMCallDict(TypedDict):
+    """A single LLM API call made during analysis."""
+    model: str
+    call_site: str
+    operation: str
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int
+    latency: float
+    retries: int
+    cache_hit: bool
+    deduplicated: bool
+    hedged: bool
+
+
+class LLMCallSummaryDict(TypedDict):
+    """LLM calls made by one node, with totals."""
+    calls: int
+    latency: float
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int
+    retries: int
+    records: list[LLMCallDict]
+
+
+class SearchCallsDict(TypedDict):
+    """Web searches made during one analysis run."""
+    searches: int
+    deduplicated: int
+    external_calls: int
+
+
 class ProgressDict(TypedDict):
     """Track the progress of analysis."""
     current_step: str
@@ -10,6 +43,11 @@ class ProgressDict(TypedDict):
     step_times: dict[str, dict[str, datetime]]
     status: Literal["running", "completed", "error"]
     error_message: Optional[str]
+    llm_calls: dict[str, LLMCallSummaryDict]
+    search_calls: SearchCallsDict
+
+
+AnalysisMode = Literal["advanced", "natural_language_advanced"]
 
 
 class StartupInfoDict(TypedDict):
@@ -84,6 +122,12 @@ class MarketAnalysisDict(TypedDict):
     viability_score: int
 
 
+class NaturalLanguageAnalysisDict(TypedDict):
+    """Natural-language analysis report (natural_language_advanced mode)."""
+    analysis: Optional[str]
+    external_report: Optional[str]
+
+
 class ProductAnalysisDict(TypedDict):
     """Product analysis results."""
     features_analysis: str
@@ -1,23 +1,31 @@
 import logging
-from typing import Any, Literal
+from typing import Any, Literal, Optional, Sequence
 
 from agents.market_agent import MarketAgent
 from agents.product_agent import ProductAgent
 from agents.founder_agent import FounderAgent
 from agents.vc_scout_agent import VCScoutAgent, StartupInfo
 from agents.integration_agent import IntegrationAgent
+from utils.openai_batch import BatchSession
+from utils.llm_backend import LLMBackend
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _to_dict(analysis: Any) -> Any:
+    # The natural-language modes return plain dicts instead of schema objects
+    return analysis.model_dump() if hasattr(analysis, 'model_dump') else analysis
+
+
 class StartupFramework:
-    def __init__(self, model="gpt-4o"):
+    def __init__(self, model="gpt-4o", backend: Optional[LLMBackend] = None):
         self.model = model
-        self.market_agent = MarketAgent(model)
-        self.product_agent = ProductAgent(model)
-        self.founder_agent = FounderAgent(model)
-        self.vc_scout_agent = VCScoutAgent(model)
-        self.integration_agent = IntegrationAgent(model)
+        self.market_agent = MarketAgent(model, backend)
+        self.product_agent = ProductAgent(model, backend)
+        self.founder_agent = FounderAgent(model, backend)
+        self.vc_scout_agent = VCScoutAgent(model, backend)
+        self.integration_agent = IntegrationAgent(model, backend)
 
     def analyze_startup(
         self,
@@ -43,14 +51,14 @@ class StartupFramework:
         product_analysis = self.product_agent.analyze(startup_info.model_dump(), mode)
         founder_analysis = self.founder_agent.analyze(startup_info.model_dump(), "advanced")
 
-        # Perform advanced founder analysis
-        founder_segmentation = self.founder_agent.segment_founder(startup_info.founder_backgrounds)
-        founder_idea_fit = self.founder_agent.calculate_idea_fit(startup_info.model_dump(), startup_info.founder_backgrounds)
+        # The advanced founder analysis already carries segmentation and idea fit
+        founder_segmentation = founder_analysis.segmentation
+        founder_idea_fit = founder_analysis.idea_fit
 
         # Integrate analyses (pro version)
         integrated_analysis = self.integration_agent.integrated_analysis_pro(
-            market_info=market_analysis.model_dump(),
-            product_info=product_analysis.model_dump(),
+            market_info=_to_dict(market_analysis),
+            product_info=_to_dict(product_analysis),
             founder_info=founder_analysis.model_dump(),  
             founder_idea_fit=founder_idea_fit,
             founder_segmentation=founder_segmentation,
@@ -59,8 +67,8 @@ class StartupFramework:
 
         # Integrate analyses (basic version)
         integrated_analysis_basic = self.integration_agent.integrated_analysis_basic(
-            market_info=market_analysis.model_dump(),
-            product_info=product_analysis.model_dump(),
+            market_info=_to_dict(market_analysis),
+            product_info=_to_dict(product_analysis),
             founder_info=founder_analysis.model_dump(),  
         )
 
@@ -72,11 +80,11 @@ class StartupFramework:
 
         return {
             'Final Analysis': integrated_analysis.model_dump(),
-            'Market Analysis': market_analysis.model_dump(),
-            'Product Analysis': product_analysis.model_dump(),
+            'Market Analysis': _to_dict(market_analysis),
+            'Product Analysis': _to_dict(product_analysis),
             'Founder Analysis': founder_analysis.model_dump(),
             'Founder Segmentation': founder_segmentation,
-            'Founder Idea Fit': founder_idea_fit[0],
+            'Founder Idea Fit': founder_idea_fit,
             'Categorical Prediction': prediction,
             'Categorization': categorization.model_dump(),
             'Quantitative Decision': quant_decision.model_dump(),
@@ -84,6 +92,33 @@ class StartupFramework:
             'Basic Analysis': integrated_analysis_basic.model_dump(),
         }
 
+    def analyze_startups_batch(
+        self,
+        startup_info_strs: Sequence[str],
+        mode: Literal["advanced", "natural_language_advanced"] = "advanced",
+        session: Optional[BatchSession] = None,
+        max_workers: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Analyze many startups with every OpenAI request sent through the
+        Batch API, for bulk re-scoring where latency does not matter.
+
+        Each startup runs the same pipeline as analyze_startup(); the
+        requests of all pipelines at the same stage are grouped into one
+        batch job. Results are returned in input order, with
+        {"error": ...} for startups whose analysis failed.
+        """
+        session = session or BatchSession()
+        results = session.run(
+            [lambda info=info: self.analyze_startup(info, mode) for info in startup_info_strs],
+            max_workers=max_workers,
+        )
+        logger.info(
+            f"Batch analysis of {len(startup_info_strs)} startups used {session.batches_submitted} batch jobs "
+            f"for {session.requests_submitted} requests"
+        )
+        return [{"error": str(r)} if isinstance(r, Exception) else r for r in results]
+
 def main():
     framework = StartupFramework("gpt-4o")
     
@@ -1,17 +1,18 @@
-from typing import TypedDict, Any
+from typing import TypedDict, Any, Union
 from typing_extensions import Annotated
 import operator
-from shared.types import StartupInfoDict, MarketAnalysisDict, ProgressDict
+from shared.types import AnalysisMode, StartupInfoDict, MarketAnalysisDict, NaturalLanguageAnalysisDict, ProgressDict
 from shared.reducers import merge_progress
 
 
 class MarketNodeInput(TypedDict):
     messages: Annotated[list[dict[str, Any]], operator.add]
     startup_info: StartupInfoDict
+    analysis_mode: AnalysisMode
     progress: Annotated[ProgressDict, merge_progress]
 
 
 class MarketNodeOutput(TypedDict):
     messages: Annotated[list[dict[str, Any]], operator.add]
-    market_analysis: MarketAnalysisDict
+    market_analysis: Union[MarketAnalysisDict, NaturalLanguageAnalysisDict]
     progress: Annotated[ProgressDict, merge_progress]
@@ -5,8 +5,10 @@ from shared.reducers import merge_progress
 from shared.types import (
     ProgressDict,
     StartupInfoDict,
+    AnalysisMode,
     MarketAnalysisDict,
     ProductAnalysisDict,
+    NaturalLanguageAnalysisDict,
     FounderAnalysisDict,
     AdvancedFounderAnalysisDict,
     VCScoutAnalysisDict,
@@ -22,13 +24,14 @@ class OverallState(TypedDict):
     
     # Input
     startup_info_str: str
+    analysis_mode: AnalysisMode
     
     # Parsed data
     startup_info: StartupInfoDict
     
     # Individual analyses
-    market_analysis: Optional[MarketAnalysisDict]
-    product_analysis: Optional[ProductAnalysisDict]
+    market_analysis: Optional[Union[MarketAnalysisDict, NaturalLanguageAnalysisDict]]
+    product_analysis: Optional[Union[ProductAnalysisDict, NaturalLanguageAnalysisDict]]
     founder_analysis: Optional[Union[FounderAnalysisDict, AdvancedFounderAnalysisDict]]
     
     # VC Scout results
@@ -1,17 +1,18 @@
-from typing import TypedDict, Any
+from typing import TypedDict, Any, Union
 from typing_extensions import Annotated
 import operator
-from shared.types import StartupInfoDict, ProductAnalysisDict, ProgressDict
+from shared.types import AnalysisMode, StartupInfoDict, ProductAnalysisDict, NaturalLanguageAnalysisDict, ProgressDict
 from shared.reducers import merge_progress
 
 
 class ProductNodeInput(TypedDict):
     messages: Annotated[list[dict[str, Any]], operator.add]
     startup_info: StartupInfoDict
+    analysis_mode: AnalysisMode
     progress: Annotated[ProgressDict, merge_progress]
 
 
 class ProductNodeOutput(TypedDict):
     messages: Annotated[list[dict[str, Any]], operator.add]
-    product_analysis: ProductAnalysisDict
+    product_analysis: Union[ProductAnalysisDict, NaturalLanguageAnalysisDict]
     progress: Annotated[ProgressDict, merge_progress]
@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import threading
+from types import SimpleNamespace
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import pytest
+
+from utils.mock_openai_server import MockOpenAIServer
+
+
+@pytest.fixture(scope="session")
+def mock_openai():
+    """
+    Mock OpenAI server that every OpenAI client created in the tests talks to.
+    """
+    server = MockOpenAIServer().start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "test-key"
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def local_corpus(tmp_path, monkeypatch):
+    """
+    Serve searches from a BM25 index over a temporary corpus directory
+    instead of SerpAPI. Tests add documents to the returned directory.
+    """
+    from utils import local_search
+    from utils.config import Config
+
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    monkeypatch.setattr(Config, "SEARCH_BACKEND", "local")
+    monkeypatch.setattr(Config, "LOCAL_SEARCH_DIR", str(corpus))
+    monkeypatch.setattr(Config, "LOCAL_SEARCH_INDEX_PATH", str(tmp_path / "index.json"))
+    monkeypatch.setattr(local_search, "_default_index", None)
+    return corpus
+
+
+class FakeSerpAPI:
+    """
+    Stands in for serpapi.search: records every query that reaches the
+    provider and answers with two organic results per query.
+    """
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def search(self, params):
+        with self._lock:
+            self.queries.append(params["q"])
+        # Keep concurrent identical searches overlapping
+        time.sleep(self.delay)
+        results = [
+            {"position": i, "title": f"{params['q']} {i}", "link": f"https://example.com/{i}/{params['q']}", "snippet": f"Result {i} about {params['q']}"}
+            for i in (1, 2)
+        ]
+        return SimpleNamespace(as_dict=lambda: {"organic_results": results})
+
+
+@pytest.fixture
+def fake_serpapi(monkeypatch):
+    """
+    Send every SerpAPI search to a FakeSerpAPI instead of the network.
+    """
+    import serpapi
+    from utils.config import Config
+
+    fake = FakeSerpAPI()
+    monkeypatch.setenv("SERPAPI_API_KEY", "test-key")
+    monkeypatch.setattr(Config, "SEARCH_BACKEND", "serpapi")
+    monkeypatch.setattr(Config, "SEARCH_CACHE_PATH", None)
+    monkeypatch.setattr(serpapi, "search", fake.search)
+    return fake
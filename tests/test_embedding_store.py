@@ -0,0 +1,101 @@
+import os
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from utils import embedding_store
+from utils.embedding_store import EmbeddingStore
+
+MODEL = "text-embedding-3-large"
+DIMS = 4
+
+
+def _vector(i: int) -> list[float]:
+    return [float(i)] * DIMS
+
+
+def test_put_and_get_round_trip(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    stored = store.put(MODEL, DIMS, "a", _vector(1))
+    np.testing.assert_array_equal(stored, _vector(1))
+    np.testing.assert_array_equal(EmbeddingStore(str(tmp_path)).get(MODEL, DIMS, "a"), _vector(1))
+
+
+def test_put_does_not_count_as_lookup(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.put_many(MODEL, DIMS, ["a", "b"], [_vector(1), _vector(2)])
+    assert store.stats()["hits"] == 0 and store.stats()["misses"] == 0
+    store.get_many(MODEL, DIMS, ["a", "c"])
+    assert (store.stats()["hits"], store.stats()["misses"]) == (1, 1)
+
+
+def test_reload_after_torn_row_keeps_rows_aligned(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.put_many(MODEL, DIMS, ["a", "b"], [_vector(1), _vector(2)])
+    vector_file = store._file(MODEL, DIMS)
+    # A crash in the middle of appending the third row
+    with open(vector_file.data_path, "ab") as f:
+        f.write(np.asarray(_vector(3), dtype=np.float32).tobytes()[:6])
+
+    reloaded = EmbeddingStore(str(tmp_path))
+    assert reloaded.get(MODEL, DIMS, "c") is None
+    assert os.path.getsize(vector_file.data_path) == 2 * 4 * DIMS
+    reloaded.put(MODEL, DIMS, "c", _vector(3))
+
+    again = EmbeddingStore(str(tmp_path))
+    for text, i in (("a", 1), ("b", 2), ("c", 3)):
+        np.testing.assert_array_equal(again.get(MODEL, DIMS, text), _vector(i))
+
+
+def test_reload_after_torn_index_line(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.put(MODEL, DIMS, "a", _vector(1))
+    vector_file = store._file(MODEL, DIMS)
+    # The row was written but its index line only partly
+    with open(vector_file.data_path, "ab") as f:
+        f.write(np.asarray(_vector(2), dtype=np.float32).tobytes())
+    with open(vector_file.index_path, "a", encoding="utf-8") as f:
+        f.write(EmbeddingStore.text_hash("b")[:10])
+
+    reloaded = EmbeddingStore(str(tmp_path))
+    assert reloaded.get(MODEL, DIMS, "b") is None
+    reloaded.put(MODEL, DIMS, "b", _vector(2))
+
+    again = EmbeddingStore(str(tmp_path))
+    np.testing.assert_array_equal(again.get(MODEL, DIMS, "a"), _vector(1))
+    np.testing.assert_array_equal(again.get(MODEL, DIMS, "b"), _vector(2))
+
+
+def _append_texts(directory: str, worker: int, n: int) -> None:
+    store = EmbeddingStore(directory)
+    for i in range(n):
+        text = f"{worker}-{i}"
+        stored = store.put(MODEL, DIMS, text, _vector(1000 * worker + i))
+        assert (stored == _vector(1000 * worker + i)).all(), text
+
+
+def _reopen(directory: str, n: int) -> None:
+    for _ in range(n):
+        EmbeddingStore(directory).get(MODEL, DIMS, "0-0")
+
+
+@pytest.mark.skipif(embedding_store.fcntl is None, reason="needs fcntl file locks")
+def test_processes_appending_and_reopening_concurrently(tmp_path):
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_append_texts, args=(str(tmp_path), 1, 200)),
+        context.Process(target=_append_texts, args=(str(tmp_path), 2, 200)),
+        context.Process(target=_reopen, args=(str(tmp_path), 200)),
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    assert [process.exitcode for process in processes] == [0, 0, 0]
+
+    store = EmbeddingStore(str(tmp_path))
+    for worker in (1, 2):
+        for i in range(200):
+            np.testing.assert_array_equal(store.get(MODEL, DIMS, f"{worker}-{i}"), _vector(1000 * worker + i))
+    assert store.stats()["entries"] == {f"{MODEL}/{DIMS}": 400}
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from agents.founder_agent import FounderAgent
+from utils.model_routing import ModelRoute, ModelRouter
+from utils.openai_api import OpenAIAPI
+
+STARTUP = {
+    "name": "Turismocity",
+    "description": "Travel search engine for Latin America",
+    "founder_backgrounds": "CTO with a software engineering background",
+}
+
+
+def test_failed_founder_analysis_raises_a_clear_error(mock_openai):
+    # Structured output is refused and there is no fallback model
+    backend = OpenAIAPI("gpt-4o", router=ModelRouter({"*": ModelRoute("mock-refuse")}))
+    agent = FounderAgent("gpt-4o", backend)
+
+    with pytest.raises(RuntimeError, match="segmentation"):
+        agent.segment_founder("Founders' Backgrounds: CTO")
+    with pytest.raises(RuntimeError, match="Could not get the founder"):
+        agent.analyze(STARTUP, "advanced")
+
+
+def test_missing_embeddings_raise_the_same_error_for_one_pair_and_a_batch(mock_openai, monkeypatch):
+    agent = FounderAgent("gpt-4o-mini", OpenAIAPI("gpt-4o-mini"))
+    monkeypatch.setattr(agent.openai_api, "get_embeddings_batch", lambda texts, call_site=None: None)
+
+    with pytest.raises(RuntimeError, match="Could not get embeddings"):
+        agent.calculate_idea_fit(STARTUP, "CTO")
+    with pytest.raises(RuntimeError, match="Could not get embeddings"):
+        agent.calculate_idea_fit_batch([(STARTUP, "CTO")])
+
+
+def test_idea_fit_batch_matches_scoring_each_pair(mock_openai):
+    agent = FounderAgent("gpt-4o-mini", OpenAIAPI("gpt-4o-mini"))
+    pairs = [
+        (STARTUP, "CTO with a software engineering background"),
+        ({**STARTUP, "description": "Flight tracking app for frequent flyers"}, "Former airline pilot"),
+        ({**STARTUP, "description": "Payroll software for small businesses"}, "CTO with a software engineering background"),
+    ]
+
+    idea_fit, cosine_sim = agent.calculate_idea_fit_batch(pairs)
+
+    assert agent.neural_network is not None
+    expected = np.array([agent.calculate_idea_fit(startup, founder) for startup, founder in pairs])
+    np.testing.assert_allclose(idea_fit, expected[:, 0], atol=1e-6)
+    np.testing.assert_allclose(cosine_sim, expected[:, 1], atol=1e-6)
+
+
+def test_idea_fit_batch_of_no_pairs_makes_no_request(mock_openai):
+    agent = FounderAgent("gpt-4o-mini", OpenAIAPI("gpt-4o-mini"))
+    requests = len(mock_openai.requests)
+
+    idea_fit, cosine_sim = agent.calculate_idea_fit_batch([])
+
+    assert idea_fit.shape == cosine_sim.shape == (0,)
+    assert len(mock_openai.requests) == requests
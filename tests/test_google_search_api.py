@@ -0,0 +1,33 @@
+from utils.google_search_api import merge_results
+
+
+def _hit(link: str) -> dict:
+    return {"title": link, "link": link, "snippet": link}
+
+
+def test_results_are_interleaved_rank_by_rank():
+    merged = merge_results([
+        [_hit("https://a.com/1"), _hit("https://a.com/2"), _hit("https://a.com/3")],
+        [_hit("https://b.com/1")],
+        [_hit("https://c.com/1"), _hit("https://c.com/2")],
+    ])
+    assert [r["link"] for r in merged] == [
+        "https://a.com/1", "https://b.com/1", "https://c.com/1",
+        "https://a.com/2", "https://c.com/2",
+        "https://a.com/3",
+    ]
+
+
+def test_duplicate_urls_are_dropped_ignoring_scheme_www_and_trailing_slash():
+    merged = merge_results([
+        [_hit("https://www.acme.com/news/"), _hit("https://acme.com/about?lang=en")],
+        [_hit("http://acme.com/news"), _hit("https://acme.com/about?lang=ja")],
+    ])
+    assert [r["link"] for r in merged] == [
+        "https://www.acme.com/news/", "https://acme.com/about?lang=en", "https://acme.com/about?lang=ja",
+    ]
+
+
+def test_limit_stops_the_merge():
+    merged = merge_results([[_hit(f"https://a.com/{i}") for i in range(5)], [_hit("https://b.com/0")]], limit=3)
+    assert [r["link"] for r in merged] == ["https://a.com/0", "https://b.com/0", "https://a.com/1"]
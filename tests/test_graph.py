@@ -0,0 +1,25 @@
+STARTUP = "Turismocity is a travel search engine for Latin America. Eugenio Fage is the CTO."
+
+
+def test_stream_analysis_emits_report_tokens_before_the_node_update(mock_openai, local_corpus):
+    from graph import SSFFGraph
+
+    events = list(SSFFGraph().stream_analysis(STARTUP, "natural_language_advanced"))
+
+    updates = {e["node"]: i for i, e in enumerate(events) if e["event"] == "update"}
+    assert set(updates) == {"parse", "market", "product", "founder", "vc_scout", "integration"}
+    for node, analysis_key in [("market", "market_analysis"), ("product", "product_analysis")]:
+        tokens = [(i, e["token"]) for i, e in enumerate(events) if e["event"] == "token" and e["node"] == node]
+        assert len(tokens) > 1
+        # Chunks arrive in order while the node runs and add up to its report
+        assert all(i < updates[node] for i, _ in tokens)
+        assert "".join(t for _, t in tokens) == events[updates[node]]["state"][analysis_key]["analysis"]
+    assert {e["node"] for e in events if e["event"] == "token"} == {"market", "product"}
+
+
+def test_advanced_mode_streams_no_tokens(mock_openai, local_corpus):
+    from graph import SSFFGraph
+
+    events = list(SSFFGraph().stream_analysis(STARTUP, "advanced"))
+
+    assert events and all(e["event"] == "update" for e in events)
@@ -0,0 +1,84 @@
+import asyncio
+
+from utils.hedging import Hedger
+
+
+def _warm(hedger: Hedger, call_site: str, latency: float, n: int = 20) -> None:
+    for _ in range(n):
+        hedger.tracker.observe(call_site, latency)
+
+
+def test_slow_request_is_hedged_and_hedge_wins():
+    hedger = Hedger(percentile=90, min_samples=20, max_extra_ratio=1.0)
+    _warm(hedger, "site", 0.02)
+    calls = []
+
+    async def send(on_start):
+        calls.append(len(calls))
+        on_start()
+        await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    result, hedged = asyncio.run(hedger.run("site", send))
+    assert hedged and len(calls) == 2
+    assert hedger.stats()["hedge_wins"] == 1
+
+
+def test_queue_wait_is_neither_hedged_nor_tracked():
+    hedger = Hedger(percentile=90, min_samples=20, max_extra_ratio=1.0)
+    _warm(hedger, "site", 0.05)
+
+    async def send(on_start):
+        # Waiting for rate-limit budget, then a fast request
+        await asyncio.sleep(0.3)
+        on_start()
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    assert asyncio.run(hedger.run("site", send)) == ("ok", False)
+    assert hedger.stats()["hedges"] == 0
+    assert hedger.tracker.percentile("site", 100) < 0.1
+
+
+def test_no_hedge_while_model_is_paused():
+    hedger = Hedger(percentile=90, min_samples=20, max_extra_ratio=1.0)
+    _warm(hedger, "site", 0.01)
+
+    async def send(on_start):
+        on_start()
+        await asyncio.sleep(0.1)
+        return "ok"
+
+    assert asyncio.run(hedger.run("site", send, paused=lambda: True)) == ("ok", False)
+    assert hedger.stats()["hedges"] == 0 and hedger.stats()["skipped_paused"] == 1
+
+
+def test_hedges_are_capped():
+    hedger = Hedger(percentile=90, min_samples=20, max_extra_ratio=0.0)
+    _warm(hedger, "site", 0.01)
+
+    async def send(on_start):
+        on_start()
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    asyncio.run(hedger.run("site", send))
+    assert hedger.stats()["hedges"] == 0 and hedger.stats()["skipped_over_budget"] == 1
+
+
+def test_primary_cut_short_by_a_hedge_is_tracked_as_at_least_its_elapsed_time():
+    hedger = Hedger(percentile=90, min_samples=20, max_extra_ratio=1.0)
+    _warm(hedger, "site", 0.05)
+    calls = []
+
+    async def send(on_start):
+        calls.append(len(calls))
+        on_start()
+        await asyncio.sleep(1.0 if len(calls) == 1 else 0.1)
+        return len(calls)
+
+    assert asyncio.run(hedger.run("site", send)) == (2, True)
+    # The primary ran for the 0.05s threshold plus the hedge's 0.1s before
+    # it was cancelled; the hedge's own 0.1s would bias the window low.
+    assert hedger.tracker.percentile("site", 100) >= 0.145
+    assert hedger.tracker.count("site") == 21
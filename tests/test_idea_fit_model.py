@@ -0,0 +1,75 @@
+import os
+import sys
+import logging
+
+import numpy as np
+import pytest
+
+from utils.idea_fit_model import DEFAULT_NPZ_PATH, DenseNetwork, check_embedding_settings, load_idea_fit_model
+
+
+def _network(input_dim: int = 201) -> DenseNetwork:
+    rng = np.random.default_rng(0)
+    return DenseNetwork([
+        (rng.normal(size=(input_dim, 8)), rng.normal(size=8), "relu"),
+        (rng.normal(size=(8, 1)), rng.normal(size=1), "linear"),
+    ])
+
+
+def test_embedding_settings_matching_network_pass(caplog):
+    with caplog.at_level(logging.WARNING):
+        check_embedding_settings(_network(), "text-embedding-3-large", 100)
+    assert not caplog.records
+
+
+def test_embedding_dimension_mismatch_fails_fast():
+    with pytest.raises(ValueError, match="1536 dimensions"):
+        check_embedding_settings(_network(), "text-embedding-3-small", 1536)
+
+
+def test_other_embedding_model_warns_with_its_name(caplog):
+    with caplog.at_level(logging.WARNING):
+        check_embedding_settings(_network(), "text-embedding-3-small", 100)
+    assert "text-embedding-3-small" in caplog.text
+
+
+def test_predict_returns_a_batch_for_single_rows_and_batches():
+    network = _network()
+    X = np.random.default_rng(1).normal(size=(4, 201))
+
+    batch = network.predict(X)
+    single = network.predict(X[0])
+
+    assert batch.shape == (4, 1)
+    assert single.shape == (1, 1)
+    assert batch.dtype == np.float32
+    np.testing.assert_allclose(single[0], batch[0], rtol=1e-5)
+
+
+def test_predict_rejects_the_wrong_feature_count():
+    with pytest.raises(ValueError, match="Expected 201 features"):
+        _network().predict(np.zeros(3073))
+
+
+def test_saved_network_predicts_the_same(tmp_path):
+    network = _network()
+    path = str(tmp_path / "network.npz")
+    network.save(path)
+    X = np.random.default_rng(2).normal(size=(3, 201))
+    np.testing.assert_array_equal(DenseNetwork.load(path).predict(X), network.predict(X))
+
+
+def test_shipped_weights_match_keras_reference_outputs():
+    # Inputs and outputs recorded from Keras with models/neural_network.keras
+    reference = np.load(os.path.join(os.path.dirname(__file__), "data", "idea_fit_reference.npz"))
+
+    network = load_idea_fit_model(DEFAULT_NPZ_PATH)
+
+    assert isinstance(network, DenseNetwork)
+    np.testing.assert_allclose(network.predict(reference["inputs"]), reference["outputs"], atol=1e-5)
+
+
+def test_missing_weights_without_tensorflow_fail_loudly(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "tensorflow", None)
+    with pytest.raises(RuntimeError, match="idea_fit_model.py"):
+        load_idea_fit_model(str(tmp_path / "missing.npz"))
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from pydantic import BaseModel
+
+from utils.llm_backend import LatencyModel, RecordingBackend, RecordingStore, ReplayBackend, ReplayMissError
+from utils.llm_metrics import capture_llm_calls
+from utils.model_routing import ModelRoute, ModelRouter
+from utils.openai_api import OpenAIAPI
+
+
+class Verdict(BaseModel):
+    score: int
+    reason: str
+
+
+def test_recorded_responses_are_replayed_in_order_and_wrap_around(tmp_path):
+    store = RecordingStore(str(tmp_path / "recordings.jsonl"))
+    store.append("k", "completion", "gpt-4o", {}, "first", latency=0.1)
+    store.append("k", "completion", "gpt-4o", {}, "second", latency=0.2)
+
+    replayed = RecordingStore(str(tmp_path / "recordings.jsonl"))
+    assert [replayed.next("k")["response"] for _ in range(3)] == ["first", "second", "first"]
+    with pytest.raises(ReplayMissError):
+        replayed.next("unknown")
+
+
+def test_torn_last_recording_is_skipped(tmp_path):
+    path = tmp_path / "recordings.jsonl"
+    RecordingStore(str(path)).append("k", "completion", "gpt-4o", {}, "kept")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "torn", "resp')
+
+    store = RecordingStore(str(path))
+    assert len(store) == 1 and "torn" not in store
+
+
+def test_latency_models():
+    assert LatencyModel("none").sample(3.0) == 0.0
+    assert LatencyModel("recorded", scale=2.0).sample(1.5) == 3.0
+    assert LatencyModel("fixed:0.25").sample(3.0) == 0.25
+    samples = [LatencyModel("lognormal:1.5,0.4", seed=7).sample() for _ in range(2)]
+    assert samples[0] == samples[1] > 0
+    with pytest.raises(ValueError):
+        LatencyModel("fixed")
+
+
+def test_record_then_replay_round_trip(mock_openai, tmp_path):
+    router = ModelRouter({"Test.rate": ModelRoute("gpt-4o-mini")})
+    store = RecordingStore(str(tmp_path / "recordings.jsonl"))
+    recorder = RecordingBackend(OpenAIAPI("gpt-4o", router=router), store)
+
+    with capture_llm_calls() as live_calls:
+        completion = recorder.get_completion("You rate things.", "Rate this.", call_site="Test.rate")
+        verdict = recorder.get_structured_output(Verdict, "Rate this.", "You rate things.", call_site="Test.rate")
+        streamed = "".join(recorder.get_completion_stream("You write.", "Write this.", call_site="Test.write"))
+        embeddings = recorder.get_embeddings_batch(["founder", "startup"], call_site="Test.embed")
+
+    replay = ReplayBackend("gpt-4o", RecordingStore(store.path), LatencyModel("none"), router=router)
+    with capture_llm_calls() as replayed_calls:
+        assert replay.get_completion("You rate things.", "Rate this.", call_site="Test.rate") == completion
+        assert replay.get_structured_output(Verdict, "Rate this.", "You rate things.", call_site="Test.rate") == verdict
+        assert "".join(replay.get_completion_stream("You write.", "Write this.", call_site="Test.write")) == streamed
+        np.testing.assert_array_equal(replay.get_embeddings("startup", call_site="Test.embed"), embeddings[1])
+
+    assert [c["model"] for c in replayed_calls[:2]] == ["gpt-4o-mini", "gpt-4o-mini"]
+    assert replayed_calls[0]["prompt_tokens"] == live_calls[0]["prompt_tokens"] > 0
+
+
+def test_recordings_do_not_replay_under_other_routes(mock_openai, tmp_path):
+    store = RecordingStore(str(tmp_path / "recordings.jsonl"))
+    mini = ModelRouter({"*": ModelRoute("gpt-4o-mini")})
+    RecordingBackend(OpenAIAPI("gpt-4o", router=mini), store).get_completion("You rate things.", "Rate this.", call_site="Test.rate")
+
+    replay = ReplayBackend("gpt-4o", store, LatencyModel("none"), router=ModelRouter())
+    with pytest.raises(ReplayMissError):
+        replay.get_completion("You rate things.", "Rate this.", call_site="Test.rate")
+    assert ReplayBackend("gpt-4o", store, LatencyModel("none"), router=mini).get_completion(
+        "You rate things.", "Rate this.", call_site="Test.rate"
+    ).startswith("Mock response")
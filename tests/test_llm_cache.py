@@ -0,0 +1,52 @@
+import time
+
+from utils.llm_cache import LLMCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, "time", clock)
+    cache = LLMCache(str(tmp_path / "cache.db"), ttl=60)
+    cache.set("k", "chat", "v")
+
+    clock.now += 59
+    assert cache.get("k") == "v"
+    clock.now += 2
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, "time", clock)
+    cache = LLMCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.set("a", "chat", "1")
+    clock.now += 1
+    cache.set("b", "chat", "2")
+    clock.now += 1
+    assert cache.get("a") == "1"
+    clock.now += 1
+    cache.set("c", "chat", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = LLMCache(path)
+    cache.set("k", "chat", "v")
+    cache.close()
+
+    assert LLMCache(path).get("k") == "v"
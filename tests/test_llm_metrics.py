@@ -0,0 +1,90 @@
+import sys
+import types
+
+from utils.llm_metrics import capture_llm_calls, infer_call_site, record_llm_call, register_wrapper_module
+from utils.openai_api import OpenAIAPI
+
+STARTUP = "Turismocity is a travel search engine for Latin America. Eugenio Fage is the CTO."
+
+
+class Agent:
+    def __init__(self, api=None):
+        self.api = api
+
+    def where(self):
+        return infer_call_site()
+
+    def ask(self):
+        return self.api.get_completion("You rate things.", "Rate this.")
+
+
+def plain_function():
+    return infer_call_site()
+
+
+def test_call_site_names_the_calling_method_or_function():
+    assert Agent().where() == "Agent.where"
+    assert plain_function() == "plain_function"
+
+
+def test_call_site_skips_frames_of_wrapper_modules(monkeypatch):
+    wrapper = types.ModuleType("tests.fake_llm_wrapper")
+    exec("from utils.llm_metrics import infer_call_site\ndef call():\n    return infer_call_site()", wrapper.__dict__)
+    monkeypatch.setitem(sys.modules, wrapper.__name__, wrapper)
+
+    def caller():
+        return wrapper.call()
+
+    assert caller() == "call"
+    register_wrapper_module(wrapper.__name__)
+    assert caller() == "caller"
+
+
+def test_api_calls_are_recorded_under_the_agent_method(mock_openai):
+    with capture_llm_calls() as calls:
+        Agent(OpenAIAPI("gpt-4o-mini")).ask()
+
+    assert [c["call_site"] for c in calls] == ["Agent.ask"]
+    assert calls[0]["prompt_tokens"] > 0
+    assert calls[0]["completion_tokens"] > 0
+
+
+def test_nested_captures_also_report_to_the_outer_collection():
+    with capture_llm_calls() as outer:
+        record_llm_call("gpt-4o-mini", "Agent.outer", "completion", 0.1)
+        with capture_llm_calls() as inner:
+            record_llm_call("gpt-4o-mini", "Agent.inner", "completion", 0.2)
+
+    assert [c["call_site"] for c in inner] == ["Agent.inner"]
+    assert [c["call_site"] for c in outer] == ["Agent.outer", "Agent.inner"]
+
+
+def test_graph_reports_the_llm_calls_of_each_node(mock_openai, local_corpus):
+    from graph import SSFFGraph
+
+    requests = len(mock_openai.requests)
+    llm_calls = SSFFGraph().run_analysis(STARTUP, "advanced")["LLM Calls"]
+
+    assert {node: summary["calls"] for node, summary in llm_calls.items()} == {
+        "parse": 1,
+        "market": 3,
+        "product": 3,
+        "founder": 3,
+        "vc_scout": 1,
+        "integration": 3,
+    }
+    agents = {
+        "parse": "VCScoutAgent.",
+        "market": "MarketAgent.",
+        "product": "ProductAgent.",
+        "founder": "FounderAgent.",
+        "vc_scout": "VCScoutAgent.",
+        "integration": "IntegrationAgent.",
+    }
+    for node, summary in llm_calls.items():
+        records = summary["records"]
+        assert all(r["call_site"].startswith(agents[node]) for r in records)
+        assert summary["prompt_tokens"] == sum(r["prompt_tokens"] for r in records) > 0
+        assert summary["completion_tokens"] == sum(r["completion_tokens"] for r in records) > 0
+    # Every request the mock answered is attributed to exactly one node
+    assert sum(s["calls"] for s in llm_calls.values()) == len(mock_openai.requests) - requests
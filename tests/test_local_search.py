@@ -0,0 +1,70 @@
+import os
+import sys
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.local_search import LocalSearchIndex
+
+
+def test_relative_index_path_inside_corpus_is_not_indexed(tmp_path, monkeypatch):
+    (tmp_path / "report.txt").write_text("Fintech payments market report", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    index = LocalSearchIndex(".", "index.json")
+    index.update()
+    index.update()
+
+    assert list(index.files) == ["report.txt"]
+
+
+def test_file_deleted_during_update_is_skipped(tmp_path, monkeypatch):
+    (tmp_path / "report.txt").write_text("Fintech payments market report", encoding="utf-8")
+    (tmp_path / "gone.txt").write_text("Deleted between walk and stat", encoding="utf-8")
+    stat = os.stat
+
+    def racing_stat(path, *args, **kwargs):
+        if str(path).endswith("gone.txt"):
+            raise FileNotFoundError(path)
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", racing_stat)
+    index = LocalSearchIndex(str(tmp_path), str(tmp_path / "index.json"))
+
+    assert index.update() == {"added": 1, "updated": 0, "removed": 0}
+    assert index.search("fintech")[0]["title"]
+
+
+def test_update_reindexes_only_added_changed_and_removed_files(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "payments.txt").write_text("Stripe dominates online payments", encoding="utf-8")
+    (corpus / "travel.txt").write_text("Turismocity compares flight prices", encoding="utf-8")
+    index = LocalSearchIndex(str(corpus), str(tmp_path / "index.json"))
+
+    assert index.update() == {"added": 2, "updated": 0, "removed": 0}
+    assert index.update() == {"added": 0, "updated": 0, "removed": 0}
+    assert [r["snippet"] for r in index.search("stripe")] == ["Stripe dominates online payments"]
+
+    (corpus / "payments.txt").write_text("Adyen wins enterprise payments from competitors", encoding="utf-8")
+    (corpus / "travel.txt").unlink()
+    (corpus / "health.md").write_text("Oura ring tracks sleep", encoding="utf-8")
+
+    assert index.update() == {"added": 1, "updated": 1, "removed": 1}
+    assert index.search("stripe") == []
+    assert index.search("flight") == []
+    assert index.search("adyen")[0]["snippet"] == "Adyen wins enterprise payments from competitors"
+    assert index.search("sleep")[0]["snippet"] == "Oura ring tracks sleep"
+
+
+def test_saved_index_is_reused_by_a_new_process(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "payments.txt").write_text("Stripe dominates online payments", encoding="utf-8")
+    LocalSearchIndex(str(corpus), str(tmp_path / "index.json")).update()
+
+    index = LocalSearchIndex(str(corpus), str(tmp_path / "index.json"))
+
+    assert index.update() == {"added": 0, "updated": 0, "removed": 0}
+    assert index.search("payments")[0]["position"] == 1
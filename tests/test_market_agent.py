@@ -0,0 +1,44 @@
+from collections import Counter
+
+from agents.market_agent import MarketAgent
+from utils.llm_metrics import capture_llm_calls
+
+STARTUP = {
+    "name": "Turismocity",
+    "description": "Travel search engine for Latin America",
+    "market_size": "Large",
+    "competition": "Despegar, Kayak",
+}
+
+
+def analyze(mode):
+    agent = MarketAgent("gpt-4o-mini")
+    with capture_llm_calls() as calls:
+        result = agent.analyze(STARTUP, mode)
+    return result, Counter(c["call_site"] for c in calls)
+
+
+def test_advanced_mode_makes_no_basic_analysis_call(mock_openai, fake_serpapi):
+    result, calls = analyze("advanced")
+
+    assert result is not None
+    assert calls == {
+        "MarketAgent._generate_keywords": 1,
+        "MarketAgent._write_market_report": 1,
+        "MarketAgent.analyze": 1,
+    }
+    assert len(fake_serpapi.queries) == 1
+
+
+def test_natural_language_mode_researches_once(mock_openai, fake_serpapi):
+    result, calls = analyze("natural_language_advanced")
+
+    assert result["analysis"] and result["external_report"]
+    # One keyword call and one search feed both the report and the synthesis
+    assert calls == {
+        "MarketAgent._generate_keywords": 1,
+        "MarketAgent._write_market_report": 1,
+        "MarketAgent._synthesize_knowledge": 1,
+        "MarketAgent.analyze": 1,
+    }
+    assert len(fake_serpapi.queries) == 1
@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+
+from utils.model_routing import ModelRoute, ModelRouter, parse_model_routes
+from utils.openai_api import OpenAIAPI
+from utils.llm_metrics import capture_llm_calls
+
+
+class Verdict(BaseModel):
+    score: int
+    reason: str
+
+
+def test_parse_model_routes():
+    routes = parse_model_routes("MarketAgent._generate_keywords=gpt-4o-mini, VCScoutAgent=gpt-4o:20:gpt-4o-mini,*=gpt-4o::")
+    assert routes["MarketAgent._generate_keywords"] == ModelRoute("gpt-4o-mini")
+    assert routes["VCScoutAgent"] == ModelRoute("gpt-4o", 20.0, "gpt-4o-mini")
+    assert routes["*"] == ModelRoute("gpt-4o")
+
+
+def test_most_specific_route_wins():
+    router = ModelRouter(parse_model_routes("MarketAgent._search=a,MarketAgent=b,*=c"))
+    assert router.route("MarketAgent._search", "default").model == "a"
+    assert router.route("MarketAgent.analyze", "default").model == "b"
+    assert router.route("ProductAgent.analyze", "default").model == "c"
+    assert ModelRouter().route("ProductAgent.analyze", "default").model == "default"
+
+
+def test_structured_output_refusal_falls_back(mock_openai):
+    router = ModelRouter({"*": ModelRoute("mock-refuse", None, "gpt-4o-mini")})
+    api = OpenAIAPI("gpt-4o", router=router)
+    with capture_llm_calls() as calls:
+        verdict = api.get_structured_output(Verdict, "Rate this.", "You rate things.", call_site="Test.rate")
+    assert isinstance(verdict, Verdict)
+    assert [call["model"] for call in calls] == ["mock-refuse", "gpt-4o-mini"]
+
+
+def test_structured_output_refusal_without_fallback_returns_none(mock_openai):
+    api = OpenAIAPI("gpt-4o", router=ModelRouter({"*": ModelRoute("mock-refuse")}))
+    assert api.get_structured_output(Verdict, "Rate this.", "You rate things.", call_site="Test.rate") is None
@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import contextvars
+
+import numpy as np
+import pytest
+from pydantic import BaseModel
+
+from utils import mock_openai_server
+from utils.config import Config
+from utils.embedding_store import EmbeddingStore
+from utils.llm_cache import LLMCache
+from utils.openai_api import OpenAIAPI, _get_background_loop, iter_sync, run_async, run_sync
+
+request_id: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+
+
+@pytest.fixture
+def embedding_requests(mock_openai, monkeypatch):
+    """
+    Inputs of every /v1/embeddings request that reaches the mock, one list per request.
+    """
+    requests = []
+    embed = mock_openai_server._HANDLERS["/v1/embeddings"]
+
+    def record(body):
+        requests.append(list(body["input"]) if isinstance(body["input"], list) else [body["input"]])
+        return embed(body)
+
+    monkeypatch.setitem(mock_openai_server._HANDLERS, "/v1/embeddings", record)
+    return requests
+
+
+class Verdict(BaseModel):
+    score: int
+    reason: str
+
+
+def test_run_sync_runs_on_the_background_loop_with_the_callers_context():
+    async def where():
+        return threading.current_thread().name, request_id.get()
+
+    request_id.set("run-1")
+    assert run_sync(where()) == ("openai-api-loop", "run-1")
+
+
+def test_run_sync_refuses_to_block_the_background_loop():
+    async def nested():
+        coro = asyncio.sleep(0)
+        try:
+            run_sync(coro)
+        finally:
+            coro.close()
+
+    with pytest.raises(RuntimeError, match="await the coroutine instead"):
+        run_sync(nested())
+
+
+def test_run_async_awaits_from_another_loop_and_from_the_background_loop():
+    async def value():
+        return asyncio.get_running_loop()
+
+    async def from_caller_loop():
+        return await run_async(value())
+
+    async def from_background_loop():
+        return await run_async(value())
+
+    assert asyncio.run(from_caller_loop()) is _get_background_loop()
+    assert run_sync(from_background_loop()) is _get_background_loop()
+
+
+def test_iter_sync_yields_in_order_and_raises_errors():
+    async def numbers():
+        for i in range(3):
+            await asyncio.sleep(0)
+            yield i
+        raise ValueError("stream broke")
+
+    received = []
+    with pytest.raises(ValueError, match="stream broke"):
+        for item in iter_sync(numbers()):
+            received.append(item)
+    assert received == [0, 1, 2]
+
+
+def test_closing_iter_sync_early_cancels_the_generator():
+    finished = threading.Event()
+
+    async def endless():
+        try:
+            while True:
+                yield "chunk"
+                await asyncio.sleep(0.01)
+        finally:
+            finished.set()
+
+    iterator = iter_sync(endless())
+    assert next(iterator) == "chunk"
+    iterator.close()
+    assert finished.wait(5)
+
+
+def test_sync_wrappers_work_inside_a_running_event_loop(mock_openai):
+    api = OpenAIAPI("gpt-4o-mini")
+
+    async def caller():
+        # e.g. a Streamlit callback or a notebook cell with a running loop
+        return (
+            api.get_completion("You rate things.", "Rate this.", call_site="Test.sync"),
+            api.get_structured_output(Verdict, "Rate this.", "You rate things.", call_site="Test.sync"),
+            list(api.get_completion_stream("You rate things.", "Rate this.", call_site="Test.sync")),
+        )
+
+    completion, verdict, chunks = asyncio.run(caller())
+    assert completion.startswith("Mock response")
+    assert isinstance(verdict, Verdict)
+    assert "".join(chunks) == completion
+
+
+def test_async_methods_run_concurrently_from_the_callers_loop(mock_openai):
+    api = OpenAIAPI("gpt-4o-mini")
+
+    async def caller():
+        return await asyncio.gather(
+            api.get_completion_async("You rate things.", "Rate this.", call_site="Test.async"),
+            api.get_structured_output_async(Verdict, "Rate this.", "You rate things.", call_site="Test.async"),
+            api.get_embeddings_async("founder", call_site="Test.async"),
+            api.get_embeddings_batch_async(["founder", "startup"], call_site="Test.async"),
+        )
+
+    completion, verdict, embedding, embeddings = asyncio.run(caller())
+    assert completion.startswith("Mock response")
+    assert isinstance(verdict, Verdict)
+    assert embedding.shape == (api.embedding_dimensions,)
+    assert embeddings.shape == (2, api.embedding_dimensions)
+    np.testing.assert_allclose(embeddings[0], embedding)
+
+
+def test_embeddings_batch_is_sent_in_chunks_and_keeps_input_order(embedding_requests, monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_BATCH_SIZE", 2)
+    api = OpenAIAPI("gpt-4o-mini")
+    texts = ["alpha", "beta", "gamma", "alpha", "delta", "epsilon"]
+
+    embeddings = api.get_embeddings_batch(texts, call_site="Test.batch")
+
+    # Duplicates are embedded once; five distinct texts need three requests
+    assert sorted(embedding_requests) == [["alpha", "beta"], ["epsilon"], ["gamma", "delta"]]
+    assert embeddings.shape == (len(texts), api.embedding_dimensions)
+    for text, row in zip(texts, embeddings):
+        np.testing.assert_allclose(row, api.get_embeddings(text, call_site="Test.batch"), rtol=1e-6)
+
+
+def test_embeddings_batch_only_sends_texts_missing_from_the_store(embedding_requests, tmp_path):
+    expected = OpenAIAPI("gpt-4o-mini").get_embeddings_batch(["founder", "market", "startup"], call_site="Test.batch")
+    store = EmbeddingStore(str(tmp_path))
+    api = OpenAIAPI("gpt-4o-mini", embedding_store=store)
+    store.put_many(Config.EMBEDDING_MODEL, Config.EMBEDDING_DIMENSIONS, ["founder", "startup"], expected[[0, 2]])
+    embedding_requests.clear()
+
+    embeddings = api.get_embeddings_batch(["founder", "market", "startup"], call_site="Test.batch")
+
+    assert embedding_requests == [["market"]]
+    assert (store.hits, store.misses) == (2, 1)
+    np.testing.assert_allclose(embeddings, expected, rtol=1e-6)
+
+    # Everything is stored now, so a repeat makes no request
+    embedding_requests.clear()
+    api.get_embeddings_batch(["startup", "market"], call_site="Test.batch")
+    assert embedding_requests == []
+
+
+def test_completion_stream_yields_chunks_in_order(mock_openai):
+    api = OpenAIAPI("gpt-4o-mini")
+
+    chunks = list(api.get_completion_stream("You rate things.", "Rate this startup.", call_site="Test.stream"))
+
+    assert chunks[:3] == ["Mock ", "response ", "to "]
+    assert "".join(chunks) == api.get_completion("You rate things.", "Rate this startup.", call_site="Test.stream")
+
+
+def test_cached_completion_streams_as_one_chunk(mock_openai, tmp_path):
+    api = OpenAIAPI("gpt-4o-mini", cache=LLMCache(str(tmp_path / "cache.db")))
+
+    streamed = list(api.get_completion_stream("You rate things.", "Rate this cached startup.", call_site="Test.stream"))
+    cached = list(api.get_completion_stream("You rate things.", "Rate this cached startup.", call_site="Test.stream"))
+
+    assert len(streamed) > 1
+    assert cached == ["".join(streamed)]
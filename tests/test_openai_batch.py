@@ -0,0 +1,54 @@
+import time
+
+from pydantic import BaseModel
+
+from agents.founder_agent import FounderAgent
+from utils.llm_metrics import capture_llm_calls
+from utils.openai_api import OpenAIAPI
+from utils.openai_batch import BatchSession, run_concurrently
+
+
+class Verdict(BaseModel):
+    score: int
+    reason: str
+
+
+def _part(api: OpenAIAPI, name: str, i: int) -> Verdict:
+    # Staggered so that a session flushing on the first request would leave the others out
+    time.sleep(0.1 * i)
+    return api.get_structured_output(Verdict, f"{name} part {i}", "Rate it.", call_site="Test.part")
+
+
+def _pipeline(api: OpenAIAPI, name: str) -> list[Verdict]:
+    # Three independent requests, then one that depends on them
+    first = run_concurrently([lambda i=i: _part(api, name, i) for i in range(3)])
+    return first + [api.get_structured_output(Verdict, f"{name} summary", "Rate it.", call_site="Test.summary")]
+
+
+def test_concurrent_sub_tasks_share_batch_jobs(mock_openai):
+    api = OpenAIAPI("gpt-4o-mini")
+    session = BatchSession(poll_interval=0.01)
+    results = session.run([lambda name=name: _pipeline(api, name) for name in ("a", "b", "c")])
+    assert all(len(result) == 4 and all(isinstance(v, Verdict) for v in result) for result in results)
+    # One job for the concurrent stage of every pipeline, one for the summaries
+    assert session.batches_submitted == 2
+    assert session.requests_submitted == 12
+
+
+def test_run_concurrently_outside_a_session_keeps_order_and_context():
+    with capture_llm_calls() as outer:
+        results = run_concurrently([lambda i=i: i * i for i in range(5)])
+    assert results == [0, 1, 4, 9, 16]
+    assert outer == []
+
+
+def test_founder_sub_tasks_keep_their_call_sites(mock_openai):
+    agent = FounderAgent("gpt-4o-mini")
+    with capture_llm_calls() as calls:
+        analysis = agent.analyze({"founder_backgrounds": "MBA", "description": "AI wearable"}, "advanced")
+    assert analysis.segmentation == 5
+    assert sorted(call["call_site"] for call in calls) == [
+        "FounderAgent.analyze",
+        "FounderAgent.calculate_idea_fit",
+        "FounderAgent.segment_founder",
+    ]
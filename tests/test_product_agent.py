@@ -0,0 +1,71 @@
+import os
+import sys
+import threading
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import pytest
+
+STARTUP = {"name": "Turismocity", "product_details": "Flight price comparison"}
+
+
+class RecordingSearch:
+    """Search API stand-in that records the queries it is asked."""
+
+    def __init__(self):
+        self.queries = []
+        self.news_searched = threading.Event()
+
+    def search_many(self, queries, num_results=5, max_workers=None):
+        self.queries.extend(queries)
+        if "Turismocity News" in queries:
+            self.news_searched.set()
+        return [[{"title": q, "link": f"https://example.com/{i}/{q}", "snippet": f"About {q}"}] for i, q in enumerate(queries)]
+
+
+@pytest.fixture
+def agent(mock_openai, local_corpus):
+    from agents.product_agent import ProductAgent
+    agent = ProductAgent("gpt-4o-mini")
+    agent.search_api = RecordingSearch()
+    return agent
+
+
+def test_news_search_runs_while_keywords_are_generated(agent):
+    def generate_keywords(startup_info):
+        # Only returns once the news search has started without the keywords
+        assert agent.search_api.news_searched.wait(5)
+        return "- Turismocity\n- Turismocity vs Kayak"
+
+    agent._generate_keywords = generate_keywords
+
+    report = agent._get_external_knowledge(STARTUP)
+
+    assert report
+    assert agent.search_api.queries == ["Turismocity News", "Turismocity", "Turismocity vs Kayak"]
+
+
+def test_given_keywords_are_searched_with_the_news_query(agent):
+    agent._get_external_knowledge(STARTUP, "Turismocity, Turismocity flights")
+
+    assert agent.search_api.queries == ["Turismocity News", "Turismocity", "Turismocity flights"]
+
+
+@pytest.mark.parametrize("keywords, expected", [
+    ('- "Stripe"\n- Stripe payments API\n* Stripe vs Adyen', ["Stripe", "Stripe payments API", "Stripe vs Adyen"]),
+    ("1. Stripe\n2) Stripe Billing\n\n3. stripe", ["Stripe", "Stripe Billing"]),
+    ("Stripe, Stripe Radar、「Stripe Atlas」", ["Stripe", "Stripe Radar", "Stripe Atlas"]),
+    ("", []),
+    (None, []),
+])
+def test_parse_keywords(keywords, expected):
+    from agents.product_agent import ProductAgent
+    assert ProductAgent._parse_keywords(keywords) == expected
+
+
+def test_parse_keywords_keeps_at_most_limit():
+    from agents.product_agent import ProductAgent
+    keywords = "\n".join(f"- Stripe {i}" for i in range(8))
+    assert ProductAgent._parse_keywords(keywords) == [f"Stripe {i}" for i in range(5)]
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+
+from utils.openai_api import OpenAIAPI
+from utils.rate_limiter import RateLimitExceededError, RateLimitScheduler, parse_rate_limits
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits("gpt-4o=500:30000, gpt-4o-mini=:200000,*=60:") == {
+        "gpt-4o": (500, 30000),
+        "gpt-4o-mini": (None, 200000),
+        "*": (60, None),
+    }
+
+
+def test_scheduler_works_across_event_loops():
+    # 6000 requests per minute refill one request every 10ms
+    scheduler = RateLimitScheduler({"*": (6000, None)})
+
+    async def call():
+        return "ok"
+
+    async def send():
+        # With an empty bucket the requests queue on the model's lock
+        scheduler._budget("gpt-4o").requests.available = 0
+        return await asyncio.gather(*[scheduler.run("gpt-4o", 10, call) for _ in range(3)])
+
+    # Separate asyncio.run() calls, as in tests or Streamlit reruns
+    assert asyncio.run(send()) == ["ok"] * 3
+    assert asyncio.run(send()) == ["ok"] * 3
+
+
+def test_request_budget_is_shared_across_event_loops():
+    # 120 requests per minute: the bucket starts full and refills 2 per second
+    scheduler = RateLimitScheduler({"gpt-4o": (120, None)})
+    scheduler._budget("gpt-4o").requests.available = 1
+
+    async def call():
+        return None
+
+    asyncio.run(scheduler.run("gpt-4o", 1, call))
+    start = time.monotonic()
+    asyncio.run(scheduler.run("gpt-4o", 1, call))
+    assert time.monotonic() - start >= 0.4
+
+
+def _rate_limit_error(code=None) -> openai.RateLimitError:
+    response = httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return openai.RateLimitError("Rate limited", response=response, body={"code": code})
+
+
+def test_rate_limit_raises_typed_error_once_retries_run_out():
+    scheduler = RateLimitScheduler(max_retries=2, base_delay=0.001)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        raise _rate_limit_error()
+
+    with pytest.raises(RateLimitExceededError, match="after 2 retries"):
+        asyncio.run(scheduler.run("gpt-4o", 10, call))
+    assert calls == 3
+
+
+def test_insufficient_quota_is_not_retried():
+    scheduler = RateLimitScheduler(max_retries=5, base_delay=0.001)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        raise _rate_limit_error("insufficient_quota")
+
+    with pytest.raises(RateLimitExceededError, match="no quota"):
+        asyncio.run(scheduler.run("gpt-4o", 10, call))
+    assert calls == 1
+
+
+def test_api_raises_instead_of_returning_none_without_quota(mock_openai):
+    sent = len(mock_openai.requests)
+    api = OpenAIAPI("mock-no-quota", scheduler=RateLimitScheduler(max_retries=3, base_delay=0.001))
+
+    with pytest.raises(RateLimitExceededError):
+        api.get_completion("You rate things.", "Rate this.", call_site="Test.rate")
+    assert mock_openai.requests[sent:] == [("POST", "/v1/chat/completions")]
@@ -0,0 +1,67 @@
+import threading
+import concurrent.futures
+
+import pytest
+
+from utils.search_broker import SearchBroker
+
+STARTUP = "Turismocity is a travel search engine for Latin America. Eugenio Fage is the CTO and co-founder."
+
+
+def test_concurrent_identical_searches_make_one_external_call():
+    broker = SearchBroker()
+    started = threading.Barrier(4)
+    calls = 0
+
+    def fetch():
+        nonlocal calls
+        calls += 1
+        broker.record_external_call()
+        return [{"title": "Acme"}]
+
+    def search(query):
+        started.wait()
+        return broker.search(query, 5, fetch)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(search, ["Acme News", "acme news", " ACME  news", "Acme News"]))
+
+    assert calls == 1
+    assert results == [[{"title": "Acme"}]] * 4
+    assert broker.stats() == {"searches": 4, "deduplicated": 3, "external_calls": 1}
+
+
+def test_failed_search_is_retried_by_a_later_search():
+    broker = SearchBroker()
+
+    def fail():
+        raise RuntimeError("SerpAPI down")
+
+    with pytest.raises(RuntimeError):
+        broker.search("acme", 5, fail)
+    assert broker.search("acme", 5, lambda: [{"title": "Acme"}]) == [{"title": "Acme"}]
+    assert broker.stats()["deduplicated"] == 0
+
+
+def test_search_counts_reach_the_graph_results(mock_openai, fake_serpapi):
+    from graph import SSFFGraph
+
+    result = SSFFGraph().run_analysis(STARTUP, "advanced")
+
+    search_calls = result["Search Calls"]
+    # Every search of the run is counted once, and only distinct ones reach SerpAPI
+    assert search_calls["external_calls"] == len(fake_serpapi.queries) > 0
+    assert search_calls["searches"] == search_calls["external_calls"] + search_calls["deduplicated"]
+    assert len(set(q.lower() for q in fake_serpapi.queries)) == len(fake_serpapi.queries)
+
+
+def test_each_run_gets_its_own_broker(mock_openai, fake_serpapi):
+    from graph import SSFFGraph
+
+    graph = SSFFGraph()
+    first = graph.run_analysis(STARTUP, "advanced")["Search Calls"]
+    second = graph.run_analysis(STARTUP, "advanced")["Search Calls"]
+
+    # The second run searches again instead of reusing the first run's results
+    assert second == first
+    assert len(fake_serpapi.queries) == 2 * first["external_calls"]
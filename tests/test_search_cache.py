@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from utils.search_broker import SearchBroker, current_search_broker
+from utils.search_cache import SearchCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Fetcher:
+    """Returns a new result list on every call and counts provider calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        broker = current_search_broker()
+        if broker is not None:
+            broker.record_external_call()
+        return [{"title": f"result {self.calls}"}]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, "time", clock)
+    return clock
+
+
+def _wait_for_refreshes(cache: SearchCache) -> None:
+    cache._executor.shutdown(wait=True)
+
+
+def test_fresh_entries_are_served_from_cache(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "search.db"), ttl=60, stale_ttl=600)
+    fetch = Fetcher()
+
+    assert cache.get_or_fetch("google", "Acme  News", 5, fetch) == [{"title": "result 1"}]
+    clock.now += 59
+    assert cache.get_or_fetch("google", "acme news", 5, fetch) == [{"title": "result 1"}]
+
+    assert fetch.calls == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_stale_entries_are_served_then_refreshed_in_background(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "search.db"), ttl=60, stale_ttl=600)
+    fetch = Fetcher()
+    cache.get_or_fetch("google", "acme news", 5, fetch)
+
+    clock.now += 120
+    assert cache.get_or_fetch("google", "acme news", 5, fetch) == [{"title": "result 1"}]
+    _wait_for_refreshes(cache)
+
+    assert fetch.calls == 2
+    assert cache.get_or_fetch("google", "acme news", 5, fetch) == [{"title": "result 2"}]
+    assert cache.stats() == {"hits": 1, "stale_hits": 1, "misses": 1, "refreshes": 1, "entries": 1}
+
+
+def test_expired_entries_are_fetched_in_the_foreground(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "search.db"), ttl=60, stale_ttl=600)
+    fetch = Fetcher()
+    cache.get_or_fetch("google", "acme news", 5, fetch)
+
+    clock.now += 661
+    assert cache.get_or_fetch("google", "acme news", 5, fetch) == [{"title": "result 2"}]
+    assert cache.stats()["misses"] == 2 and cache.stats()["refreshes"] == 0
+
+
+def test_background_refresh_is_counted_by_the_runs_broker(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "search.db"), ttl=60, stale_ttl=600)
+    fetch = Fetcher()
+    cache.get_or_fetch("google", "acme news", 5, fetch)
+    clock.now += 120
+
+    with SearchBroker().activate() as broker:
+        cache.get_or_fetch("google", "acme news", 5, fetch)
+    _wait_for_refreshes(cache)
+
+    assert broker.stats()["external_calls"] == 1
@@ -0,0 +1,53 @@
+from agents.product_agent import PRODUCT_EVIDENCE_TEMPLATE
+from utils.search_evidence import SearchResult, assemble_evidence, to_search_results
+
+
+def test_sitelinks_are_rendered_as_related_pages():
+    result = SearchResult.from_serpapi({
+        "title": "Acme raises Series A",
+        "snippet": "Acme raised $10M.",
+        "source": "TechCrunch",
+        "sitelinks": {"expanded": [
+            {"title": "Pricing", "snippet": "Plans from $10"},
+            {"title": "No snippet"},
+            {"title": "Team", "snippet": "Founded by two engineers"},
+            {"title": "Blog", "snippet": "Product updates"},
+            {"title": "Careers", "snippet": "We are hiring"},
+        ]},
+    })
+    assert result.sitelinks == (
+        ("Pricing", "Plans from $10"),
+        ("Team", "Founded by two engineers"),
+        ("Blog", "Product updates"),
+    )
+    assert result.format(PRODUCT_EVIDENCE_TEMPLATE) == (
+        "\nSource: TechCrunch\nTitle: Acme raises Series A\nSummary: Acme raised $10M."
+        "\nRelated pages:\n- Pricing: Plans from $10\n- Team: Founded by two engineers\n- Blog: Product updates\n"
+    )
+
+
+def test_result_without_sitelinks_has_no_related_pages():
+    [result] = to_search_results([{"title": "t", "snippet": "s", "source": "src"}])
+    assert assemble_evidence([result], PRODUCT_EVIDENCE_TEMPLATE) == "\nSource: src\nTitle: t\nSummary: s\n"
+
+
+def _result(snippet: str) -> SearchResult:
+    return SearchResult(title="t", snippet=snippet, source="src")
+
+
+def test_near_duplicate_snippets_are_skipped():
+    results = [
+        _result("Acme raised $10M in a Series A led by Sequoia."),
+        _result("Acme raised $10M in a Series A led by Sequoia!"),
+        _result("Acme launches its payments API in Japan."),
+    ]
+    evidence = assemble_evidence(results, "{snippet}\n", token_budget=1000, similarity_threshold=0.8)
+    assert evidence == "Acme raised $10M in a Series A led by Sequoia.\nAcme launches its payments API in Japan.\n"
+
+
+def test_assembly_stops_before_the_token_budget():
+    results = [_result(f"Result number {i} " + "x" * 30) for i in range(10)]
+    evidence = assemble_evidence(results, "{snippet}\n", token_budget=30, similarity_threshold=1.1)
+    # Each entry is about 12 tokens, so two fit and the third would exceed the budget
+    assert evidence.count("Result number") == 2
+    assert evidence.startswith("Result number 0 ")
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import concurrent.futures
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+
+def test_concurrent_identical_calls_are_coalesced():
+    flight = SingleFlight()
+    started = 0
+
+    async def call():
+        nonlocal started
+        started += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", call) for _ in range(3)))
+
+    results = asyncio.run(main())
+
+    assert started == 1
+    assert sorted(results, key=lambda r: r[1]) == [("result", False), ("result", True), ("result", True)]
+    assert flight.stats() == {"calls": 1, "deduplicated": 2, "in_flight": 0}
+
+
+def test_key_is_released_after_the_call_finishes():
+    flight = SingleFlight()
+
+    async def call():
+        return "result"
+
+    async def main():
+        await flight.do("key", call)
+        return await flight.do("key", call)
+
+    assert asyncio.run(main()) == ("result", False)
+    assert flight.calls == 2
+
+
+def test_exceptions_are_shared_with_every_caller():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", call) for _ in range(2)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_cancelling_one_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+    release = None
+
+    async def call():
+        await release.wait()
+        return "result"
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        first = asyncio.ensure_future(flight.do("key", call))
+        second = asyncio.ensure_future(flight.do("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == ("result", True)
+
+
+def join_from_another_loop(flight, outcome):
+    """
+    Start flight.do("key", ...) on a loop in another thread, join it from a
+    second loop, and return both callers' results (or exceptions).
+    """
+    started = threading.Event()
+    release = threading.Event()
+
+    async def call():
+        started.set()
+        await asyncio.get_running_loop().run_in_executor(None, release.wait)
+        return outcome()
+
+    async def join():
+        joined = asyncio.ensure_future(flight.do("key", call))
+        await asyncio.sleep(0.01)
+        release.set()
+        return await joined
+
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        owner = executor.submit(asyncio.run, flight.do("key", call))
+        assert started.wait(5)
+        results = []
+        for run in (lambda: asyncio.run(join()), lambda: owner.result(5)):
+            try:
+                results.append(run())
+            except Exception as e:
+                results.append(e)
+    return results
+
+
+def test_callers_on_another_event_loop_join_the_call():
+    flight = SingleFlight()
+
+    joined, owner = join_from_another_loop(flight, lambda: "result")
+
+    assert joined == ("result", True)
+    assert owner == ("result", False)
+    assert flight.stats() == {"calls": 1, "deduplicated": 1, "in_flight": 0}
+
+
+def test_exceptions_reach_callers_on_another_event_loop():
+    def fail():
+        raise RuntimeError("boom")
+
+    joined, owner = join_from_another_loop(SingleFlight(), fail)
+
+    assert isinstance(joined, RuntimeError) and str(joined) == "boom"
+    assert isinstance(owner, RuntimeError) and str(owner) == "boom"
@@ -0,0 +1,76 @@
+import os
+import sys
+import json
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import pytest
+
+
+@pytest.fixture
+def framework(mock_openai, local_corpus):
+    (local_corpus / "travel.txt").write_text(
+        "Turismocity News\nTurismocity compares flight prices across Latin America travel agencies.",
+        encoding="utf-8",
+    )
+    from ssff_framework import StartupFramework
+    return StartupFramework("gpt-4o-mini")
+
+
+STARTUP = "Turismocity is a travel search engine for Latin America. Eugenio Fage is the CTO and co-founder."
+
+
+@pytest.mark.parametrize("mode", ["advanced", "natural_language_advanced"])
+def test_analyze_startup_end_to_end(framework, mode):
+    result = framework.analyze_startup(STARTUP, mode)
+
+    assert "error" not in result
+    assert isinstance(result["Market Analysis"], dict)
+    assert isinstance(result["Product Analysis"], dict)
+    assert isinstance(result["Final Analysis"], dict)
+    assert isinstance(result["Quantitative Decision"], dict)
+
+
+@pytest.fixture
+def named_startups(mock_openai, monkeypatch):
+    """
+    Make the mock answer structured requests with the name of the startup
+    the prompt talks about, so results can be traced back to their input.
+    """
+    from utils import mock_openai_server
+
+    names = ["Turismocity", "Flighty"]
+    chat_completion = mock_openai_server._HANDLERS["/v1/chat/completions"]
+
+    def answer(body):
+        response = chat_completion(body)
+        prompt = "".join(m.get("content") or "" for m in body.get("messages", []))
+        message = response["choices"][0]["message"]
+        name = next((n for n in names if n in prompt), None)
+        if body.get("response_format") and message.get("content") and name:
+            content = json.loads(message["content"])
+            if "name" in content:
+                message["content"] = json.dumps({**content, "name": name})
+        return response
+
+    monkeypatch.setitem(mock_openai_server._HANDLERS, "/v1/chat/completions", answer)
+    return [STARTUP.replace("Turismocity", n) for n in names]
+
+
+def test_batch_analysis_in_natural_language_mode(framework, named_startups):
+    from utils.openai_batch import BatchSession
+
+    single = BatchSession(poll_interval=0.01)
+    framework.analyze_startups_batch(named_startups[:1], mode="natural_language_advanced", session=single)
+
+    session = BatchSession(poll_interval=0.01)
+    results = framework.analyze_startups_batch(named_startups, mode="natural_language_advanced", session=session)
+
+    assert all("error" not in r for r in results)
+    assert [r["Startup Info"]["name"] for r in results] == ["Turismocity", "Flighty"]
+    # Both pipelines share one batch job per stage; requests that do not
+    # depend on the startup are only sent once.
+    assert session.batches_submitted == single.batches_submitted
+    assert single.requests_submitted < session.requests_submitted <= 2 * single.requests_submitted
@@ -7,4 +7,76 @@ class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
     DEFAULT_MODEL = os.getenv("DEFAULT_MODEL")
-    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
+    # The founder idea-fit network expects 2 x 100 embedding features plus
+    # their cosine similarity; other values require retraining it
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-large")
+    EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "100"))
+    # Maximum number of inputs per embeddings request (the API allows up to 2048)
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "512"))
+    # NumPy weights of the idea-fit network exported by utils/idea_fit_model.py
+    # (default models/neural_network.npz; the Keras model is used while it is missing)
+    IDEA_FIT_MODEL_PATH = os.getenv("IDEA_FIT_MODEL_PATH")
+
+    # Shared OpenAI HTTP connection pool
+    OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+    OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "600"))
+    OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+
+    # Request scheduling: per-model budgets as "model=rpm:tpm,..." ("*" sets the default)
+    OPENAI_RATE_LIMITS = os.getenv("OPENAI_RATE_LIMITS")
+    # Per-call-site model routing as "call_site=model[:budget_seconds[:fallback]],..."
+    # (call_site is e.g. "MarketAgent._generate_keywords", an agent class or "*")
+    LLM_MODEL_ROUTES = os.getenv("LLM_MODEL_ROUTES")
+    OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+    # Completion tokens assumed per chat request when reserving token budget
+    OPENAI_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("OPENAI_COMPLETION_TOKEN_ESTIMATE", "1000"))
+    # Seconds between status polls of submitted Batch API jobs
+    OPENAI_BATCH_POLL_INTERVAL = float(os.getenv("OPENAI_BATCH_POLL_INTERVAL", "30"))
+    # Share one network call between identical concurrent requests
+    OPENAI_COALESCE_REQUESTS = os.getenv("OPENAI_COALESCE_REQUESTS", "true").lower() in ("1", "true", "yes")
+    # Hedging: resend a request still running after the call site's
+    # OPENAI_HEDGE_PERCENTILE latency; hedges are capped at
+    # OPENAI_HEDGE_MAX_EXTRA_RATIO of all requests
+    OPENAI_HEDGE_REQUESTS = os.getenv("OPENAI_HEDGE_REQUESTS", "false").lower() in ("1", "true", "yes")
+    OPENAI_HEDGE_PERCENTILE = float(os.getenv("OPENAI_HEDGE_PERCENTILE", "95"))
+    OPENAI_HEDGE_MIN_SAMPLES = int(os.getenv("OPENAI_HEDGE_MIN_SAMPLES", "20"))
+    OPENAI_HEDGE_MAX_EXTRA_RATIO = float(os.getenv("OPENAI_HEDGE_MAX_EXTRA_RATIO", "0.05"))
+
+    # LLM response cache (disabled unless LLM_CACHE_PATH is set)
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "604800"))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+    # SerpAPI search cache (disabled unless SEARCH_CACHE_PATH is set). Results
+    # older than SEARCH_CACHE_TTL are served for up to SEARCH_CACHE_STALE_TTL
+    # more seconds while being refreshed in the background
+    SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH")
+    SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "86400"))
+    SEARCH_CACHE_STALE_TTL = float(os.getenv("SEARCH_CACHE_STALE_TTL", "604800"))
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "10000"))
+    # Search evidence in synthesis prompts: token budget, and the snippet
+    # similarity (0-1) above which a result counts as a near duplicate
+    EVIDENCE_TOKEN_BUDGET = int(os.getenv("EVIDENCE_TOKEN_BUDGET", "1500"))
+    EVIDENCE_SIMILARITY_THRESHOLD = float(os.getenv("EVIDENCE_SIMILARITY_THRESHOLD", "0.8"))
+    # Search backend: "serpapi" or "local" (BM25 index over LOCAL_SEARCH_DIR)
+    SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "serpapi")
+    LOCAL_SEARCH_DIR = os.getenv("LOCAL_SEARCH_DIR")
+    LOCAL_SEARCH_INDEX_PATH = os.getenv("LOCAL_SEARCH_INDEX_PATH")
+    # Seconds between checks of LOCAL_SEARCH_DIR for new or changed files
+    LOCAL_SEARCH_REFRESH_INTERVAL = float(os.getenv("LOCAL_SEARCH_REFRESH_INTERVAL", "60"))
+    # Concurrent SerpAPI requests when several queries are searched at once
+    SEARCH_MAX_WORKERS = int(os.getenv("SEARCH_MAX_WORKERS", "5"))
+
+    # Embedding store (disabled unless EMBEDDING_STORE_DIR is set)
+    EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR")
+
+    # LLM backend: "openai", "record" (call OpenAI and save every response to
+    # LLM_RECORDINGS_PATH) or "replay" (serve the saved responses offline)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+    LLM_RECORDINGS_PATH = os.getenv("LLM_RECORDINGS_PATH", ".cache/llm_recordings.jsonl")
+    # Simulated latency of replayed calls: none, recorded, fixed:<s> or lognormal:<median>,<sigma>
+    LLM_REPLAY_LATENCY = os.getenv("LLM_REPLAY_LATENCY", "recorded")
+    LLM_REPLAY_LATENCY_SCALE = float(os.getenv("LLM_REPLAY_LATENCY_SCALE", "1.0"))
+    LLM_REPLAY_SEED = int(os.getenv("LLM_REPLAY_SEED", "0"))
@@ -0,0 +1,235 @@
+import os
+import re
+import hashlib
+import contextlib
+import logging
+import threading
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends from several processes are not serialised
+    fcntl = None
+
+from utils.config import Config
+
+
+class _VectorFile:
+    """
+    Append-only float32 matrix for one (model, dimensions) pair.
+
+    Rows live in ``<name>.f32`` and are memory-mapped read-only; ``<name>.idx``
+    holds one text hash per line, the line number being the row number.
+    Vectors are written before their index lines. Processes sharing the
+    directory hold an exclusive lock on ``<name>.lock`` (where fcntl is
+    available) while appending and while reading rows added by others, so
+    none of them sees another's append half done, and each process reads
+    the new rows of the others before it appends. An append interrupted by
+    a crash can leave a partial trailing row, rows without index lines or a
+    partial index line; the next process to take the lock cuts these off,
+    so later appends stay row-aligned. Writes are not fsynced, so the rows
+    appended just before a power loss may be lost.
+    """
+
+    def __init__(self, directory: str, model: str, dimensions: int):
+        name = f"{re.sub(r'[^A-Za-z0-9_.-]', '_', model)}_{dimensions}"
+        self.dimensions = dimensions
+        self.data_path = os.path.join(directory, f"{name}.f32")
+        self.index_path = os.path.join(directory, f"{name}.idx")
+        self.lock_path = os.path.join(directory, f"{name}.lock")
+        self.rows: dict[str, int] = {}
+        self.n_rows = 0
+        self.matrix: Optional[np.memmap] = None
+        self._index_bytes = 0
+        with self._locked():
+            self._sync()
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _sync(self) -> None:
+        """
+        Read the rows appended since the last sync and cut off whatever a
+        crashed append left behind. Must be called with the lock held.
+        """
+        index_size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        data_size = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        lines = b""
+        if index_size > self._index_bytes:
+            with open(self.index_path, "rb") as f:
+                f.seek(self._index_bytes)
+                tail = f.read()
+            # A last line without a newline is a torn write.
+            lines = tail[:tail.rfind(b"\n") + 1]
+        # Only index lines whose rows were fully written count.
+        new_hashes = lines.decode("utf-8").split("\n")[:-1][:max(data_size // (4 * self.dimensions) - self.n_rows, 0)]
+        index_bytes = self._index_bytes + sum(len(h) + 1 for h in new_hashes)
+        n_rows = self.n_rows + len(new_hashes)
+        if data_size != n_rows * 4 * self.dimensions:
+            # Drop partial rows and rows whose index lines were never written.
+            with open(self.data_path, "r+b") as f:
+                f.truncate(n_rows * 4 * self.dimensions)
+        if index_size != index_bytes:
+            with open(self.index_path, "r+b") as f:
+                f.truncate(index_bytes)
+        for offset, text_hash in enumerate(new_hashes):
+            self.rows[text_hash] = self.n_rows + offset
+        self.n_rows = n_rows
+        self._index_bytes = index_bytes
+        if new_hashes:
+            self._remap()
+
+    def _remap(self) -> None:
+        self.matrix = np.memmap(self.data_path, dtype=np.float32, mode="r", shape=(self.n_rows, self.dimensions))
+
+    def get(self, text_hash: str) -> Optional[np.ndarray]:
+        row = self.rows.get(text_hash)
+        if row is None:
+            return None
+        return self.matrix[row]
+
+    def append(self, text_hashes: Sequence[str], vectors: np.ndarray) -> list[np.ndarray]:
+        """
+        Store the vectors not stored yet and return the stored row of every
+        hash, in input order.
+        """
+        with self._locked():
+            self._sync()
+            new = list({h: v for h, v in zip(text_hashes, vectors) if h not in self.rows}.items())
+            if new:
+                block = np.asarray([v for _, v in new], dtype=np.float32).reshape(len(new), self.dimensions)
+                index = "".join(f"{h}\n" for h, _ in new).encode("utf-8")
+                with open(self.data_path, "ab") as f:
+                    f.write(block.tobytes())
+                with open(self.index_path, "ab") as f:
+                    f.write(index)
+                for offset, (text_hash, _) in enumerate(new):
+                    self.rows[text_hash] = self.n_rows + offset
+                self.n_rows += len(new)
+                self._index_bytes += len(index)
+                self._remap()
+        return [self.matrix[self.rows[h]] for h in text_hashes]
+
+
+class EmbeddingStore:
+    """
+    Persistent embedding cache keyed by (model, dimensions, text hash).
+
+    Vectors are kept in memory-mapped float32 files, so a lookup returns a
+    read-only view into the page cache without copying. Several processes
+    can share the directory; each picks up the rows the others stored when
+    it next stores a vector or reopens the store.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self._files: dict[tuple[str, int], _VectorFile] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _file(self, model: str, dimensions: int) -> _VectorFile:
+        key = (model, dimensions)
+        if key not in self._files:
+            self._files[key] = _VectorFile(self.directory, model, dimensions)
+        return self._files[key]
+
+    def get(self, model: str, dimensions: int, text: str) -> Optional[np.ndarray]:
+        """
+        Return the stored vector for text as a read-only view, or None.
+        """
+        return self.get_many(model, dimensions, [text])[0]
+
+    def get_many(self, model: str, dimensions: int, texts: Sequence[str]) -> list[Optional[np.ndarray]]:
+        """
+        Look up several texts at once; missing entries are returned as None.
+        """
+        with self._lock:
+            vector_file = self._file(model, dimensions)
+            vectors = [vector_file.get(self.text_hash(text)) for text in texts]
+            found = sum(v is not None for v in vectors)
+            self.hits += found
+            self.misses += len(vectors) - found
+            return vectors
+
+    def put(self, model: str, dimensions: int, text: str, vector: Sequence[float]) -> np.ndarray:
+        """
+        Store the vector for text and return the stored read-only view.
+        """
+        return self.put_many(model, dimensions, [text], [vector])[0]
+
+    def put_many(self, model: str, dimensions: int, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> list[np.ndarray]:
+        """
+        Store several vectors and return the stored views in input order.
+        Storing does not count as a lookup in stats().
+        """
+        with self._lock:
+            return self._file(model, dimensions).append([self.text_hash(t) for t in texts], np.asarray(vectors, dtype=np.float32))
+
+    def preload(
+        self,
+        model: str,
+        dimensions: int,
+        texts: Sequence[str],
+        embed_fn: Callable[[list[str]], Sequence[Sequence[float]]],
+    ) -> np.ndarray:
+        """
+        Make sure every text is stored, embedding the missing ones in one
+        call to embed_fn, and return the vectors as an (n, dimensions) array.
+        """
+        cached = self.get_many(model, dimensions, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+        if missing:
+            self.logger.info(f"Embedding {len(missing)} uncached texts for {model}/{dimensions}")
+            self.put_many(model, dimensions, missing, embed_fn(missing))
+        with self._lock:
+            vector_file = self._file(model, dimensions)
+            return np.stack([vector_file.get(self.text_hash(t)) for t in texts]) if texts else np.empty((0, dimensions), dtype=np.float32)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return hit/miss counters and per-namespace entry counts.
+        """
+        with self._lock:
+            namespaces = {f"{model}/{dimensions}": len(f.rows) for (model, dimensions), f in self._files.items()}
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": namespaces,
+        }
+
+
+_default_store: Optional[EmbeddingStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_embedding_store() -> Optional[EmbeddingStore]:
+    """
+    Return the process-wide store configured through EMBEDDING_STORE_DIR, if any.
+    """
+    global _default_store
+    if not Config.EMBEDDING_STORE_DIR:
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = EmbeddingStore(Config.EMBEDDING_STORE_DIR)
+        return _default_store
@@ -1,8 +1,25 @@
 import os
+import sys
+import time
 import logging
+import contextvars
+import concurrent.futures
+from urllib.parse import urlsplit
 import serpapi
+from typing import Any, Optional, Sequence
 from dotenv import load_dotenv
 
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.config import Config
+from utils.llm_cache import LLMCache
+from utils.llm_backend import LatencyModel, get_recording_store
+from utils.search_cache import SearchCache, get_default_search_cache
+from utils.search_broker import current_search_broker
+from utils.local_search import LocalSearchIndex, get_default_local_index
+
 # Configure basic logging if not already configured by the main script
 # This is a failsafe; ideally, the main script configures logging.
 if not logging.getLogger().hasHandlers():
@@ -18,8 +35,25 @@ else:
     logging.info(".env file not found at project root, relying on system environment variables or other secrets management.")
 
 class GoogleSearchAPI:
-    def __init__(self):
+    def __init__(self, cache: Optional[SearchCache] = None):
         self.logger = logging.getLogger(__name__)
+        # Results are cached when SEARCH_CACHE_PATH is set (or a cache is given).
+        self.cache = cache if cache is not None else get_default_search_cache()
+        # Searches follow LLM_BACKEND: "record" saves every result list next
+        # to the LLM recordings and "replay" serves them without a key.
+        self.backend_mode = Config.LLM_BACKEND.lower()
+        self.store = get_recording_store() if self.backend_mode in ("record", "replay") else None
+        # SEARCH_BACKEND=local answers from the BM25 index over LOCAL_SEARCH_DIR instead of SerpAPI.
+        self.local_index: Optional[LocalSearchIndex] = None
+        if Config.SEARCH_BACKEND.lower() == "local":
+            self.local_index = get_default_local_index()
+            self.api_key = None
+            return
+        if self.backend_mode == "replay":
+            self.latency_model = LatencyModel.from_config()
+            self.api_key = None
+            return
+
         serpapi_key = None
         key_source = "Unknown"
 
@@ -48,7 +82,72 @@ class GoogleSearchAPI:
         self.api_key = serpapi_key
 
     def search(self, query, num_results=5):
-        
+        # Within an analysis run, identical searches from any node are
+        # answered from the run's shared results.
+        broker = current_search_broker()
+        if broker is not None:
+            return broker.search(query, num_results, lambda: self._search(query, num_results))
+        return self._search(query, num_results)
+
+    def _search(self, query, num_results):
+        if self.local_index is not None:
+            self.local_index.maybe_update(Config.LOCAL_SEARCH_REFRESH_INTERVAL)
+            return self.local_index.search(query, num_results)
+        key = LLMCache.make_key("search", "serpapi", [{"role": "user", "content": query}], {"num": num_results})
+        if self.backend_mode == "replay":
+            record = self.store.next(key)
+            time.sleep(self.latency_model.sample(record.get("latency", 0.0)))
+            return record["response"]
+
+        start = time.perf_counter()
+        if self.cache is not None:
+            organic_results = self.cache.get_or_fetch("google", query, num_results, lambda: self._fetch(query, num_results))
+        else:
+            organic_results = self._fetch(query, num_results)
+        if self.store is not None:
+            self.store.append(
+                key,
+                "search",
+                "serpapi",
+                {"q": query, "num": num_results},
+                organic_results,
+                latency=time.perf_counter() - start,
+            )
+        return organic_results
+
+    def search_many(
+        self,
+        queries: Sequence[str],
+        num_results: int = 5,
+        max_workers: Optional[int] = None,
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Run several searches concurrently, returning each query's results
+        in input order. Repeated queries are searched once; a failed query
+        is logged and yields an empty list.
+        """
+        unique = list(dict.fromkeys(queries))
+        results: dict[str, list[dict[str, Any]]] = {}
+        max_workers = max_workers or Config.SEARCH_MAX_WORKERS
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique) or 1))) as executor:
+            # Each search runs in a copy of this context so it uses the same search broker.
+            futures = {
+                executor.submit(contextvars.copy_context().run, self.search, query, num_results): query
+                for query in unique
+            }
+            for future in concurrent.futures.as_completed(futures):
+                query = futures[future]
+                try:
+                    results[query] = future.result()
+                except Exception as e:
+                    self.logger.warning(f"Search for '{query}' failed: {e}")
+                    results[query] = []
+        return [results[query] for query in queries]
+
+    def _fetch(self, query, num_results):
+        broker = current_search_broker()
+        if broker is not None:
+            broker.record_external_call()
         params = {
             "engine": "google",
             "q": query,
@@ -59,6 +158,38 @@ class GoogleSearchAPI:
         results = search.as_dict()
         return results.get('organic_results', [])
 
+def _normalise_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}?{parts.query}" if parts.query else f"{host}{parts.path.rstrip('/')}"
+
+
+def merge_results(result_lists: Sequence[Sequence[dict[str, Any]]], limit: Optional[int] = None) -> list[dict[str, Any]]:
+    """
+    Merge the result lists of several queries, dropping results whose URL
+    was already seen (ignoring scheme, "www." and trailing slashes).
+
+    Results are interleaved rank by rank, so every query's top hits come
+    before any query's lower-ranked ones.
+    """
+    merged = []
+    seen = set()
+    for rank in range(max((len(results) for results in result_lists), default=0)):
+        for results in result_lists:
+            if rank >= len(results):
+                continue
+            result = results[rank]
+            link = result.get("link")
+            key = _normalise_url(link) if link else id(result)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(result)
+            if limit is not None and len(merged) >= limit:
+                return merged
+    return merged
+
+
 if __name__ == "__main__":
     
     # Setup basic logging for the __main__ block, if not already set
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import numpy as np
+
+from utils.config import Config
+
+R = TypeVar('R')
+
+
+class LatencyTracker:
+    """
+    Rolling window of observed request latencies per call site.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._latencies: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, call_site: str, latency: float) -> None:
+        with self._lock:
+            if call_site not in self._latencies:
+                self._latencies[call_site] = deque(maxlen=self.window)
+            self._latencies[call_site].append(latency)
+
+    def count(self, call_site: str) -> int:
+        with self._lock:
+            return len(self._latencies.get(call_site, ()))
+
+    def percentile(self, call_site: str, q: float) -> Optional[float]:
+        """
+        Return the q-th percentile of call_site's recent latencies, or None
+        if nothing has been observed yet.
+        """
+        with self._lock:
+            latencies = list(self._latencies.get(call_site, ()))
+        if not latencies:
+            return None
+        return float(np.percentile(latencies, q))
+
+
+class Hedger:
+    """
+    Hedges slow requests by sending a duplicate.
+
+    Once a call site has at least min_samples observed latencies, a request
+    still running after that call site's percentile-th latency gets a
+    second, identical request; whichever finishes first wins and the other
+    is cancelled. Latencies are measured from the moment a request goes
+    out, so time spent queued for rate-limit budget or backing off after an
+    error neither triggers hedges nor counts towards the percentiles.
+    Only the primary request's latency is tracked: when the hedge wins, the
+    time the primary had been running is recorded as a lower bound of its
+    latency, so slow requests cut short by a hedge still raise the
+    percentiles instead of only the winners' fast times being kept.
+    Extra spend is capped: hedges may make up at most max_extra_ratio of all
+    requests sent through the hedger.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        max_extra_ratio: float = 0.05,
+        window: int = 200,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_extra_ratio = max_extra_ratio
+        self.tracker = LatencyTracker(window)
+        self.logger = logging.getLogger(__name__)
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.skipped_over_budget = 0
+        self.skipped_paused = 0
+
+    def threshold(self, call_site: str) -> Optional[float]:
+        """
+        Return the delay after which a request from call_site is hedged, or
+        None while too few latencies have been observed.
+        """
+        if self.tracker.count(call_site) < self.min_samples:
+            return None
+        return self.tracker.percentile(call_site, self.percentile)
+
+    def _reserve_hedge(self) -> bool:
+        if self.hedges + 1 > self.max_extra_ratio * self.requests:
+            self.skipped_over_budget += 1
+            return False
+        self.hedges += 1
+        return True
+
+    async def run(
+        self,
+        call_site: str,
+        send: Callable[[Callable[[], None]], Awaitable[R]],
+        paused: Optional[Callable[[], bool]] = None,
+    ) -> tuple[R, bool]:
+        """
+        Run send(on_start), hedging it if it is slow.
+
+        send must call on_start() whenever its request actually goes out.
+        No hedge is sent while paused() is true, e.g. while the model's
+        queue is held back after a 429. Returns the result and whether it
+        came from the hedge request.
+        """
+        loop = asyncio.get_running_loop()
+        self.requests += 1
+        threshold = self.threshold(call_site)
+        started: dict[int, float] = {}
+        primary_started = asyncio.Event()
+
+        def on_start(attempt: int) -> Callable[[], None]:
+            def mark() -> None:
+                started[attempt] = loop.time()
+                if attempt == 0:
+                    primary_started.set()
+            return mark
+
+        primary = asyncio.ensure_future(send(on_start(0)))
+        tasks = [primary]
+        try:
+            if threshold is not None:
+                # The hedging delay starts once the request is on the wire.
+                waiter = asyncio.ensure_future(primary_started.wait())
+                await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if not primary.done():
+                    await asyncio.wait({primary}, timeout=max(0.0, started[0] + threshold - loop.time()))
+                if not primary.done():
+                    if paused is not None and paused():
+                        self.skipped_paused += 1
+                    elif self._reserve_hedge():
+                        self.logger.info(f"Hedging {call_site} after {threshold:.2f}s")
+                        tasks.append(asyncio.ensure_future(send(on_start(1))))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:
+                    if task in done and not task.cancelled() and task.exception() is None:
+                        hedged = task is not primary
+                        if hedged:
+                            self.hedge_wins += 1
+                        # Censored when the hedge won: the primary took at least this long.
+                        if 0 in started:
+                            self.tracker.observe(call_site, loop.time() - started[0])
+                        return task.result(), hedged
+            # Every attempt failed; surface the primary request's error.
+            return primary.result(), False
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return how many requests were sent, hedged and won by the hedge, and
+        how many hedges were skipped for the spend cap or a paused model.
+        """
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "skipped_over_budget": self.skipped_over_budget,
+            "skipped_paused": self.skipped_paused,
+        }
+
+
+_default_hedger: Optional[Hedger] = None
+_default_hedger_lock = threading.Lock()
+
+
+def get_default_hedger() -> Optional[Hedger]:
+    """
+    Return the process-wide hedger, or None unless OPENAI_HEDGE_REQUESTS is on.
+    """
+    global _default_hedger
+    if not Config.OPENAI_HEDGE_REQUESTS:
+        return None
+    with _default_hedger_lock:
+        if _default_hedger is None:
+            _default_hedger = Hedger(
+                percentile=Config.OPENAI_HEDGE_PERCENTILE,
+                min_samples=Config.OPENAI_HEDGE_MIN_SAMPLES,
+                max_extra_ratio=Config.OPENAI_HEDGE_MAX_EXTRA_RATIO,
+            )
+        return _default_hedger
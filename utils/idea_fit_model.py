@@ -0,0 +1,191 @@
+import os
+import sys
+import logging
+import argparse
+import threading
+from typing import Any, Optional
+
+import numpy as np
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KERAS_PATH = os.path.join(project_root, 'models', 'neural_network.keras')
+DEFAULT_NPZ_PATH = os.path.join(project_root, 'models', 'neural_network.npz')
+# Embeddings the idea-fit network was trained on (2 x 100 features plus their cosine similarity)
+TRAINED_EMBEDDING_MODEL = "text-embedding-3-large"
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "tanh": np.tanh,
+}
+
+
+class DenseNetwork:
+    """
+    NumPy forward pass of a Keras Sequential model made of Dense layers.
+
+    Dropout only acts during training and is left out. predict() takes one
+    feature row or an (n, features) batch and, like Keras, returns an
+    (n, units) float32 array.
+    """
+
+    def __init__(self, layers: list[tuple[np.ndarray, np.ndarray, str]]):
+        for _, _, activation in layers:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+        self.layers = [
+            (np.asarray(kernel, dtype=np.float32), np.asarray(bias, dtype=np.float32), activation)
+            for kernel, bias, activation in layers
+        ]
+
+    @property
+    def input_dim(self) -> int:
+        return self.layers[0][0].shape[0]
+
+    def predict(self, X: Any) -> np.ndarray:
+        x = np.asarray(X, dtype=np.float32)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        if x.shape[1] != self.input_dim:
+            raise ValueError(f"Expected {self.input_dim} features per row, got {x.shape[1]}")
+        for kernel, bias, activation in self.layers:
+            x = ACTIVATIONS[activation](x @ kernel + bias)
+        return x
+
+    def save(self, path: str) -> None:
+        arrays = {}
+        for i, (kernel, bias, _) in enumerate(self.layers):
+            arrays[f"kernel_{i}"] = kernel
+            arrays[f"bias_{i}"] = bias
+        np.savez_compressed(path, activations=np.array([activation for _, _, activation in self.layers]), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "DenseNetwork":
+        with np.load(path) as data:
+            activations = [str(activation) for activation in data["activations"]]
+            return cls([(data[f"kernel_{i}"], data[f"bias_{i}"], activation) for i, activation in enumerate(activations)])
+
+    @classmethod
+    def from_keras(cls, model: Any) -> "DenseNetwork":
+        """
+        Copy the weights out of a loaded Keras Sequential model.
+        """
+        layers = []
+        for layer in model.layers:
+            kind = type(layer).__name__
+            if kind == "Dropout":
+                continue
+            if kind != "Dense":
+                raise ValueError(f"Cannot export layer {layer.name} of type {kind}")
+            config = layer.get_config()
+            weights = layer.get_weights()
+            bias = weights[1] if config["use_bias"] else np.zeros(config["units"], dtype=np.float32)
+            layers.append((weights[0], bias, config["activation"]))
+        return cls(layers)
+
+
+def export_keras_model(
+    keras_path: str = DEFAULT_KERAS_PATH,
+    npz_path: str = DEFAULT_NPZ_PATH,
+    n_samples: int = 1000,
+    atol: float = 1e-5,
+) -> float:
+    """
+    Export a Keras model to npz_path and check the NumPy forward pass against
+    Keras on n_samples random rows, one at a time and as a batch. Returns the
+    largest absolute difference; raises ValueError if it exceeds atol and
+    does not write the file.
+    """
+    from tensorflow.keras.models import load_model
+
+    model = load_model(keras_path)
+    network = DenseNetwork.from_keras(model)
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n_samples, network.input_dim)).astype(np.float32)
+    expected = model.predict(X, verbose=0)
+    max_diff = float(np.max(np.abs(network.predict(X) - expected)))
+    for row, value in zip(X[:10], expected[:10]):
+        max_diff = max(max_diff, float(np.max(np.abs(network.predict(row) - value))))
+    if max_diff > atol:
+        raise ValueError(f"NumPy forward pass differs from Keras by {max_diff:.3g} (> {atol})")
+
+    network.save(npz_path)
+    logger.info(f"Exported {keras_path} to {npz_path}, max difference from Keras {max_diff:.3g}")
+    return max_diff
+
+
+def load_idea_fit_model(npz_path: Optional[str] = None, keras_path: str = DEFAULT_KERAS_PATH) -> Any:
+    """
+    Load the founder idea-fit network: the exported NumPy weights when they
+    exist, otherwise the Keras model (which needs TensorFlow). Raises
+    RuntimeError if neither can be loaded.
+    """
+    npz_path = npz_path or Config.IDEA_FIT_MODEL_PATH or DEFAULT_NPZ_PATH
+    if os.path.exists(npz_path):
+        return DenseNetwork.load(npz_path)
+    logger.warning(f"{npz_path} not found, loading the Keras model instead; run `python utils/idea_fit_model.py` to export it")
+    try:
+        from tensorflow.keras.models import load_model
+    except ImportError as e:
+        raise RuntimeError(
+            f"{npz_path} not found and TensorFlow is not installed; "
+            f"run `python utils/idea_fit_model.py` where TensorFlow is available to export {keras_path}"
+        ) from e
+    return load_model(keras_path)
+
+
+def check_embedding_settings(model: Any, embedding_model: str, embedding_dimensions: int) -> None:
+    """
+    Make sure the configured embeddings fit the idea-fit network: raise
+    ValueError if their dimensions do not match its input, and warn if they
+    come from a different model than the one it was trained on.
+    """
+    input_dim = model.input_dim if isinstance(model, DenseNetwork) else model.input_shape[-1]
+    if 2 * embedding_dimensions + 1 != input_dim:
+        raise ValueError(
+            f"The idea-fit network expects {(input_dim - 1) // 2}-dimensional embeddings, "
+            f"but {embedding_model} is configured with {embedding_dimensions} dimensions; "
+            f"check EMBEDDING_MODEL and EMBEDDING_DIMENSIONS"
+        )
+    if embedding_model != TRAINED_EMBEDDING_MODEL:
+        logger.warning(
+            f"The idea-fit network was trained on {TRAINED_EMBEDDING_MODEL} embeddings, "
+            f"but EMBEDDING_MODEL is {embedding_model}; idea-fit scores will not be meaningful"
+        )
+
+
+_default_model: Any = None
+_default_model_lock = threading.Lock()
+
+
+def get_default_idea_fit_model() -> Any:
+    """
+    Return the process-wide idea-fit network, loading it on first use.
+    """
+    global _default_model
+    with _default_model_lock:
+        if _default_model is None:
+            _default_model = load_idea_fit_model()
+        return _default_model
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Export the founder idea-fit network to NumPy weights.")
+    parser.add_argument("--keras", default=DEFAULT_KERAS_PATH, help="Keras model to export")
+    parser.add_argument("--output", default=Config.IDEA_FIT_MODEL_PATH or DEFAULT_NPZ_PATH, help="Output .npz file")
+    parser.add_argument("--samples", type=int, default=1000, help="Random rows used to verify the export")
+    parser.add_argument("--atol", type=float, default=1e-5, help="Largest allowed difference from Keras")
+    args = parser.parse_args()
+
+    max_diff = export_keras_model(args.keras, args.output, args.samples, args.atol)
+    print(f"Exported to {args.output} (max difference from Keras: {max_diff:.3g})")
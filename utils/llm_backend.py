@@ -0,0 +1,542 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Iterator, Optional, Sequence, TypeVar, Type
+
+import numpy as np
+from pydantic import BaseModel
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.config import Config
+from utils.llm_cache import LLMCache
+from utils.llm_metrics import capture_llm_calls, infer_call_site, record_llm_call, register_wrapper_module
+from utils.model_routing import ModelRouter, get_default_router
+
+# Generic type for Pydantic models
+T = TypeVar('T', bound=BaseModel)
+
+# Frames in this module wrap another backend and are never a call site.
+register_wrapper_module(__name__)
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayMissError(LookupError):
+    """
+    Raised in replay mode when a request has no recorded response.
+    """
+
+
+class LLMBackend(ABC):
+    """
+    Interface the agents use to talk to a language model provider.
+
+    OpenAIAPI is the production implementation; RecordingBackend and
+    ReplayBackend wrap or stand in for it so whole analyses can be recorded
+    once and replayed later without network access.
+    """
+
+    model_name: str
+    embedding_model: str
+    embedding_dimensions: int
+
+    @abstractmethod
+    def get_completion(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def get_completion_stream(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> Iterator[str]:
+        ...
+
+    @abstractmethod
+    def get_structured_output(
+        self,
+        schema_class: Type[T],
+        user_prompt: str,
+        system_prompt: str,
+        call_site: Optional[str] = None,
+    ) -> Optional[T]:
+        ...
+
+    @abstractmethod
+    def get_embeddings(self, text: str, call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        ...
+
+    @abstractmethod
+    def get_embeddings_batch(self, texts: Sequence[str], call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        ...
+
+    async def get_completion_async(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> Optional[str]:
+        call_site = call_site or infer_call_site()
+        return await asyncio.to_thread(self.get_completion, system_content, user_content, call_site)
+
+    async def get_structured_output_async(
+        self,
+        schema_class: Type[T],
+        user_prompt: str,
+        system_prompt: str,
+        call_site: Optional[str] = None,
+    ) -> Optional[T]:
+        call_site = call_site or infer_call_site()
+        return await asyncio.to_thread(self.get_structured_output, schema_class, user_prompt, system_prompt, call_site)
+
+    async def get_embeddings_async(self, text: str, call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        call_site = call_site or infer_call_site()
+        return await asyncio.to_thread(self.get_embeddings, text, call_site)
+
+    async def get_embeddings_batch_async(self, texts: Sequence[str], call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        call_site = call_site or infer_call_site()
+        return await asyncio.to_thread(self.get_embeddings_batch, texts, call_site)
+
+
+def _messages(system_content: str, user_content: str) -> list[dict[str, Any]]:
+    return [
+        {"role": "system", "content": system_content},
+        {"role": "user", "content": user_content},
+    ]
+
+
+def completion_key(model: str, system_content: str, user_content: str) -> str:
+    return LLMCache.make_key("completion", model, _messages(system_content, user_content))
+
+
+def structured_key(model: str, schema_class: Type[BaseModel], user_prompt: str, system_prompt: str) -> str:
+    return LLMCache.make_key("structured", model, _messages(system_prompt, user_prompt), schema_class.model_json_schema())
+
+
+def embedding_key(model: str, dimensions: int, text: str) -> str:
+    return LLMCache.make_key("embedding", model, [{"role": "user", "content": text}], {"dimensions": dimensions})
+
+
+class RecordingStore:
+    """
+    Append-only JSONL file of recorded request/response pairs.
+
+    Each line holds the request key, the kind of call, the response and the
+    measured latency and token usage. A key may be recorded several times
+    (e.g. a non-deterministic completion requested twice); next() hands the
+    recorded responses out in order and wraps around, so a replayed run sees
+    the same sequence the recorded run did.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._records: dict[str, list[dict[str, Any]]] = {}
+        self._cursors: dict[str, int] = {}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted recording run.
+                    logger.warning(f"Skipping unreadable recording at {self.path}:{line_number}")
+                    continue
+                self._records.setdefault(record["key"], []).append(record)
+        logger.info(f"Loaded {sum(len(v) for v in self._records.values())} recordings from {self.path}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(records) for records in self._records.values())
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._records
+
+    def append(self, key: str, kind: str, model: str, request: dict[str, Any], response: Any, **stats: Any) -> None:
+        """
+        Persist one request/response pair.
+        """
+        record = {"key": key, "kind": kind, "model": model, "request": request, "response": response, **stats}
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self._records.setdefault(key, []).append(record)
+
+    def next(self, key: str) -> dict[str, Any]:
+        """
+        Return the next recorded response for key.
+        """
+        with self._lock:
+            records = self._records.get(key)
+            if not records:
+                raise ReplayMissError(f"No recorded response for request {key[:12]} in {self.path}")
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return records[cursor % len(records)]
+
+
+_stores: dict[str, RecordingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_recording_store(path: Optional[str] = None) -> RecordingStore:
+    """
+    Return the process-wide store for path (LLM_RECORDINGS_PATH by default).
+    """
+    path = os.path.abspath(path or Config.LLM_RECORDINGS_PATH)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = RecordingStore(path)
+        return _stores[path]
+
+
+class LatencyModel:
+    """
+    Simulated latency for replayed calls.
+
+    The spec is one of
+      "none"                     replay instantly,
+      "recorded"                 sleep for the latency measured when recording,
+      "fixed:<seconds>"          sleep a constant time,
+      "lognormal:<median>,<sigma>" draw from a log-normal distribution,
+    and every sample is multiplied by scale. Sampling is seeded so a replay
+    is reproducible.
+    """
+
+    def __init__(self, spec: str = "recorded", scale: float = 1.0, seed: int = 0):
+        self.spec = spec
+        self.scale = scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        kind, _, args = spec.partition(":")
+        self.kind = kind.strip().lower()
+        values = [float(v) for v in args.split(",") if v.strip()]
+        if self.kind == "fixed" and len(values) == 1:
+            self.params = values
+        elif self.kind == "lognormal" and len(values) == 2:
+            self.params = values
+        elif self.kind in ("none", "recorded") and not values:
+            self.params = []
+        else:
+            raise ValueError(f"Invalid replay latency spec: {spec!r}")
+
+    @classmethod
+    def from_config(cls) -> "LatencyModel":
+        return cls(Config.LLM_REPLAY_LATENCY, scale=Config.LLM_REPLAY_LATENCY_SCALE, seed=Config.LLM_REPLAY_SEED)
+
+    def sample(self, recorded: float = 0.0) -> float:
+        if self.kind == "none":
+            return 0.0
+        if self.kind == "recorded":
+            latency = recorded
+        elif self.kind == "fixed":
+            latency = self.params[0]
+        else:
+            median, sigma = self.params
+            with self._lock:
+                latency = self._random.lognormvariate(np.log(median), sigma)
+        return max(0.0, latency * self.scale)
+
+
+def _split_chunks(text: str) -> list[str]:
+    """
+    Split text into word-sized chunks that join back to the original.
+    """
+    chunks = []
+    start = 0
+    for i in range(1, len(text)):
+        if text[i] == " " and text[i - 1] != " ":
+            chunks.append(text[start:i])
+            start = i
+    chunks.append(text[start:])
+    return [chunk for chunk in chunks if chunk]
+
+
+class RecordingBackend(LLMBackend):
+    """
+    Pass every call through to another backend and record the request and
+    response, with the latency and token usage of the real call, in a
+    RecordingStore.
+
+    Requests are keyed by the model the router sends their call site to
+    (the inner backend's router by default), so recordings made under one
+    LLM_MODEL_ROUTES do not replay under another.
+    """
+
+    def __init__(self, inner: LLMBackend, store: Optional[RecordingStore] = None, router: Optional[ModelRouter] = None):
+        self.inner = inner
+        self.store = store or get_recording_store()
+        self.router = router or getattr(inner, "router", None) or get_default_router()
+        self.model_name = inner.model_name
+        self.embedding_model = inner.embedding_model
+        self.embedding_dimensions = inner.embedding_dimensions
+
+    def _model(self, call_site: str) -> str:
+        return self.router.route(call_site, self.model_name).model
+
+    @staticmethod
+    def _stats(calls: list, latency: float) -> dict[str, Any]:
+        return {
+            "latency": latency,
+            "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+            "completion_tokens": sum(c["completion_tokens"] for c in calls),
+            "cached_tokens": sum(c["cached_tokens"] for c in calls),
+        }
+
+    def get_completion(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> Optional[str]:
+        call_site = call_site or infer_call_site()
+        start = time.perf_counter()
+        with capture_llm_calls() as calls:
+            response = self.inner.get_completion(system_content, user_content, call_site=call_site)
+        if response is not None:
+            model = self._model(call_site)
+            self.store.append(
+                completion_key(model, system_content, user_content),
+                "completion",
+                model,
+                {"messages": _messages(system_content, user_content)},
+                response,
+                **self._stats(calls, time.perf_counter() - start),
+            )
+        return response
+
+    def get_completion_stream(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> Iterator[str]:
+        call_site = call_site or infer_call_site()
+        start = time.perf_counter()
+        chunks = []
+        for chunk in self.inner.get_completion_stream(system_content, user_content, call_site=call_site):
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            # Streams are recorded as plain completions; usage is not
+            # attributed here because the stream's metrics are reported
+            # from the background loop.
+            model = self._model(call_site)
+            self.store.append(
+                completion_key(model, system_content, user_content),
+                "completion",
+                model,
+                {"messages": _messages(system_content, user_content)},
+                "".join(chunks),
+                latency=time.perf_counter() - start,
+                prompt_tokens=0,
+                completion_tokens=0,
+                cached_tokens=0,
+            )
+
+    def get_structured_output(
+        self,
+        schema_class: Type[T],
+        user_prompt: str,
+        system_prompt: str,
+        call_site: Optional[str] = None,
+    ) -> Optional[T]:
+        call_site = call_site or infer_call_site()
+        start = time.perf_counter()
+        with capture_llm_calls() as calls:
+            response = self.inner.get_structured_output(schema_class, user_prompt, system_prompt, call_site=call_site)
+        if response is not None:
+            model = self._model(call_site)
+            self.store.append(
+                structured_key(model, schema_class, user_prompt, system_prompt),
+                "structured",
+                model,
+                {"messages": _messages(system_prompt, user_prompt), "schema": schema_class.__name__},
+                response.model_dump(mode="json"),
+                **self._stats(calls, time.perf_counter() - start),
+            )
+        return response
+
+    def _record_embeddings(self, texts: Sequence[str], embeddings: np.ndarray, stats: dict[str, Any]) -> None:
+        # Batched embeddings are stored per text so that replay can serve
+        # any later batching of the same texts. Each text keeps the latency
+        # of the whole request; the token usage is attributed to the first.
+        share = stats
+        for text, embedding in zip(texts, embeddings):
+            self.store.append(
+                embedding_key(self.embedding_model, self.embedding_dimensions, text),
+                "embedding",
+                self.embedding_model,
+                {"input": text, "dimensions": self.embedding_dimensions},
+                [float(x) for x in embedding],
+                **share,
+            )
+            share = {**share, "prompt_tokens": 0}
+
+    def get_embeddings(self, text: str, call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        call_site = call_site or infer_call_site()
+        start = time.perf_counter()
+        with capture_llm_calls() as calls:
+            embedding = self.inner.get_embeddings(text, call_site=call_site)
+        if embedding is not None:
+            self._record_embeddings([text], embedding[None, :], self._stats(calls, time.perf_counter() - start))
+        return embedding
+
+    def get_embeddings_batch(self, texts: Sequence[str], call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        call_site = call_site or infer_call_site()
+        start = time.perf_counter()
+        with capture_llm_calls() as calls:
+            embeddings = self.inner.get_embeddings_batch(texts, call_site=call_site)
+        if embeddings is not None and len(texts):
+            self._record_embeddings(list(texts), embeddings, self._stats(calls, time.perf_counter() - start))
+        return embeddings
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Serve responses from a RecordingStore instead of calling a provider.
+
+    Replayed calls sleep for a latency drawn from latency_model and are
+    reported to the LLM call metrics with their recorded token usage, so
+    profiling SSFFGraph or StartupFramework against a replay shows the same
+    call structure as a live run. Requests are looked up under the model
+    the router (LLM_MODEL_ROUTES by default) sends their call site to; a
+    request that was never recorded raises ReplayMissError.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        store: Optional[RecordingStore] = None,
+        latency_model: Optional[LatencyModel] = None,
+        embedding_model: Optional[str] = None,
+        embedding_dimensions: Optional[int] = None,
+        router: Optional[ModelRouter] = None,
+    ):
+        self.model_name = model_name
+        self.embedding_model = embedding_model or Config.EMBEDDING_MODEL
+        self.embedding_dimensions = embedding_dimensions or Config.EMBEDDING_DIMENSIONS
+        self.store = store or get_recording_store()
+        self.latency_model = latency_model or LatencyModel.from_config()
+        self.router = router or get_default_router()
+
+    def _model(self, call_site: str) -> str:
+        return self.router.route(call_site, self.model_name).model
+
+    def _replay(self, key: str, call_site: str, operation: str, model: str) -> Any:
+        start = time.perf_counter()
+        record = self.store.next(key)
+        time.sleep(self.latency_model.sample(record.get("latency", 0.0)))
+        self._record(record, call_site, operation, model, time.perf_counter() - start)
+        return record["response"]
+
+    async def _replay_async(self, key: str, call_site: str, operation: str, model: str) -> Any:
+        start = time.perf_counter()
+        record = self.store.next(key)
+        await asyncio.sleep(self.latency_model.sample(record.get("latency", 0.0)))
+        self._record(record, call_site, operation, model, time.perf_counter() - start)
+        return record["response"]
+
+    @staticmethod
+    def _record(record: dict[str, Any], call_site: str, operation: str, model: str, latency: float) -> None:
+        record_llm_call(
+            model,
+            call_site,
+            operation,
+            latency,
+            prompt_tokens=record.get("prompt_tokens", 0),
+            completion_tokens=record.get("completion_tokens", 0),
+            cached_tokens=record.get("cached_tokens", 0),
+        )
+
+    def get_completion(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> Optional[str]:
+        call_site = call_site or infer_call_site()
+        model = self._model(call_site)
+        return self._replay(completion_key(model, system_content, user_content), call_site, "completion", model)
+
+    def get_completion_stream(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> Iterator[str]:
+        call_site = call_site or infer_call_site()
+        model = self._model(call_site)
+        start = time.perf_counter()
+        record = self.store.next(completion_key(model, system_content, user_content))
+        chunks = _split_chunks(record["response"])
+        # Spread the simulated latency evenly over the chunks.
+        delay = self.latency_model.sample(record.get("latency", 0.0)) / max(len(chunks), 1)
+        try:
+            for chunk in chunks:
+                time.sleep(delay)
+                yield chunk
+        finally:
+            self._record(record, call_site, "completion_stream", model, time.perf_counter() - start)
+
+    def get_structured_output(
+        self,
+        schema_class: Type[T],
+        user_prompt: str,
+        system_prompt: str,
+        call_site: Optional[str] = None,
+    ) -> Optional[T]:
+        call_site = call_site or infer_call_site()
+        model = self._model(call_site)
+        key = structured_key(model, schema_class, user_prompt, system_prompt)
+        return schema_class.model_validate(self._replay(key, call_site, "structured", model))
+
+    def get_embeddings(self, text: str, call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        call_site = call_site or infer_call_site()
+        key = embedding_key(self.embedding_model, self.embedding_dimensions, text)
+        return np.asarray(self._replay(key, call_site, "embedding", self.embedding_model), dtype=np.float32)
+
+    def get_embeddings_batch(self, texts: Sequence[str], call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        call_site = call_site or infer_call_site()
+        if not texts:
+            return np.empty((0, self.embedding_dimensions), dtype=np.float32)
+        start = time.perf_counter()
+        records = [self.store.next(embedding_key(self.embedding_model, self.embedding_dimensions, text)) for text in texts]
+        # The texts were one request, so they wait for the slowest recording.
+        time.sleep(max(self.latency_model.sample(r.get("latency", 0.0)) for r in records))
+        record_llm_call(
+            self.embedding_model,
+            call_site,
+            "embedding_batch",
+            time.perf_counter() - start,
+            prompt_tokens=sum(r.get("prompt_tokens", 0) for r in records),
+        )
+        return np.asarray([r["response"] for r in records], dtype=np.float32)
+
+    async def get_completion_async(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> Optional[str]:
+        call_site = call_site or infer_call_site()
+        model = self._model(call_site)
+        return await self._replay_async(completion_key(model, system_content, user_content), call_site, "completion", model)
+
+    async def get_structured_output_async(
+        self,
+        schema_class: Type[T],
+        user_prompt: str,
+        system_prompt: str,
+        call_site: Optional[str] = None,
+    ) -> Optional[T]:
+        call_site = call_site or infer_call_site()
+        model = self._model(call_site)
+        key = structured_key(model, schema_class, user_prompt, system_prompt)
+        return schema_class.model_validate(await self._replay_async(key, call_site, "structured", model))
+
+
+def create_backend(model_name: str, mode: Optional[str] = None) -> LLMBackend:
+    """
+    Build the backend selected by LLM_BACKEND: "openai" (default), "record"
+    (OpenAI, recording every call to LLM_RECORDINGS_PATH) or "replay"
+    (serve the recordings without network access).
+    """
+    mode = (mode or Config.LLM_BACKEND).lower()
+    if mode == "replay":
+        return ReplayBackend(model_name)
+
+    # Imported here so that replay mode works without OpenAI credentials.
+    from utils.openai_api import OpenAIAPI
+
+    if mode == "record":
+        return RecordingBackend(OpenAIAPI(model_name))
+    if mode == "openai":
+        return OpenAIAPI(model_name)
+    raise ValueError(f"Unknown LLM_BACKEND: {mode!r} (expected openai, record or replay)")
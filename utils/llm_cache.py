@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Optional
+
+from utils.config import Config
+
+
+class LLMCache:
+    """
+    Persistent content-addressed cache for LLM responses, backed by SQLite.
+
+    Entries are keyed by a hash of the request (model, messages and, for
+    structured output, the schema JSON). Entries older than ``ttl`` seconds
+    are treated as misses, and once more than ``max_entries`` are stored the
+    least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+        self._conn.commit()
+        self.logger.debug(f"LLM cache opened at {path} (ttl={ttl}, max_entries={max_entries})")
+
+    @staticmethod
+    def make_key(kind: str, model: str, messages: list[dict[str, Any]], schema: Optional[dict[str, Any]] = None) -> str:
+        """
+        Build the cache key for a request.
+        """
+        payload = json.dumps(
+            {"kind": kind, "model": model, "messages": messages, "schema": schema},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached value for key, or None on a miss or expired entry.
+        """
+        entry = self.get_with_age(key)
+        return None if entry is None else entry[0]
+
+    def get_with_age(self, key: str) -> Optional[tuple[str, float]]:
+        """
+        Return the cached value for key and its age in seconds, or None on a
+        miss or expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return value, now - created_at
+
+    def set(self, key: str, kind: str, value: str) -> None:
+        """
+        Store a value, evicting least recently used entries beyond max_entries.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, kind, value, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, value, now, now),
+            )
+            if self.max_entries is not None:
+                (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+                excess = count - self.max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM llm_cache WHERE key IN "
+                        "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                        (excess,),
+                    )
+                    self.evictions += excess
+            self._conn.commit()
+
+    def invalidate(self, key: str) -> None:
+        """
+        Remove a single entry, e.g. when it no longer validates against its schema.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return hit/miss counters and the current number of entries.
+        """
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[LLMCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[LLMCache]:
+    """
+    Return the process-wide cache configured through LLM_CACHE_PATH, if any.
+    """
+    global _default_cache
+    if not Config.LLM_CACHE_PATH:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache(
+                Config.LLM_CACHE_PATH,
+                ttl=Config.LLM_CACHE_TTL,
+                max_entries=Config.LLM_CACHE_MAX_ENTRIES,
+            )
+        return _default_cache
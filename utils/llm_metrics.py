@@ -0,0 +1,132 @@
+import os
+import sys
+import logging
+import contextlib
+import contextvars
+from typing import Iterable, Iterator, Optional
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from shared.types import LLMCallDict, LLMCallSummaryDict
+
+logger = logging.getLogger(__name__)
+
+# Records of the LLM calls made in the current context (e.g. one graph node).
+_collector: contextvars.ContextVar[Optional[list[LLMCallDict]]] = contextvars.ContextVar("llm_call_collector", default=None)
+
+# Modules whose frames are wrappers around the API and never a call site.
+_WRAPPER_MODULES = {"utils.openai_api", "agents.base_agent", __name__}
+
+
+def register_wrapper_module(module_name: str) -> None:
+    """
+    Skip frames of module_name when inferring call sites.
+    """
+    _WRAPPER_MODULES.add(module_name)
+
+
+def infer_call_site() -> str:
+    """
+    Name the agent method that issued the current LLM call, e.g.
+    "MarketAgent._generate_keywords", by walking up the stack past the
+    API wrapper modules.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_globals.get("__name__") not in _WRAPPER_MODULES:
+            owner = frame.f_locals.get("self")
+            if owner is not None:
+                return f"{type(owner).__name__}.{frame.f_code.co_name}"
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return "unknown"
+
+
+def start_llm_call_collection() -> tuple[contextvars.Token, list[LLMCallDict]]:
+    """
+    Start collecting LLM call records in the current context.
+
+    Returns a token for stop_llm_call_collection() and the list the records
+    are appended to.
+    """
+    records: list[LLMCallDict] = []
+    return _collector.set(records), records
+
+
+def stop_llm_call_collection(token: contextvars.Token) -> None:
+    _collector.reset(token)
+
+
+@contextlib.contextmanager
+def capture_llm_calls() -> Iterator[list[LLMCallDict]]:
+    """
+    Collect the LLM calls made inside the block into the yielded list, while
+    still reporting them to the enclosing collection (if any).
+    """
+    outer = _collector.get()
+    token, records = start_llm_call_collection()
+    try:
+        yield records
+    finally:
+        stop_llm_call_collection(token)
+        if outer is not None:
+            outer.extend(records)
+
+
+def record_llm_call(
+    model: str,
+    call_site: str,
+    operation: str,
+    latency: float,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    cached_tokens: int = 0,
+    retries: int = 0,
+    cache_hit: bool = False,
+    deduplicated: bool = False,
+    hedged: bool = False,
+) -> LLMCallDict:
+    """
+    Record one LLM call in the active collection (if any) and return it.
+    """
+    record = LLMCallDict(
+        model=model,
+        call_site=call_site,
+        operation=operation,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cached_tokens=cached_tokens,
+        latency=latency,
+        retries=retries,
+        cache_hit=cache_hit,
+        deduplicated=deduplicated,
+        hedged=hedged,
+    )
+    logger.debug(f"LLM call: {record}")
+    if prompt_tokens:
+        logger.info(
+            f"{call_site} ({model}): {latency:.2f}s, {prompt_tokens} prompt tokens "
+            f"({cached_tokens} cached), {completion_tokens} completion tokens"
+        )
+    records = _collector.get()
+    if records is not None:
+        records.append(record)
+    return record
+
+
+def summarize_llm_calls(records: Iterable[LLMCallDict]) -> LLMCallSummaryDict:
+    """
+    Aggregate call records into totals, keeping the individual records.
+    """
+    records = list(records)
+    return LLMCallSummaryDict(
+        calls=len(records),
+        latency=sum(r["latency"] for r in records),
+        prompt_tokens=sum(r["prompt_tokens"] for r in records),
+        completion_tokens=sum(r["completion_tokens"] for r in records),
+        cached_tokens=sum(r["cached_tokens"] for r in records),
+        retries=sum(r["retries"] for r in records),
+        records=records,
+    )
@@ -0,0 +1,325 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+TEXT_EXTENSIONS = (".txt", ".md")
+JSON_EXTENSIONS = (".json", ".jsonl")
+
+# Passages longer than this are split at paragraph boundaries.
+MAX_PASSAGE_CHARS = 1200
+SNIPPET_CHARS = 300
+
+_WORD = re.compile(r"[a-z0-9]+(?:[.'][a-z0-9]+)*")
+_CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lower-cased words for alphabetic scripts plus character bigrams for
+    Japanese/Chinese/Korean runs, which have no spaces between words.
+    """
+    text = text.lower()
+    tokens = _WORD.findall(text)
+    for run in _CJK.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _split_passages(text: str) -> list[str]:
+    """
+    Group paragraphs into passages of at most MAX_PASSAGE_CHARS characters.
+    """
+    passages = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = " ".join(re.sub(r"^#+\s*", "", paragraph.strip()).split())
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) + 1 > MAX_PASSAGE_CHARS:
+            passages.append(current)
+            current = ""
+        current = f"{current} {paragraph}".strip()
+        while len(current) > MAX_PASSAGE_CHARS:
+            passages.append(current[:MAX_PASSAGE_CHARS])
+            current = current[MAX_PASSAGE_CHARS:]
+    if current:
+        passages.append(current)
+    return passages
+
+
+def _snippet(text: str) -> str:
+    if len(text) <= SNIPPET_CHARS:
+        return text
+    cut = text.rfind(" ", 0, SNIPPET_CHARS)
+    return text[:cut if cut > SNIPPET_CHARS // 2 else SNIPPET_CHARS] + " ..."
+
+
+def _read_documents(path: str) -> Iterator[dict[str, str]]:
+    """
+    Yield {title, text, source, date, link} documents from one corpus file.
+
+    Text and Markdown files are one document titled by their first line.
+    JSON files hold a document object, a list of them or a SerpAPI response
+    ({"organic_results": [...]}); JSONL files hold one object per line.
+    """
+    name = os.path.basename(path)
+    file_date = datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d")
+    default_link = "file://" + os.path.abspath(path)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        if path.endswith(TEXT_EXTENSIONS):
+            text = f.read()
+            first_line = next((line for line in text.splitlines() if line.strip()), name)
+            yield {
+                "title": first_line.strip().lstrip("#").strip(),
+                "text": text,
+                "source": name,
+                "date": file_date,
+                "link": default_link,
+            }
+            return
+        if path.endswith(".jsonl"):
+            items = [json.loads(line) for line in f if line.strip()]
+        else:
+            data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get("organic_results", [data])
+            items = data if isinstance(data, list) else []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        text = item.get("content") or item.get("text") or item.get("body") or item.get("snippet") or ""
+        yield {
+            "title": str(item.get("title") or name),
+            "text": str(text),
+            "source": str(item.get("source") or name),
+            "date": str(item.get("date") or file_date),
+            "link": str(item.get("link") or item.get("url") or f"{default_link}#{i}"),
+        }
+
+
+class LocalSearchIndex:
+    """
+    BM25 index over a directory of market reports and news dumps.
+
+    Documents are split into passages, and each passage is a search hit.
+    update() re-reads only the files that were added, changed or removed
+    since the last update (by size and modification time), and the index is
+    saved to index_path so later processes start without re-reading the
+    corpus. search() returns SerpAPI-shaped organic results.
+    """
+
+    def __init__(self, directory: str, index_path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.directory = os.path.abspath(directory)
+        self.index_path = os.path.abspath(index_path or os.path.join(self.directory, ".search_index.json"))
+        self.k1 = k1
+        self.b = b
+        self.files: dict[str, dict[str, Any]] = {}
+        self.passages: dict[int, dict[str, Any]] = {}
+        self.postings: dict[str, dict[int, int]] = {}
+        self.total_length = 0
+        self.next_id = 0
+        self.last_update = 0.0
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable search index {self.index_path}: {e}")
+            return
+        self.files = data["files"]
+        self.next_id = data["next_id"]
+        for passage in data["passages"]:
+            self._add_passage(passage)
+        logger.info(f"Loaded search index with {len(self.passages)} passages from {self.index_path}")
+
+    def save(self) -> None:
+        with self._lock:
+            data = {"files": self.files, "next_id": self.next_id, "passages": list(self.passages.values())}
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+
+    def _add_passage(self, passage: dict[str, Any]) -> None:
+        pid = passage["id"]
+        self.passages[pid] = passage
+        self.total_length += passage["length"]
+        for term, tf in passage["terms"].items():
+            self.postings.setdefault(term, {})[pid] = tf
+
+    def _remove_file(self, path: str) -> None:
+        for pid in self.files.pop(path, {}).get("passages", []):
+            passage = self.passages.pop(pid, None)
+            if passage is None:
+                continue
+            self.total_length -= passage["length"]
+            for term in passage["terms"]:
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(pid, None)
+                    if not postings:
+                        del self.postings[term]
+
+    def _index_file(self, path: str, signature: list[float]) -> None:
+        ids = []
+        try:
+            documents = list(_read_documents(os.path.join(self.directory, path)))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable corpus file {path}: {e}")
+            documents = []
+        for document in documents:
+            for text in _split_passages(document["text"]):
+                tokens = tokenize(f"{document['title']} {text}")
+                if not tokens:
+                    continue
+                passage = {
+                    "id": self.next_id,
+                    "title": document["title"],
+                    "snippet": _snippet(text),
+                    "source": document["source"],
+                    "date": document["date"],
+                    "link": document["link"],
+                    "length": len(tokens),
+                    "terms": dict(Counter(tokens)),
+                }
+                self.next_id += 1
+                self._add_passage(passage)
+                ids.append(passage["id"])
+        self.files[path] = {"signature": signature, "passages": ids}
+
+    def update(self) -> dict[str, int]:
+        """
+        Bring the index in line with the directory and save it if anything
+        changed. Returns how many files were added, updated and removed.
+        """
+        with self._lock:
+            current = {}
+            for root, _, names in os.walk(self.directory):
+                for name in names:
+                    path = os.path.join(root, name)
+                    if name.endswith(TEXT_EXTENSIONS + JSON_EXTENSIONS) and path != self.index_path:
+                        try:
+                            stat = os.stat(path)
+                        except FileNotFoundError:
+                            # Deleted since the walk listed it
+                            continue
+                        current[os.path.relpath(path, self.directory)] = [stat.st_size, stat.st_mtime]
+            counts = {"added": 0, "updated": 0, "removed": 0}
+            for path in list(self.files):
+                if path not in current:
+                    self._remove_file(path)
+                    counts["removed"] += 1
+            for path, signature in current.items():
+                known = self.files.get(path)
+                if known is not None and known["signature"] == signature:
+                    continue
+                counts["updated" if known is not None else "added"] += 1
+                self._remove_file(path)
+                self._index_file(path, signature)
+            self.last_update = time.time()
+            if any(counts.values()):
+                self.save()
+                logger.info(f"Search index updated: {counts}, {len(self.passages)} passages")
+            return counts
+
+    def maybe_update(self, interval: float) -> None:
+        """
+        Run update() if the last one was at least interval seconds ago.
+        """
+        if time.time() - self.last_update >= interval:
+            self.update()
+
+    def search(self, query: str, num_results: int = 5) -> list[dict[str, Any]]:
+        """
+        Return the num_results best passages for query as SerpAPI-style
+        organic results (position, title, link, snippet, source, date).
+        """
+        with self._lock:
+            n = len(self.passages)
+            if n == 0:
+                return []
+            average_length = self.total_length / n
+            scores: Counter = Counter()
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for pid, tf in postings.items():
+                    length = self.passages[pid]["length"]
+                    scores[pid] += idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / average_length))
+            return [
+                {
+                    "position": position,
+                    "title": self.passages[pid]["title"],
+                    "link": self.passages[pid]["link"],
+                    "snippet": self.passages[pid]["snippet"],
+                    "source": self.passages[pid]["source"],
+                    "date": self.passages[pid]["date"],
+                }
+                for position, (pid, _) in enumerate(scores.most_common(num_results), 1)
+            ]
+
+
+_default_index: Optional[LocalSearchIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_default_local_index() -> LocalSearchIndex:
+    """
+    Return the process-wide index over LOCAL_SEARCH_DIR, re-checking the
+    directory for changes at most every LOCAL_SEARCH_REFRESH_INTERVAL seconds.
+    """
+    global _default_index
+    if not Config.LOCAL_SEARCH_DIR:
+        raise ValueError("LOCAL_SEARCH_DIR must be set to use the local search backend.")
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = LocalSearchIndex(Config.LOCAL_SEARCH_DIR, Config.LOCAL_SEARCH_INDEX_PATH)
+        index = _default_index
+    index.maybe_update(Config.LOCAL_SEARCH_REFRESH_INTERVAL)
+    return index
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build or update the local search index and optionally query it.")
+    parser.add_argument("directory", nargs="?", default=Config.LOCAL_SEARCH_DIR, help="Corpus directory")
+    parser.add_argument("--index", default=Config.LOCAL_SEARCH_INDEX_PATH, help="Index file (default: <directory>/.search_index.json)")
+    parser.add_argument("--query", help="Query to run after updating")
+    parser.add_argument("--num", type=int, default=5)
+    args = parser.parse_args()
+    if not args.directory:
+        parser.error("a corpus directory (or LOCAL_SEARCH_DIR) is required")
+
+    index = LocalSearchIndex(args.directory, args.index)
+    print(f"Update: {index.update()}, {len(index.passages)} passages")
+    if args.query:
+        for result in index.search(args.query, args.num):
+            print(f"{result['position']}. {result['title']} ({result['source']}, {result['date']})")
+            print(f"   {result['snippet']}")
@@ -0,0 +1,348 @@
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+import logging
+import argparse
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _dummy_value(schema: dict[str, Any], defs: dict[str, Any]) -> Any:
+    """
+    Build a deterministic value that satisfies a (strict) JSON schema.
+
+    String fields whose description lists choices such as "[Yes/No/N/A]"
+    get the first choice, so categorical fields stay valid.
+    """
+    if "$ref" in schema:
+        return _dummy_value(defs[schema["$ref"].split("/")[-1]], defs)
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"] or schema["anyOf"]
+        return _dummy_value(options[0], defs)
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {name: _dummy_value(prop, defs) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_dummy_value(schema.get("items", {}), defs)]
+    if kind == "integer":
+        return 5
+    if kind == "number":
+        return 0.5
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    choices = re.match(r"\s*\[([^\]]+)\]", schema.get("description", ""))
+    if choices:
+        return choices.group(1).split("/")[0].strip()
+    return "mock"
+
+
+def _dummy_embedding(text: str, dimensions: int) -> list[float]:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimensions)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+# Prompts seen so far, used to simulate the provider's prompt cache.
+_seen_prompts: list[str] = []
+_seen_prompts_lock = threading.Lock()
+
+
+def _cached_tokens(prompt: str) -> int:
+    """
+    Mimic OpenAI prompt caching: the longest prefix shared with an earlier
+    prompt is cached in 128-token steps once it reaches 1024 tokens.
+    """
+    with _seen_prompts_lock:
+        shared = max((len(os.path.commonprefix([prompt, seen])) for seen in _seen_prompts), default=0)
+        _seen_prompts.append(prompt)
+    tokens = len(prompt[:shared].encode("utf-8")) // 4
+    return tokens // 128 * 128 if tokens >= 1024 else 0
+
+
+def _usage(prompt: str, completion: str = "") -> dict[str, Any]:
+    # About four UTF-8 bytes per token, which also roughly holds for Japanese.
+    prompt_tokens = len(prompt.encode("utf-8")) // 4 + 1
+    completion_tokens = len(completion.encode("utf-8")) // 4 + 1 if completion else 0
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def chat_completion_response(body: dict[str, Any]) -> dict[str, Any]:
+    """
+    Answer a /v1/chat/completions request: JSON that fits the requested
+    json_schema response format, or a fixed text reply. Models whose name
+    starts with "mock-refuse" refuse structured output requests.
+    """
+    prompt = "".join(m.get("content") or "" for m in body.get("messages", []))
+    response_format = body.get("response_format") or {}
+    message: dict[str, Any] = {"role": "assistant"}
+    if response_format.get("type") == "json_schema" and str(body.get("model", "")).startswith("mock-refuse"):
+        content = None
+        message["refusal"] = "I'm sorry, I can't help with that."
+    elif response_format.get("type") == "json_schema":
+        schema = response_format["json_schema"]["schema"]
+        content = json.dumps(_dummy_value(schema, schema.get("$defs", {})))
+    else:
+        content = f"Mock response to {len(prompt)} characters of prompt."
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{
+            "index": 0,
+            "message": {**message, "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {**_usage(prompt, content or ""), "prompt_tokens_details": {"cached_tokens": _cached_tokens(prompt)}},
+    }
+
+
+def embeddings_response(body: dict[str, Any]) -> dict[str, Any]:
+    """
+    Answer a /v1/embeddings request with unit vectors derived from each input's hash.
+    """
+    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+    dimensions = body.get("dimensions") or 3072
+    prompt_tokens = _usage("".join(inputs))["prompt_tokens"]
+    return {
+        "object": "list",
+        "model": body.get("model", "mock"),
+        "data": [
+            {"object": "embedding", "index": i, "embedding": _dummy_embedding(text, dimensions)}
+            for i, text in enumerate(inputs)
+        ],
+        "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+    }
+
+
+def chat_completion_chunks(body: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Split a chat completion into the chunk objects of a streamed response,
+    one word per chunk, ending with a usage chunk.
+    """
+    completion = chat_completion_response(body)
+    content = completion["choices"][0]["message"]["content"]
+    base = {"id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"], "model": completion["model"]}
+    words = re.findall(r"\S+\s*", content)
+    chunks = [
+        {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": word} if i == 0 else {"content": word}, "finish_reason": None}]}
+        for i, word in enumerate(words)
+    ]
+    chunks.append({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+    if (body.get("stream_options") or {}).get("include_usage"):
+        chunks.append({**base, "choices": [], "usage": completion["usage"]})
+    return chunks
+
+
+_HANDLERS = {
+    "/v1/chat/completions": chat_completion_response,
+    "/v1/embeddings": embeddings_response,
+}
+
+
+class MockOpenAIServer:
+    """
+    In-process stand-in for the OpenAI endpoints this project uses.
+
+    Serves chat completions (plain, streamed and json_schema structured
+    output), embeddings, file upload/download and the Batch API, all answered with
+    deterministic dummy data. Requests for models whose name starts with
+    "mock-no-quota" get an insufficient_quota 429. Point the client at it with
+    OPENAI_BASE_URL=http://127.0.0.1:<port>/v1. Batches complete after
+    `batch_delay` seconds.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, batch_delay: float = 0.0):
+        self.batch_delay = batch_delay
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict[str, Any]] = {}
+        self.requests: list[tuple[str, str]] = []
+        self._lock = threading.RLock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-openai-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Mock OpenAI server listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _store_file(self, content: bytes) -> str:
+        file_id = f"file-{uuid.uuid4().hex}"
+        with self._lock:
+            self.files[file_id] = content
+        return file_id
+
+    def _file_object(self, file_id: str, purpose: str) -> dict[str, Any]:
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(self.files[file_id]),
+            "created_at": int(time.time()),
+            "filename": f"{file_id}.jsonl",
+            "purpose": purpose,
+            "status": "processed",
+        }
+
+    def _create_batch(self, body: dict[str, Any]) -> dict[str, Any]:
+        lines = [line for line in self.files[body["input_file_id"]].decode("utf-8").splitlines() if line.strip()]
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex}",
+            "object": "batch",
+            "endpoint": body["endpoint"],
+            "input_file_id": body["input_file_id"],
+            "completion_window": body.get("completion_window", "24h"),
+            "status": "in_progress",
+            "created_at": int(time.time()),
+            "output_file_id": None,
+            "error_file_id": None,
+            "request_counts": {"total": len(lines), "completed": 0, "failed": 0},
+        }
+        with self._lock:
+            self.batches[batch["id"]] = batch
+        threading.Timer(self.batch_delay, self._complete_batch, args=(batch["id"], lines)).start()
+        return batch
+
+    def _complete_batch(self, batch_id: str, lines: list[str]) -> None:
+        outputs, errors = [], []
+        for line in lines:
+            request = json.loads(line)
+            handler = _HANDLERS.get(request["url"])
+            if handler is None:
+                errors.append({"id": uuid.uuid4().hex, "custom_id": request["custom_id"], "response": None,
+                               "error": {"code": "invalid_url", "message": f"Unsupported url {request['url']}"}})
+                continue
+            outputs.append({
+                "id": uuid.uuid4().hex,
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "request_id": uuid.uuid4().hex, "body": handler(request["body"])},
+                "error": None,
+            })
+        encode = lambda records: "".join(json.dumps(r) + "\n" for r in records).encode("utf-8")
+        with self._lock:
+            batch = self.batches[batch_id]
+            batch["output_file_id"] = self._store_file(encode(outputs)) if outputs else None
+            batch["error_file_id"] = self._store_file(encode(errors)) if errors else None
+            batch["request_counts"].update(completed=len(outputs), failed=len(errors))
+            batch["status"] = "completed"
+            batch["completed_at"] = int(time.time())
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _reply(self, status: int, payload: Any, content_type: str = "application/json") -> None:
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, chunks: list[dict[str, Any]]) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for chunk in chunks:
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def _not_found(self) -> None:
+                self._reply(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                server.requests.append(("GET", path))
+                match = re.fullmatch(r"/v1/batches/([^/]+)", path)
+                if match and match.group(1) in server.batches:
+                    return self._reply(200, server.batches[match.group(1)])
+                match = re.fullmatch(r"/v1/files/([^/]+)/content", path)
+                if match and match.group(1) in server.files:
+                    return self._reply(200, server.files[match.group(1)], "application/octet-stream")
+                self._not_found()
+
+            def do_POST(self):
+                path = self.path.split("?")[0]
+                server.requests.append(("POST", path))
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if path == "/v1/files":
+                    header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+                    message = BytesParser(policy=HTTP).parsebytes(header + raw)
+                    parts = {part.get_param("name", header="content-disposition"): part for part in message.iter_parts()}
+                    purpose = parts["purpose"].get_payload(decode=True).decode("utf-8") if "purpose" in parts else "batch"
+                    file_id = server._store_file(parts["file"].get_payload(decode=True))
+                    return self._reply(200, server._file_object(file_id, purpose))
+                body = json.loads(raw or b"{}")
+                if path == "/v1/batches":
+                    if body.get("input_file_id") not in server.files:
+                        return self._reply(400, {"error": {"message": "Unknown input_file_id", "type": "invalid_request_error"}})
+                    return self._reply(200, server._create_batch(body))
+                if path in _HANDLERS and str(body.get("model", "")).startswith("mock-no-quota"):
+                    return self._reply(429, {"error": {
+                        "message": "You exceeded your current quota, please check your plan and billing details.",
+                        "type": "insufficient_quota",
+                        "code": "insufficient_quota",
+                    }})
+                if path == "/v1/chat/completions" and body.get("stream"):
+                    return self._stream(chat_completion_chunks(body))
+                if path in _HANDLERS:
+                    return self._reply(200, _HANDLERS[path](body))
+                self._not_found()
+
+        return Handler
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the OpenAI API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-delay", type=float, default=1.0, help="Seconds before a batch job completes")
+    args = parser.parse_args()
+
+    mock = MockOpenAIServer(args.host, args.port, args.batch_delay).start()
+    print(f"Set OPENAI_BASE_URL={mock.base_url} to use the mock server. Press Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        mock.stop()
@@ -0,0 +1,82 @@
+import logging
+import threading
+from typing import NamedTuple, Optional
+
+from utils.config import Config
+
+
+class ModelRoute(NamedTuple):
+    """
+    Where the requests of one call site go.
+
+    When a latency budget is set, a request that has not finished within it
+    is abandoned and re-sent to the fallback model (if any); a failed
+    request also falls back.
+    """
+    model: str
+    latency_budget: Optional[float] = None
+    fallback: Optional[str] = None
+
+
+def parse_model_routes(spec: Optional[str]) -> dict[str, ModelRoute]:
+    """
+    Parse a "call_site=model[:budget[:fallback]],..." string into
+    {call_site: ModelRoute}.
+
+    A call site is an agent method such as "MarketAgent._generate_keywords",
+    an agent class such as "VCScoutAgent" (all of its methods) or "*" (every
+    call site). The budget is in seconds and may be left empty, e.g.
+    "MarketAgent._generate_keywords=gpt-4o-mini,VCScoutAgent.side_evaluate=gpt-4o:20:gpt-4o-mini".
+    """
+    routes = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        call_site, _, target = item.partition("=")
+        model, _, rest = target.partition(":")
+        budget, _, fallback = rest.partition(":")
+        if not call_site.strip() or not model.strip():
+            raise ValueError(f"Invalid model route: {item!r}")
+        routes[call_site.strip()] = ModelRoute(
+            model=model.strip(),
+            latency_budget=float(budget) if budget.strip() else None,
+            fallback=fallback.strip() or None,
+        )
+    return routes
+
+
+class ModelRouter:
+    """
+    Routing table mapping call sites to models.
+
+    The most specific entry wins: the exact call site, then its agent class,
+    then "*". Call sites without an entry keep the model the agent was
+    created with.
+    """
+
+    def __init__(self, routes: Optional[dict[str, ModelRoute]] = None):
+        self.routes = dict(routes or {})
+        self.logger = logging.getLogger(__name__)
+
+    def route(self, call_site: str, default_model: str) -> ModelRoute:
+        owner = call_site.split(".", 1)[0]
+        for name in (call_site, owner, "*"):
+            route = self.routes.get(name)
+            if route is not None:
+                return route
+        return ModelRoute(default_model)
+
+
+_default_router: Optional[ModelRouter] = None
+_default_router_lock = threading.Lock()
+
+
+def get_default_router() -> ModelRouter:
+    """
+    Return the process-wide router configured through LLM_MODEL_ROUTES.
+    """
+    global _default_router
+    with _default_router_lock:
+        if _default_router is None:
+            _default_router = ModelRouter(parse_model_routes(Config.LLM_MODEL_ROUTES))
+        return _default_router
@@ -1,12 +1,40 @@
 import os
+import sys
+import time
+import queue
+import asyncio
 import logging
-from typing import Optional, TypeVar, Type
-from openai import OpenAI
-from pydantic import BaseModel
+import threading
+import contextvars
+import weakref
+import concurrent.futures
+import httpx
+import numpy as np
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, Sequence, TypeVar, Type
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, pydantic_function_tool
+from openai.types import CreateEmbeddingResponse
+from openai.types.chat import ChatCompletion, ParsedChatCompletion
+from pydantic import BaseModel, ValidationError
 from dotenv import load_dotenv
 
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.llm_cache import LLMCache, get_default_cache
+from utils.embedding_store import EmbeddingStore, get_default_embedding_store
+from utils.config import Config
+from utils.rate_limiter import RateLimitExceededError, RateLimitScheduler, estimate_tokens, get_default_scheduler
+from utils.single_flight import SingleFlight, get_default_single_flight
+from utils.hedging import Hedger, get_default_hedger
+from utils.model_routing import ModelRouter, get_default_router
+from utils.llm_metrics import infer_call_site, record_llm_call
+from utils.openai_batch import current_batch_session
+from utils.llm_backend import LLMBackend
+
 # Generic type for Pydantic models
 T = TypeVar('T', bound=BaseModel)
+R = TypeVar('R')
 
 # Configure basic logging if not already configured by the main script
 # This is a failsafe; ideally, the main script configures logging.
@@ -22,59 +50,468 @@ if os.path.exists(dotenv_path):
 else:
     logging.info(".env file not found at project root, relying on system environment variables or other secrets management.")
 
-class OpenAIAPI:
-    def __init__(self, model_name):
+def _resolve_api_key(logger: logging.Logger) -> str:
+    """
+    Resolve the OpenAI API key from the environment or Streamlit secrets.
+    """
+    # 1. Try os.getenv() first (which load_dotenv() should populate if .env exists)
+    api_key = os.getenv("OPENAI_API_KEY")
+    # 2. Fallback to Streamlit secrets if not found via os.getenv() AND if Streamlit is available
+    if not api_key:
+        try:
+            import streamlit as st
+            api_key = st.secrets.get("OPENAI_API_KEY")
+        except ImportError:
+            logger.debug("Streamlit is not installed or not in a Streamlit environment, skipping Streamlit secrets.")
+        except Exception as e:
+            logger.debug(f"Error trying to access Streamlit secrets: {e}")
+
+    if not api_key:
+        logger.error("OPENAI_API_KEY not found through os.getenv, .env, or Streamlit secrets.")
+        raise ValueError("OPENAI_API_KEY not found.")
+    return api_key
+
+
+# Process-wide event loop on which every OpenAI request is executed. The
+# synchronous OpenAIAPI submits coroutines to it from worker threads, so a
+# single loop can keep many requests in flight at once.
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="openai-api-loop", daemon=True)
+            thread.start()
+            _background_loop = loop
+        return _background_loop
+
+
+async def _run_in_context(ctx: contextvars.Context, coro: Awaitable[R]) -> R:
+    # Tasks copy the current context on creation, so creating the task inside
+    # ctx.run() carries the caller's context variables over to the loop thread.
+    return await ctx.run(asyncio.ensure_future, coro)
+
+
+def _submit(coro: Awaitable[R]) -> concurrent.futures.Future:
+    loop = _get_background_loop()
+    return asyncio.run_coroutine_threadsafe(_run_in_context(contextvars.copy_context(), coro), loop)
+
+
+def run_sync(coro: Awaitable[R]) -> R:
+    """
+    Run a coroutine on the background loop and block until it finishes.
+    """
+    loop = _get_background_loop()
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        raise RuntimeError("run_sync() cannot be called from the OpenAI API event loop; await the coroutine instead.")
+    return _submit(coro).result()
+
+
+async def run_async(coro: Awaitable[R]) -> R:
+    """
+    Await a coroutine on the background loop from any event loop.
+    """
+    loop = _get_background_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(_submit(coro))
+
+
+def iter_sync(agen: AsyncIterator[R]) -> Iterator[R]:
+    """
+    Iterate an async generator on the background loop from synchronous code.
+
+    Items are handed over as soon as they are produced. Closing the returned
+    iterator early cancels the async generator.
+    """
+    items: queue.Queue = queue.Queue()
+    done = object()
+
+    async def pump() -> None:
+        try:
+            async for item in agen:
+                items.put((item, None))
+        except Exception as e:
+            items.put((done, e))
+        else:
+            items.put((done, None))
+
+    future = _submit(pump())
+    try:
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        future.cancel()
+
+
+# AsyncOpenAI clients shared by every agent, one per (event loop, API key),
+# so all agents in a process reuse the same warm connection pool.
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_client(api_key: str) -> AsyncOpenAI:
+    """
+    Return the pooled AsyncOpenAI client for the running event loop.
+
+    Pool size, keep-alive and timeouts come from the OPENAI_* settings in Config.
+    """
+    loop = asyncio.get_running_loop()
+    with _shared_clients_lock:
+        clients = _shared_clients.setdefault(loop, {})
+        client = clients.get(api_key)
+        if client is None:
+            http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=Config.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=Config.OPENAI_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(Config.OPENAI_TIMEOUT, connect=Config.OPENAI_CONNECT_TIMEOUT),
+            )
+            # Retries are handled by the RateLimitScheduler, not the client.
+            client = AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+            clients[api_key] = client
+            logging.getLogger(__name__).debug(
+                f"Created shared OpenAI client (max_connections={Config.OPENAI_MAX_CONNECTIONS}, "
+                f"keepalive={Config.OPENAI_MAX_KEEPALIVE_CONNECTIONS})"
+            )
+        return client
+
+
+def _structured_response_format(schema_class: Type[T]) -> dict[str, Any]:
+    """
+    Build the strict json_schema response_format that
+    client.beta.chat.completions.parse() sends for schema_class.
+    """
+    function = pydantic_function_tool(schema_class)["function"]
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": function["name"],
+            "schema": function["parameters"],
+            "strict": True,
+        },
+    }
+
+
+def _parse_structured_completion(schema_class: Type[T], body: dict[str, Any]) -> ParsedChatCompletion[T]:
+    """
+    Parse a chat completion body returned by the Batch API into the same
+    ParsedChatCompletion that client.beta.chat.completions.parse() returns.
+
+    Raises ValidationError if the content does not match schema_class.
+    """
+    body = dict(body)
+    choices = []
+    for choice in body.get("choices") or []:
+        message = dict(choice.get("message") or {})
+        if message.get("content") and not message.get("refusal"):
+            message["parsed"] = schema_class.model_validate_json(message["content"])
+        choices.append({**choice, "message": message})
+    body["choices"] = choices
+    return ParsedChatCompletion[schema_class].model_validate(body)
+
+
+class AsyncOpenAIAPI:
+    def __init__(
+        self,
+        model_name,
+        cache: Optional[LLMCache] = None,
+        embedding_store: Optional[EmbeddingStore] = None,
+        scheduler: Optional[RateLimitScheduler] = None,
+        single_flight: Optional[SingleFlight] = None,
+        hedger: Optional[Hedger] = None,
+        router: Optional[ModelRouter] = None,
+    ):
         """
-        Initialize the OpenAIAPI with the given model name.
+        Initialize the AsyncOpenAIAPI with the given model name.
+
+        If no cache or embedding store is given, the process-wide ones
+        configured through LLM_CACHE_PATH / EMBEDDING_STORE_DIR are used
+        (when set). Requests go through the process-wide rate-limit
+        scheduler unless another one is given, and identical concurrent
+        requests are coalesced unless OPENAI_COALESCE_REQUESTS is off.
+        Slow requests are hedged only when OPENAI_HEDGE_REQUESTS is on or a
+        hedger is given. model_name is the default model; the router
+        (LLM_MODEL_ROUTES by default) can send individual call sites to
+        other models.
+
+        Failed requests return None, except that RateLimitExceededError is
+        raised when a model stays rate limited after every retry or the
+        account has run out of quota.
         """
         self.model_name = model_name
         self.logger = logging.getLogger(__name__)
-        
-        api_key = None
+        self._api_key = _resolve_api_key(self.logger)
+        self._client: Optional[AsyncOpenAI] = None
+        self.cache = cache if cache is not None else get_default_cache()
+        self.embedding_store = embedding_store if embedding_store is not None else get_default_embedding_store()
+        self.scheduler = scheduler if scheduler is not None else get_default_scheduler()
+        if single_flight is None and Config.OPENAI_COALESCE_REQUESTS:
+            single_flight = get_default_single_flight()
+        self.single_flight = single_flight
+        self.hedger = hedger if hedger is not None else get_default_hedger()
+        self.router = router if router is not None else get_default_router()
+        # The founder idea-fit network was trained on these embeddings, so
+        # changing them requires retraining it.
+        self.embedding_model = Config.EMBEDDING_MODEL
+        self.embedding_dimensions = Config.EMBEDDING_DIMENSIONS
 
-        # 1. Try os.getenv() first (which load_dotenv() should populate if .env exists)
-        api_key = os.getenv("OPENAI_API_KEY")
-        # 2. Fallback to Streamlit secrets if not found via os.getenv() AND if Streamlit is available
-        if not api_key:
-            try:
-                import streamlit as st
-                api_key = st.secrets.get("OPENAI_API_KEY")
-            except ImportError:
-                self.logger.debug("Streamlit is not installed or not in a Streamlit environment, skipping Streamlit secrets.")
-            except Exception as e:
-                self.logger.debug(f"Error trying to access Streamlit secrets: {e}")
+    @property
+    def client(self) -> AsyncOpenAI:
+        """
+        The AsyncOpenAI client used for requests: the process-wide shared
+        client for the running loop unless one was assigned explicitly.
+        """
+        if self._client is not None:
+            return self._client
+        return get_shared_client(self._api_key)
 
-        if not api_key:
-            self.logger.error("OPENAI_API_KEY not found through os.getenv, .env, or Streamlit secrets.")
-            raise ValueError("OPENAI_API_KEY not found.")
-        
-        self.client = OpenAI(api_key=api_key)
+    @client.setter
+    def client(self, client: AsyncOpenAI) -> None:
+        self._client = client
 
-    def get_completion(self, system_content: str, user_content: str) -> Optional[str]:
+    async def _send(
+        self,
+        model: str,
+        estimated_tokens: int,
+        call: Callable[[], Awaitable[R]],
+        operation: str,
+        call_site: str,
+        request_key: Optional[str] = None,
+        batch_request: Optional[tuple[str, dict[str, Any], Callable[[dict[str, Any]], R]]] = None,
+    ) -> R:
         """
-        Get a completion from the OpenAI API.
+        Send one API request through the rate-limit scheduler and record
+        its latency, token usage and retries.
+
+        When a request_key is given, an identical request already in flight
+        is joined instead of being sent again. Inside a BatchSession, the
+        batch_request (endpoint, request body, response parser) is queued
+        for the next Batch API job instead. With a hedger, a request that
+        is slow for its call site is raced against a duplicate.
+        """
+        retries = 0
+        hedged = False
+
+        def on_retry(attempt: int, error: Exception) -> None:
+            nonlocal retries
+            retries = attempt
+
+        def scheduled(on_start: Optional[Callable[[], None]] = None) -> Awaitable[R]:
+            return self.scheduler.run(model, estimated_tokens, call, on_retry=on_retry, on_start=on_start)
+
+        async def hedged_send() -> R:
+            nonlocal hedged
+            result, hedged = await self.hedger.run(call_site, scheduled, paused=lambda: self.scheduler.is_paused(model))
+            return result
+
+        send = scheduled if self.hedger is None else hedged_send
+
+        start = time.perf_counter()
+        result = None
+        shared = False
+        try:
+            session = current_batch_session()
+            if session is not None and batch_request is not None:
+                endpoint, body, parse = batch_request
+                key = request_key or LLMCache.make_key("batch", model, [{"role": "user", "content": endpoint}], body)
+                result = parse(await session.submit(endpoint, body, key))
+            elif request_key is None or self.single_flight is None:
+                result = await send()
+            else:
+                result, shared = await self.single_flight.do(request_key, send)
+            return result
+        finally:
+            usage = None if shared else getattr(result, "usage", None)
+            prompt_details = getattr(usage, "prompt_tokens_details", None)
+            record_llm_call(
+                model=model,
+                call_site=call_site,
+                operation=operation,
+                latency=time.perf_counter() - start,
+                prompt_tokens=getattr(usage, "prompt_tokens", None) or 0,
+                completion_tokens=getattr(usage, "completion_tokens", None) or 0,
+                cached_tokens=getattr(prompt_details, "cached_tokens", None) or 0,
+                retries=retries,
+                deduplicated=shared,
+                hedged=hedged,
+            )
+
+    async def _routed(self, call_site: str, attempt: Callable[[str], Awaitable[R]]) -> R:
+        """
+        Run attempt(model) on the model routed to call_site, retrying on the
+        route's fallback model if it fails or exceeds its latency budget.
         """
-        self.logger.debug(f"Requesting completion. Model: {self.model_name}, System: '{system_content[:50]}...', User: '{user_content[:50]}...'")
+        route = self.router.route(call_site, self.model_name)
+        # Batch API jobs take minutes to hours; budgets apply to live requests only.
+        budget = None if current_batch_session() is not None else route.latency_budget
         try:
-            completion = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": system_content},
-                    {"role": "user", "content": user_content}
-                ]
+            return await asyncio.wait_for(attempt(route.model), budget)
+        except Exception as e:
+            if route.fallback is None or route.fallback == route.model:
+                raise
+            reason = f"exceeded its {budget}s latency budget" if isinstance(e, asyncio.TimeoutError) else f"failed ({e})"
+            self.logger.warning(f"{call_site} on {route.model} {reason}; falling back to {route.fallback}")
+            return await attempt(route.fallback)
+
+    @staticmethod
+    def _estimate_chat_tokens(messages: list[dict[str, Any]]) -> int:
+        return sum(estimate_tokens(m["content"]) for m in messages) + Config.OPENAI_COMPLETION_TOKEN_ESTIMATE
+
+    async def get_completion(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> Optional[str]:
+        """
+        Get a completion from the OpenAI API.
+        """
+        call_site = call_site or infer_call_site()
+        self.logger.debug(f"Requesting completion. Call site: {call_site}, System: '{system_content[:50]}...', User: '{user_content[:50]}...'")
+        messages = [
+            {"role": "system", "content": system_content},
+            {"role": "user", "content": user_content}
+        ]
+
+        async def attempt(model: str) -> Optional[str]:
+            request_key = LLMCache.make_key("completion", model, messages)
+            if self.cache is not None:
+                start = time.perf_counter()
+                cached = self.cache.get(request_key)
+                if cached is not None:
+                    self.logger.debug("Completion served from cache.")
+                    record_llm_call(model, call_site, "completion", time.perf_counter() - start, cache_hit=True)
+                    return cached
+            completion = await self._send(
+                model,
+                self._estimate_chat_tokens(messages),
+                lambda: self.client.chat.completions.create(
+                    model=model,
+                    messages=messages
+                ),
+                "completion",
+                call_site,
+                request_key=request_key,
+                batch_request=(
+                    "/v1/chat/completions",
+                    {"model": model, "messages": messages},
+                    ChatCompletion.model_validate,
+                ),
             )
             response_content = completion.choices[0].message.content
-            self.logger.debug(f"Completion received: '{response_content[:100]}...'")
+            self.logger.debug(f"Completion received from {model}: '{response_content[:100]}...'")
+            if self.cache is not None and response_content is not None:
+                self.cache.set(request_key, "completion", response_content)
             return response_content
+
+        try:
+            return await self._routed(call_site, attempt)
+        except RateLimitExceededError:
+            raise
         except Exception as e:
             self.logger.error(f"An error occurred during get_completion: {e}", exc_info=True)
             return None
 
-    def get_structured_output(
+    async def get_completion_stream(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream a completion from the OpenAI API, yielding text chunks as they
+        are generated.
+
+        Shares its cache entries with get_completion; a cached completion is
+        yielded as a single chunk. On error the stream just ends (rate-limit
+        exhaustion raises RateLimitExceededError instead). The stream
+        goes to the call site's routed model; latency budgets and fallbacks
+        do not apply to streams.
+        """
+        call_site = call_site or infer_call_site()
+        model = self.router.route(call_site, self.model_name).model
+        self.logger.debug(f"Requesting completion stream. Model: {model}, System: '{system_content[:50]}...', User: '{user_content[:50]}...'")
+        messages = [
+            {"role": "system", "content": system_content},
+            {"role": "user", "content": user_content}
+        ]
+        request_key = LLMCache.make_key("completion", model, messages)
+        if self.cache is not None:
+            start = time.perf_counter()
+            cached = self.cache.get(request_key)
+            if cached is not None:
+                self.logger.debug("Completion stream served from cache.")
+                record_llm_call(model, call_site, "completion_stream", time.perf_counter() - start, cache_hit=True)
+                yield cached
+                return
+
+        retries = 0
+
+        def on_retry(attempt: int, error: Exception) -> None:
+            nonlocal retries
+            retries = attempt
+
+        start = time.perf_counter()
+        parts: list[str] = []
+        usage = None
+        try:
+            # Only opening the stream is retried; once tokens have been
+            # yielded a failure ends the stream.
+            stream = await self.scheduler.run(
+                model,
+                self._estimate_chat_tokens(messages),
+                lambda: self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                ),
+                on_retry=on_retry,
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+        except RateLimitExceededError:
+            raise
+        except Exception as e:
+            self.logger.error(f"An error occurred during get_completion_stream: {e}", exc_info=True)
+            return
+        finally:
+            prompt_details = getattr(usage, "prompt_tokens_details", None)
+            record_llm_call(
+                model=model,
+                call_site=call_site,
+                operation="completion_stream",
+                latency=time.perf_counter() - start,
+                prompt_tokens=getattr(usage, "prompt_tokens", None) or 0,
+                completion_tokens=getattr(usage, "completion_tokens", None) or 0,
+                cached_tokens=getattr(prompt_details, "cached_tokens", None) or 0,
+                retries=retries,
+            )
+        if usage is not None:
+            self.scheduler.record_usage(model, self._estimate_chat_tokens(messages), usage.total_tokens)
+        self.logger.debug(f"Completion stream finished: '{''.join(parts)[:100]}...'")
+        if self.cache is not None and parts:
+            self.cache.set(request_key, "completion", "".join(parts))
+
+    async def get_structured_output(
         self,
         schema_class: Type[T],
         user_prompt: str,
         system_prompt: str,
+        call_site: Optional[str] = None,
     ) -> Optional[T]:
         """
         Structure the output according to the provided schema, user prompt, and system prompt.
@@ -83,61 +520,310 @@ class OpenAIAPI:
             schema_class: Pydantic model class for structured output
             user_prompt: User message content
             system_prompt: System message content
+            call_site: Name of the calling agent method, inferred if omitted
             
         Returns:
             Parsed structured output of the same type as schema_class, or None if error occurred
+
+        Raises:
+            RateLimitExceededError: if the request stays rate limited after every retry
+                or the account has no quota left
         """
-        self.logger.debug(f"Requesting structured output. Model: {self.model_name}, Schema: {schema_class.__name__}, System: '{system_prompt[:50]}...', User: '{user_prompt[:50]}...'")
-        try:
-            self.logger.debug("Calling OpenAI client.beta.chat.completions.parse...")
-            completion = self.client.beta.chat.completions.parse(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                response_format=schema_class,
+        call_site = call_site or infer_call_site()
+        self.logger.debug(f"Requesting structured output. Call site: {call_site}, Schema: {schema_class.__name__}, System: '{system_prompt[:50]}...', User: '{user_prompt[:50]}...'")
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+        async def attempt(model: str) -> T:
+            request_key = LLMCache.make_key("structured_output", model, messages, schema_class.model_json_schema())
+            if self.cache is not None:
+                start = time.perf_counter()
+                cached = self.cache.get(request_key)
+                if cached is not None:
+                    try:
+                        response = schema_class.model_validate_json(cached)
+                        self.logger.debug("Structured output served from cache.")
+                        record_llm_call(model, call_site, "structured_output", time.perf_counter() - start, cache_hit=True)
+                        return response
+                    except ValidationError as e:
+                        self.logger.warning(f"Discarding cached {schema_class.__name__} that no longer validates: {e}")
+                        self.cache.invalidate(request_key)
+            self.logger.debug(f"Calling OpenAI client.beta.chat.completions.parse on {model}...")
+            completion = await self._send(
+                model,
+                self._estimate_chat_tokens(messages),
+                lambda: self.client.beta.chat.completions.parse(
+                    model=model,
+                    messages=messages,
+                    response_format=schema_class,
+                ),
+                "structured_output",
+                call_site,
+                request_key=request_key,
+                batch_request=(
+                    "/v1/chat/completions",
+                    {
+                        "model": model,
+                        "messages": messages,
+                        "response_format": _structured_response_format(schema_class),
+                    },
+                    lambda body: _parse_structured_completion(schema_class, body),
+                ),
             )
             self.logger.debug(f"Raw completion object from parse: {completion}")
 
-            if completion and completion.choices and len(completion.choices) > 0:
-                if hasattr(completion.choices[0], 'message') and completion.choices[0].message:
-                    if hasattr(completion.choices[0].message, 'parsed'):
-                        response = completion.choices[0].message.parsed
-                        self.logger.debug(f"Parsed response: {response}")
-                        return response
-                    else:
-                        self.logger.error("Completion choice message does not have 'parsed' attribute.")
-                        self.logger.error(f"Message object: {completion.choices[0].message}")
-                        return None
-                else:
-                    self.logger.error("Completion choice does not have 'message' attribute or message is None.")
-                    self.logger.error(f"Choice object: {completion.choices[0]}")
-                    return None
-            else:
-                self.logger.error("Completion object is None, has no choices, or choices list is empty.")
-                return None
+            # Raise instead of returning None so the route's fallback model gets a try.
+            if not completion or not completion.choices or not getattr(completion.choices[0], 'message', None):
+                raise ValueError(f"Completion from {model} has no choices or message: {completion}")
+            message = completion.choices[0].message
+            if getattr(message, 'refusal', None):
+                raise ValueError(f"{model} refused to produce {schema_class.__name__}: {message.refusal}")
+            response = getattr(message, 'parsed', None)
+            if response is None:
+                raise ValueError(f"Completion from {model} could not be parsed as {schema_class.__name__}: {message}")
+            self.logger.debug(f"Parsed response: {response}")
+            if self.cache is not None:
+                self.cache.set(request_key, "structured_output", response.model_dump_json())
+            return response
+
+        try:
+            return await self._routed(call_site, attempt)
+        except RateLimitExceededError:
+            raise
         except Exception as e:
             self.logger.error(f"An error occurred during get_structured_output: {e}", exc_info=True)
             return None
 
-    def get_embeddings(self, text: str) -> Optional[list[float]]:
+    async def get_embeddings(self, text: str, call_site: Optional[str] = None) -> Optional[np.ndarray]:
         """
-        Get embeddings for the given text.
+        Get embeddings for the given text as a float32 vector.
+
+        Vectors found in the embedding store are returned as read-only views
+        into its memory-mapped file.
         """
+        call_site = call_site or infer_call_site()
         self.logger.debug(f"Requesting embeddings for text: '{text[:50]}...'")
+        if self.embedding_store is not None:
+            start = time.perf_counter()
+            stored = self.embedding_store.get(self.embedding_model, self.embedding_dimensions, text)
+            if stored is not None:
+                self.logger.debug("Embedding served from embedding store.")
+                record_llm_call(self.embedding_model, call_site, "embedding", time.perf_counter() - start, cache_hit=True)
+                return stored
         try:
-            response = self.client.embeddings.create(
-                input=text,
-                model="text-embedding-3-large",  # You might want to make this configurable
-                dimensions = 100,
+            response = await self._send(
+                self.embedding_model,
+                estimate_tokens(text),
+                lambda: self.client.embeddings.create(
+                    input=text,
+                    model=self.embedding_model,
+                    dimensions=self.embedding_dimensions,
+                ),
+                "embedding",
+                call_site,
+                request_key=LLMCache.make_key(
+                    "embedding",
+                    self.embedding_model,
+                    [{"role": "user", "content": text}],
+                    {"dimensions": self.embedding_dimensions},
+                ),
+                batch_request=(
+                    "/v1/embeddings",
+                    {"input": text, "model": self.embedding_model, "dimensions": self.embedding_dimensions},
+                    CreateEmbeddingResponse.model_validate,
+                ),
             )
             self.logger.debug(f"Embedding response: {response}")
-            return response.data[0].embedding
+            embedding = response.data[0].embedding
+            if self.embedding_store is not None:
+                return self.embedding_store.put(self.embedding_model, self.embedding_dimensions, text, embedding)
+            return np.asarray(embedding, dtype=np.float32)
+        except RateLimitExceededError:
+            raise
         except Exception as e:
             self.logger.error(f"An error occurred while getting embeddings: {e}", exc_info=True)
             return None
 
+    async def get_embeddings_batch(self, texts: Sequence[str], call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Get embeddings for many texts, returned as an (n, dimensions) float32
+        array in input order.
+
+        Texts already in the embedding store are not re-embedded; the rest
+        are de-duplicated and sent in chunks of EMBEDDING_BATCH_SIZE inputs,
+        with the chunk requests issued concurrently.
+        """
+        call_site = call_site or infer_call_site()
+        texts = list(texts)
+        self.logger.debug(f"Requesting embeddings for {len(texts)} texts")
+        if not texts:
+            return np.empty((0, self.embedding_dimensions), dtype=np.float32)
+
+        vectors: dict[str, Sequence[float]] = {}
+        if self.embedding_store is not None:
+            start = time.perf_counter()
+            stored = self.embedding_store.get_many(self.embedding_model, self.embedding_dimensions, texts)
+            vectors.update((t, v) for t, v in zip(texts, stored) if v is not None)
+            if vectors:
+                record_llm_call(self.embedding_model, call_site, "embedding_batch", time.perf_counter() - start, cache_hit=True)
+        missing = [t for t in dict.fromkeys(texts) if t not in vectors]
+
+        if missing:
+            batch_size = Config.EMBEDDING_BATCH_SIZE
+            chunks = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+            try:
+                responses = await asyncio.gather(*[
+                    self._send(
+                        self.embedding_model,
+                        sum(estimate_tokens(t) for t in chunk),
+                        lambda chunk=chunk: self.client.embeddings.create(
+                            input=chunk,
+                            model=self.embedding_model,
+                            dimensions=self.embedding_dimensions,
+                        ),
+                        "embedding_batch",
+                        call_site,
+                        batch_request=(
+                            "/v1/embeddings",
+                            {"input": chunk, "model": self.embedding_model, "dimensions": self.embedding_dimensions},
+                            CreateEmbeddingResponse.model_validate,
+                        ),
+                    )
+                    for chunk in chunks
+                ])
+            except RateLimitExceededError:
+                raise
+            except Exception as e:
+                self.logger.error(f"An error occurred while getting batch embeddings: {e}", exc_info=True)
+                return None
+            for chunk, response in zip(chunks, responses):
+                fetched = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+                vectors.update(zip(chunk, fetched))
+                if self.embedding_store is not None:
+                    self.embedding_store.put_many(self.embedding_model, self.embedding_dimensions, chunk, fetched)
+            self.logger.debug(f"Embedded {len(missing)} texts in {len(chunks)} requests")
+
+        return np.asarray([vectors[t] for t in texts], dtype=np.float32)
+
+class OpenAIAPI(LLMBackend):
+    def __init__(
+        self,
+        model_name,
+        cache: Optional[LLMCache] = None,
+        embedding_store: Optional[EmbeddingStore] = None,
+        scheduler: Optional[RateLimitScheduler] = None,
+        single_flight: Optional[SingleFlight] = None,
+        hedger: Optional[Hedger] = None,
+        router: Optional[ModelRouter] = None,
+    ):
+        """
+        Initialize the OpenAIAPI with the given model name.
+
+        This is a thin synchronous wrapper: every call is executed by an
+        AsyncOpenAIAPI on the shared background event loop.
+        """
+        self.model_name = model_name
+        self.logger = logging.getLogger(__name__)
+        self.async_api = AsyncOpenAIAPI(
+            model_name,
+            cache=cache,
+            embedding_store=embedding_store,
+            scheduler=scheduler,
+            single_flight=single_flight,
+            hedger=hedger,
+            router=router,
+        )
+
+    @property
+    def router(self) -> ModelRouter:
+        return self.async_api.router
+
+    @property
+    def embedding_model(self) -> str:
+        return self.async_api.embedding_model
+
+    @property
+    def embedding_dimensions(self) -> int:
+        return self.async_api.embedding_dimensions
+
+    def get_completion(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> Optional[str]:
+        """
+        Get a completion from the OpenAI API.
+        """
+        call_site = call_site or infer_call_site()
+        return run_sync(self.async_api.get_completion(system_content, user_content, call_site=call_site))
+
+    def get_completion_stream(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream a completion from the OpenAI API, yielding text chunks as they
+        are generated.
+        """
+        call_site = call_site or infer_call_site()
+        return iter_sync(self.async_api.get_completion_stream(system_content, user_content, call_site=call_site))
+
+    def get_structured_output(
+        self,
+        schema_class: Type[T],
+        user_prompt: str,
+        system_prompt: str,
+        call_site: Optional[str] = None,
+    ) -> Optional[T]:
+        """
+        Structure the output according to the provided schema, user prompt, and system prompt.
+        """
+        call_site = call_site or infer_call_site()
+        return run_sync(self.async_api.get_structured_output(schema_class, user_prompt, system_prompt, call_site=call_site))
+
+    def get_embeddings(self, text: str, call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Get embeddings for the given text as a float32 vector.
+        """
+        call_site = call_site or infer_call_site()
+        return run_sync(self.async_api.get_embeddings(text, call_site=call_site))
+
+    def get_embeddings_batch(self, texts: Sequence[str], call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Get embeddings for many texts as an (n, dimensions) float32 array.
+        """
+        call_site = call_site or infer_call_site()
+        return run_sync(self.async_api.get_embeddings_batch(texts, call_site=call_site))
+
+    async def get_completion_async(self, system_content: str, user_content: str, call_site: Optional[str] = None) -> Optional[str]:
+        """
+        Awaitable variant of get_completion, usable from any event loop.
+        """
+        call_site = call_site or infer_call_site()
+        return await run_async(self.async_api.get_completion(system_content, user_content, call_site=call_site))
+
+    async def get_structured_output_async(
+        self,
+        schema_class: Type[T],
+        user_prompt: str,
+        system_prompt: str,
+        call_site: Optional[str] = None,
+    ) -> Optional[T]:
+        """
+        Awaitable variant of get_structured_output, usable from any event loop.
+        """
+        call_site = call_site or infer_call_site()
+        return await run_async(self.async_api.get_structured_output(schema_class, user_prompt, system_prompt, call_site=call_site))
+
+    async def get_embeddings_async(self, text: str, call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Awaitable variant of get_embeddings, usable from any event loop.
+        """
+        call_site = call_site or infer_call_site()
+        return await run_async(self.async_api.get_embeddings(text, call_site=call_site))
+
+    async def get_embeddings_batch_async(self, texts: Sequence[str], call_site: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Awaitable variant of get_embeddings_batch, usable from any event loop.
+        """
+        call_site = call_site or infer_call_site()
+        return await run_async(self.async_api.get_embeddings_batch(texts, call_site=call_site))
+
 if __name__ == "__main__":
     
     # Setup basic logging for the __main__ block, if not already set
@@ -157,6 +843,13 @@ if __name__ == "__main__":
     print(completion)
     print()
 
+    # Test get_completion_stream
+    print("OpenAI Completion Stream Test:")
+    for chunk in openai_api.get_completion_stream(system_content, "Name three cities in France."):
+        print(chunk, end="", flush=True)
+    print()
+    print()
+
     # Test get_structured_output
     from pydantic import BaseModel, Field
 
@@ -178,3 +871,10 @@ if __name__ == "__main__":
     print(f"Embedding vector length: {len(embeddings)}")
     print(f"First 5 values: {embeddings[:5]}")
     print()
+
+    # Test get_embeddings_batch
+    texts = ["First sentence to embed.", "Second sentence to embed.", "First sentence to embed."]
+    batch_embeddings = openai_api.get_embeddings_batch(texts)
+    print("OpenAI Batch Embeddings Test:")
+    print(f"Embedding matrix shape: {batch_embeddings.shape}")
+    print()
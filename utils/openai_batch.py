@@ -0,0 +1,284 @@
+import os
+import sys
+import json
+import queue
+import asyncio
+import logging
+import itertools
+import threading
+import contextvars
+import concurrent.futures
+from typing import Any, Callable, Optional, Sequence, TypeVar
+
+from openai import AsyncOpenAI
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.config import Config
+
+R = TypeVar('R')
+
+# Batch session the current pipeline submits its OpenAI requests to, if any.
+_active_session: contextvars.ContextVar[Optional["BatchSession"]] = contextvars.ContextVar("openai_batch_session", default=None)
+# Identifies which pipeline (worker) a request comes from.
+_worker_id: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("openai_batch_worker", default=None)
+# Worker ids are unique across sessions and the sub-tasks of run_concurrently().
+_worker_ids = itertools.count()
+
+# The Batch API accepts at most this many requests per input file.
+MAX_REQUESTS_PER_BATCH = 50000
+
+
+def current_batch_session() -> Optional["BatchSession"]:
+    return _active_session.get()
+
+
+class BatchError(RuntimeError):
+    """Raised to the caller when its request failed inside a batch job."""
+
+
+class BatchSession:
+    """
+    Runs many agent pipelines with their OpenAI requests sent through the
+    Batch API instead of the interactive endpoints.
+
+    Each pipeline runs in its own worker thread. Every OpenAI request it
+    makes is queued, and once every live pipeline is blocked on a queued
+    request the queue is written to JSONL, submitted as a batch job and
+    polled until it finishes; the results are then handed back to the
+    waiting pipelines, which continue to their next stage. A pipeline with
+    k sequential LLM stages therefore needs about k batch jobs in total,
+    however many startups are scored.
+    """
+
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        poll_interval: Optional[float] = None,
+        completion_window: str = "24h",
+    ):
+        self.client = client
+        self.poll_interval = poll_interval if poll_interval is not None else Config.OPENAI_BATCH_POLL_INTERVAL
+        self.completion_window = completion_window
+        self.logger = logging.getLogger(__name__)
+        self.batches_submitted = 0
+        self.requests_submitted = 0
+        # The fields below are only touched on the OpenAI API event loop.
+        self._active_workers = 0
+        self._pending: dict[str, tuple[str, dict[str, Any], list[asyncio.Future]]] = {}
+        self._waiting_workers: dict[int, int] = {}
+        self._flushing = False
+
+    def _get_client(self) -> AsyncOpenAI:
+        if self.client is None:
+            # Imported here to avoid a circular import with utils.openai_api.
+            from utils.openai_api import _resolve_api_key, get_shared_client
+            self.client = get_shared_client(_resolve_api_key(self.logger))
+        return self.client
+
+    async def submit(self, endpoint: str, body: dict[str, Any], request_key: str) -> dict[str, Any]:
+        """
+        Queue one request for the next batch job and wait for its response body.
+
+        Identical requests (same request_key) share one batch line.
+        """
+        future = asyncio.get_running_loop().create_future()
+        if request_key in self._pending:
+            self._pending[request_key][2].append(future)
+        else:
+            self._pending[request_key] = (endpoint, body, [future])
+        worker = _worker_id.get()
+        if worker is not None:
+            self._waiting_workers[worker] = self._waiting_workers.get(worker, 0) + 1
+        self._maybe_flush()
+        try:
+            return await future
+        finally:
+            if worker is not None:
+                self._waiting_workers[worker] -= 1
+                if not self._waiting_workers[worker]:
+                    del self._waiting_workers[worker]
+
+    def _worker_started(self) -> None:
+        self._active_workers += 1
+
+    def _worker_finished(self) -> None:
+        self._active_workers -= 1
+        self._maybe_flush()
+
+    def _add_workers(self, n: int) -> None:
+        self._active_workers += n
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if self._flushing or not self._pending:
+            return
+        if len(self._waiting_workers) < self._active_workers:
+            return
+        self._flushing = True
+        asyncio.ensure_future(self._flush())
+
+    async def _flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        try:
+            items = list(pending.items())
+            for start in range(0, len(items), MAX_REQUESTS_PER_BATCH):
+                await self._run_batch(items[start:start + MAX_REQUESTS_PER_BATCH])
+        except Exception as e:
+            self.logger.error(f"Batch job failed: {e}", exc_info=True)
+            for _, _, futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(BatchError(str(e)))
+        finally:
+            self._flushing = False
+            self._maybe_flush()
+
+    async def _run_batch(self, items: list[tuple[str, tuple[str, dict[str, Any], list[asyncio.Future]]]]) -> None:
+        client = self._get_client()
+        by_endpoint: dict[str, list] = {}
+        for item in items:
+            by_endpoint.setdefault(item[1][0], []).append(item)
+
+        # One batch job per endpoint, all submitted and polled concurrently.
+        await asyncio.gather(*[
+            self._run_endpoint_batch(client, endpoint, endpoint_items)
+            for endpoint, endpoint_items in by_endpoint.items()
+        ])
+
+    async def _run_endpoint_batch(self, client: AsyncOpenAI, endpoint: str, items: list) -> None:
+        lines = [
+            json.dumps({"custom_id": key, "method": "POST", "url": endpoint, "body": body}, ensure_ascii=False)
+            for key, (_, body, _) in items
+        ]
+        input_file = await client.files.create(
+            file=("batch_input.jsonl", ("\n".join(lines) + "\n").encode("utf-8")),
+            purpose="batch",
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=endpoint,
+            completion_window=self.completion_window,
+        )
+        self.batches_submitted += 1
+        self.requests_submitted += len(items)
+        self.logger.info(f"Submitted batch {batch.id} with {len(items)} {endpoint} requests")
+
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(self.poll_interval)
+            batch = await client.batches.retrieve(batch.id)
+        self.logger.info(f"Batch {batch.id} finished with status {batch.status}")
+
+        results: dict[str, dict[str, Any]] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await client.files.content(file_id)
+            for line in content.text.splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    results[record["custom_id"]] = record
+
+        for key, (_, _, futures) in items:
+            record = results.get(key)
+            response = (record or {}).get("response") or {}
+            if record is not None and response.get("status_code") == 200:
+                outcome, ok = response["body"], True
+            else:
+                error = (record or {}).get("error") or response.get("body") or f"batch status {batch.status}"
+                outcome, ok = BatchError(f"Request {key[:12]} failed in batch {batch.id}: {error}"), False
+            for future in futures:
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(outcome)
+                else:
+                    future.set_exception(outcome)
+
+    def run(self, jobs: Sequence[Callable[[], R]], max_workers: Optional[int] = None) -> list[Any]:
+        """
+        Run each job (a zero-argument pipeline function) with this session
+        active, returning results (or the raised exceptions) in input order.
+
+        Jobs run on up to max_workers worker threads, each taking the next
+        queued job as soon as its current one finishes.
+        """
+        # Imported here to avoid a circular import with utils.openai_api.
+        from utils.openai_api import _get_background_loop
+        loop = _get_background_loop()
+        queued = queue.Queue()
+        for index, job in enumerate(jobs):
+            queued.put((index, job))
+        results: list[Any] = [None] * len(jobs)
+        n_workers = max(1, min(max_workers or len(jobs), len(jobs)))
+
+        def work() -> None:
+            _active_session.set(self)
+            _worker_id.set(next(_worker_ids))
+            try:
+                while True:
+                    try:
+                        index, job = queued.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        results[index] = job()
+                    except Exception as e:
+                        self.logger.error(f"Batch pipeline {index} failed: {e}", exc_info=True)
+                        results[index] = e
+            finally:
+                loop.call_soon_threadsafe(self._worker_finished)
+
+        # Register every worker up front so the first flush waits for all of them.
+        for _ in range(n_workers):
+            loop.call_soon_threadsafe(self._worker_started)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=n_workers) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, work) for _ in range(n_workers)]
+            for future in futures:
+                future.result()
+        return results
+
+
+def run_concurrently(calls: Sequence[Callable[[], R]]) -> list[R]:
+    """
+    Run independent zero-argument calls on their own threads, each in a copy
+    of the current context, and return their results in input order. The
+    first exception raised by a call is re-raised once all have finished.
+
+    Inside a BatchSession pipeline the calls become workers of the session
+    in place of the calling pipeline, so the session waits for the requests
+    of all of them before submitting the next batch job.
+    """
+    session = current_batch_session()
+    if session is not None and _worker_id.get() is not None and len(calls) > 1:
+        # Imported here to avoid a circular import with utils.openai_api.
+        from utils.openai_api import _get_background_loop
+        loop = _get_background_loop()
+        remaining = len(calls)
+        lock = threading.Lock()
+
+        def run(call: Callable[[], R]) -> R:
+            nonlocal remaining
+            _worker_id.set(next(_worker_ids))
+            try:
+                return call()
+            finally:
+                with lock:
+                    remaining -= 1
+                    last = remaining == 0
+                # The last call to finish hands its slot back to the caller.
+                if not last:
+                    loop.call_soon_threadsafe(session._worker_finished)
+
+        # The caller waits on the calls instead of on requests, so the calls take over its slot.
+        loop.call_soon_threadsafe(session._add_workers, len(calls) - 1)
+    else:
+        def run(call: Callable[[], R]) -> R:
+            return call()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(calls))) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, run, call) for call in calls]
+        concurrent.futures.wait(futures)
+    return [future.result() for future in futures]
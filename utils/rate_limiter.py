@@ -0,0 +1,274 @@
+import time
+import random
+import asyncio
+import logging
+import weakref
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import openai
+
+from utils.config import Config
+
+R = TypeVar('R')
+
+# Errors worth retrying: rate limits, timeouts, dropped connections and 5xx responses.
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class RateLimitExceededError(Exception):
+    """
+    Raised when a request is still rate limited after every retry, or when
+    the account has run out of quota (which is not retried).
+    """
+
+    def __init__(self, model: str, message: str):
+        super().__init__(message)
+        self.model = model
+
+
+def _is_quota_error(error: Exception) -> bool:
+    # A 429 with code insufficient_quota will not clear by waiting.
+    return isinstance(error, openai.RateLimitError) and getattr(error, "code", None) == "insufficient_quota"
+
+
+def parse_rate_limits(spec: Optional[str]) -> dict[str, tuple[Optional[int], Optional[int]]]:
+    """
+    Parse a "model=rpm:tpm,model=rpm:tpm" string into {model: (rpm, tpm)}.
+
+    Either number may be left empty to leave that budget unlimited, e.g.
+    "gpt-4o=500:30000,gpt-4o-mini=:200000". The model "*" sets the default.
+    """
+    limits = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        model, _, budgets = item.partition("=")
+        rpm, _, tpm = budgets.partition(":")
+        limits[model.strip()] = (int(rpm) if rpm.strip() else None, int(tpm) if tpm.strip() else None)
+    return limits
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token estimate (about four characters per token).
+    """
+    return len(text) // 4 + 1
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class _Bucket:
+    """Token bucket refilled continuously at `per_minute / 60` units per second."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        return max(0.0, (min(amount, self.capacity) - self.available) * 60 / self.capacity)
+
+
+class _ModelBudget:
+    """
+    One model's buckets, shared by every event loop that sends requests.
+
+    asyncio locks are bound to the loop that first uses them, so each loop
+    queues on its own lock; the buckets themselves are guarded by a thread
+    lock because loops run on different threads.
+    """
+
+    def __init__(self, rpm: Optional[int], tpm: Optional[int]):
+        self.requests = _Bucket(rpm) if rpm else None
+        self.tokens = _Bucket(tpm) if tpm else None
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+        self._queues: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock] = weakref.WeakKeyDictionary()
+
+    def queue(self) -> asyncio.Lock:
+        """
+        Return the FIFO queue of the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if loop not in self._queues:
+                self._queues[loop] = asyncio.Lock()
+            return self._queues[loop]
+
+
+class RateLimitScheduler:
+    """
+    Schedules OpenAI requests within per-model request and token budgets.
+
+    Requests for a model queue up in FIFO order until both its
+    requests-per-minute and tokens-per-minute buckets can cover them.
+    Rate-limited or transiently failing calls are retried with jittered
+    exponential backoff, honouring the server's retry-after headers; a 429
+    also pauses the whole queue for that model. Running out of quota is not
+    retried.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[dict[str, tuple[Optional[int], Optional[int]]]] = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.limits = dict(limits or {})
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.logger = logging.getLogger(__name__)
+        self._budgets: dict[str, _ModelBudget] = {}
+        self._budgets_lock = threading.Lock()
+
+    def _budget(self, model: str) -> _ModelBudget:
+        with self._budgets_lock:
+            if model not in self._budgets:
+                rpm, tpm = self.limits.get(model, self.limits.get("*", (None, None)))
+                self._budgets[model] = _ModelBudget(rpm, tpm)
+            return self._budgets[model]
+
+    async def acquire(self, model: str, tokens: int) -> None:
+        """
+        Wait until the model's budgets can cover one request of `tokens` tokens.
+        """
+        budget = self._budget(model)
+        async with budget.queue():
+            while True:
+                with budget.lock:
+                    now = time.monotonic()
+                    wait = budget.paused_until - now
+                    if budget.requests is not None:
+                        budget.requests.refill(now)
+                        wait = max(wait, budget.requests.wait_time(1))
+                    if budget.tokens is not None:
+                        budget.tokens.refill(now)
+                        wait = max(wait, budget.tokens.wait_time(tokens))
+                    if wait <= 0:
+                        if budget.requests is not None:
+                            budget.requests.available -= 1
+                        if budget.tokens is not None:
+                            budget.tokens.available -= min(tokens, budget.tokens.capacity)
+                        return
+                self.logger.debug(f"Rate limit budget for {model} exhausted, waiting {wait:.2f}s")
+                await asyncio.sleep(wait)
+
+    def is_paused(self, model: str) -> bool:
+        """
+        Whether the model's queue is held back after a rate-limit error.
+        """
+        budget = self._budget(model)
+        with budget.lock:
+            return budget.paused_until > time.monotonic()
+
+    def record_usage(self, model: str, estimated_tokens: int, actual_tokens: int) -> None:
+        """
+        Correct the token bucket once the real usage of a request is known.
+        """
+        budget = self._budget(model)
+        with budget.lock:
+            if budget.tokens is not None:
+                budget.tokens.available -= actual_tokens - estimated_tokens
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def run(
+        self,
+        model: str,
+        estimated_tokens: int,
+        call: Callable[[], Awaitable[R]],
+        on_retry: Optional[Callable[[int, Exception], Any]] = None,
+        on_start: Optional[Callable[[], Any]] = None,
+    ) -> R:
+        """
+        Execute `call` within the model's budgets, retrying transient failures.
+
+        on_start() is called each time the request actually goes out, after
+        any queueing and backoff. Raises RateLimitExceededError once a 429
+        outlasts max_retries, and at once for an insufficient_quota 429.
+        """
+        attempt = 0
+        while True:
+            await self.acquire(model, estimated_tokens)
+            if on_start is not None:
+                on_start()
+            try:
+                result = await call()
+            except RETRYABLE_ERRORS as e:
+                if _is_quota_error(e):
+                    raise RateLimitExceededError(model, f"The OpenAI account has no quota left for {model}: {e}") from e
+                if attempt >= self.max_retries:
+                    if isinstance(e, openai.RateLimitError):
+                        raise RateLimitExceededError(model, f"{model} is still rate limited after {attempt} retries: {e}") from e
+                    raise
+                delay = self._backoff(attempt, e)
+                if isinstance(e, openai.RateLimitError):
+                    budget = self._budget(model)
+                    with budget.lock:
+                        budget.paused_until = max(budget.paused_until, time.monotonic() + delay)
+                attempt += 1
+                self.logger.warning(f"{type(e).__name__} for {model}, retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                if on_retry is not None:
+                    on_retry(attempt, e)
+                await asyncio.sleep(delay)
+                continue
+            usage = getattr(result, "usage", None)
+            if usage is not None and getattr(usage, "total_tokens", None) is not None:
+                self.record_usage(model, estimated_tokens, usage.total_tokens)
+            return result
+
+
+_default_scheduler: Optional[RateLimitScheduler] = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_default_scheduler() -> RateLimitScheduler:
+    """
+    Return the process-wide scheduler configured through OPENAI_RATE_LIMITS.
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RateLimitScheduler(
+                parse_rate_limits(Config.OPENAI_RATE_LIMITS),
+                max_retries=Config.OPENAI_MAX_RETRIES,
+            )
+        return _default_scheduler
@@ -0,0 +1,87 @@
+import logging
+import threading
+import contextlib
+import contextvars
+import concurrent.futures
+from typing import Any, Callable, Iterator, Optional
+
+from shared.types import SearchCallsDict
+
+# Broker of the analysis run executing in the current context, if any.
+_active_broker: contextvars.ContextVar[Optional["SearchBroker"]] = contextvars.ContextVar("search_broker", default=None)
+
+
+def current_search_broker() -> Optional["SearchBroker"]:
+    """
+    Return the SearchBroker active in the current context, if any.
+    """
+    return _active_broker.get()
+
+
+class SearchBroker:
+    """
+    In-memory search results shared by all nodes of one analysis run.
+
+    The first search for a normalised (query, num) runs it; every later or
+    concurrent search for the same key, from any node, gets the same
+    results. The broker counts searches requested, searches answered from
+    memory and calls that actually reached the search provider.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.searches = 0
+        self.deduplicated = 0
+        self.external_calls = 0
+        self._results: dict[tuple[str, int], concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def search(self, query: str, num_results: int, fetch: Callable[[], list[dict[str, Any]]]) -> list[dict[str, Any]]:
+        """
+        Return the results for the search, calling fetch() only if no node
+        of this run has searched it yet.
+        """
+        key = (" ".join(query.lower().split()), num_results)
+        with self._lock:
+            self.searches += 1
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                self._results[key] = future
+            else:
+                self.deduplicated += 1
+        if owner:
+            try:
+                future.set_result(fetch())
+            except Exception as e:
+                # Let a later search retry instead of replaying the failure.
+                with self._lock:
+                    self._results.pop(key, None)
+                future.set_exception(e)
+        else:
+            self.logger.debug(f"Search '{query}' served from this run's results")
+        return list(future.result())
+
+    def record_external_call(self) -> None:
+        with self._lock:
+            self.external_calls += 1
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["SearchBroker"]:
+        """
+        Make this broker handle the searches issued inside the block.
+        """
+        token = _active_broker.set(self)
+        try:
+            yield self
+        finally:
+            _active_broker.reset(token)
+
+    def stats(self) -> SearchCallsDict:
+        with self._lock:
+            return SearchCallsDict(
+                searches=self.searches,
+                deduplicated=self.deduplicated,
+                external_calls=self.external_calls,
+            )
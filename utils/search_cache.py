@@ -0,0 +1,116 @@
+import json
+import logging
+import threading
+import contextvars
+import concurrent.futures
+from typing import Any, Callable, Optional
+
+from utils.config import Config
+from utils.llm_cache import LLMCache
+
+
+class SearchCache:
+    """
+    Persistent cache for web search results with stale-while-revalidate.
+
+    Results are keyed by the normalised (engine, query, num) and stored in
+    an LLMCache database. Entries younger than ``ttl`` are served as is.
+    Entries older than that but within a further ``stale_ttl`` are still
+    served immediately, while a background refresh replaces them; older
+    entries are dropped and fetched again in the foreground.
+    """
+
+    def __init__(self, path: str, ttl: float, stale_ttl: float = 0.0, max_entries: Optional[int] = None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.cache = LLMCache(path, ttl=ttl + stale_ttl, max_entries=max_entries)
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="search-refresh")
+
+    @staticmethod
+    def make_key(engine: str, query: str, num: int) -> str:
+        normalised = " ".join(query.lower().split())
+        return LLMCache.make_key("search", engine, [{"role": "user", "content": normalised}], {"num": num})
+
+    def get_or_fetch(self, engine: str, query: str, num: int, fetch: Callable[[], list[dict[str, Any]]]) -> list[dict[str, Any]]:
+        """
+        Return the cached results for the search, calling fetch() on a miss
+        and refreshing stale entries in the background.
+        """
+        key = self.make_key(engine, query, num)
+        entry = self.cache.get_with_age(key)
+        if entry is not None:
+            value, age = entry
+            if age <= self.ttl:
+                self.hits += 1
+                self.logger.debug(f"Search '{query}' served from cache ({age:.0f}s old)")
+            else:
+                self.stale_hits += 1
+                self.logger.debug(f"Search '{query}' served stale ({age:.0f}s old), refreshing in background")
+                self._refresh(key, query, fetch)
+            return json.loads(value)
+
+        self.misses += 1
+        results = fetch()
+        self.cache.set(key, "search", json.dumps(results, ensure_ascii=False))
+        return results
+
+    def _refresh(self, key: str, query: str, fetch: Callable[[], list[dict[str, Any]]]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.refreshes += 1
+
+        def refresh() -> None:
+            try:
+                self.cache.set(key, "search", json.dumps(fetch(), ensure_ascii=False))
+            except Exception as e:
+                self.logger.warning(f"Background refresh of search '{query}' failed, keeping stale results: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        # Run in a copy of the caller's context so the refresh is counted by
+        # the analysis run's search broker.
+        self._executor.submit(contextvars.copy_context().run, refresh)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return hit/stale/miss counters and the number of background refreshes.
+        """
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "entries": self.cache.stats()["entries"],
+        }
+
+
+_default_search_cache: Optional[SearchCache] = None
+_default_search_cache_lock = threading.Lock()
+
+
+def get_default_search_cache() -> Optional[SearchCache]:
+    """
+    Return the process-wide search cache configured through SEARCH_CACHE_PATH, if any.
+    """
+    global _default_search_cache
+    if not Config.SEARCH_CACHE_PATH:
+        return None
+    with _default_search_cache_lock:
+        if _default_search_cache is None:
+            _default_search_cache = SearchCache(
+                Config.SEARCH_CACHE_PATH,
+                ttl=Config.SEARCH_CACHE_TTL,
+                stale_ttl=Config.SEARCH_CACHE_STALE_TTL,
+                max_entries=Config.SEARCH_CACHE_MAX_ENTRIES,
+            )
+        return _default_search_cache
@@ -0,0 +1,129 @@
+import re
+from typing import Any, Iterable, Optional
+
+from utils.config import Config
+from utils.rate_limiter import estimate_tokens
+
+# Related pages kept per search result
+MAX_SITELINKS = 3
+
+
+class SearchResult:
+    """
+    One web search hit, normalised once from the provider's result dict.
+
+    sitelinks holds (title, snippet) pairs of the related pages the provider
+    listed under the hit, at most MAX_SITELINKS of them.
+    """
+
+    __slots__ = ("title", "snippet", "source", "date", "link", "sitelinks")
+
+    def __init__(
+        self,
+        title: str = "",
+        snippet: str = "",
+        source: str = "",
+        date: str = "",
+        link: str = "",
+        sitelinks: tuple[tuple[str, str], ...] = (),
+    ):
+        self.title = title
+        self.snippet = snippet
+        self.source = source
+        self.date = date
+        self.link = link
+        self.sitelinks = sitelinks
+
+    @classmethod
+    def from_serpapi(cls, result: dict[str, Any]) -> "SearchResult":
+        """
+        Build a record from a SerpAPI organic result, collapsing whitespace.
+        """
+        def clean(item: dict[str, Any], key: str) -> str:
+            return " ".join(str(item.get(key) or "").split())
+
+        sitelinks = result.get("sitelinks")
+        expanded = sitelinks.get("expanded") if isinstance(sitelinks, dict) else None
+        return cls(
+            title=clean(result, "title"),
+            snippet=clean(result, "snippet"),
+            source=clean(result, "source"),
+            date=clean(result, "date"),
+            link=str(result.get("link") or "").strip(),
+            sitelinks=tuple(
+                (clean(link, "title"), clean(link, "snippet"))
+                for link in expanded or []
+                if isinstance(link, dict) and link.get("snippet")
+            )[:MAX_SITELINKS],
+        )
+
+    def format(self, template: str) -> str:
+        """
+        Fill template's {title}, {snippet}, {source}, {date}, {link} and
+        {related} fields; {related} lists the sitelinks as "Related pages:".
+        """
+        related = ""
+        if self.sitelinks:
+            related = "\nRelated pages:\n" + "\n".join(f"- {title}: {snippet}" for title, snippet in self.sitelinks)
+        return template.format(
+            title=self.title,
+            snippet=self.snippet,
+            source=self.source,
+            date=self.date,
+            link=self.link,
+            related=related,
+        )
+
+    def __repr__(self) -> str:
+        return f"SearchResult(title={self.title!r}, source={self.source!r}, date={self.date!r}, link={self.link!r})"
+
+
+def to_search_results(results: Optional[Iterable[dict[str, Any]]]) -> list[SearchResult]:
+    """
+    Normalise a list of SerpAPI organic results.
+    """
+    return [SearchResult.from_serpapi(result) for result in results or [] if isinstance(result, dict)]
+
+
+def _shingles(text: str, size: int = 3) -> set[str]:
+    # Character shingles work for Japanese as well as English snippets.
+    text = re.sub(r"[\W_]+", " ", text.lower()).strip()
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def assemble_evidence(
+    results: Iterable[SearchResult],
+    template: str,
+    token_budget: Optional[int] = None,
+    similarity_threshold: Optional[float] = None,
+) -> str:
+    """
+    Format search results into an evidence block for a prompt.
+
+    Results are taken in order; those without a snippet, or whose snippet
+    is a near duplicate (Jaccard similarity of character shingles at or
+    above similarity_threshold) of one already included, are skipped.
+    Assembly stops before the block would exceed token_budget
+    (EVIDENCE_TOKEN_BUDGET by default).
+    """
+    token_budget = Config.EVIDENCE_TOKEN_BUDGET if token_budget is None else token_budget
+    similarity_threshold = Config.EVIDENCE_SIMILARITY_THRESHOLD if similarity_threshold is None else similarity_threshold
+    parts = []
+    used = 0
+    included: list[set[str]] = []
+    for result in results:
+        if not result.snippet:
+            continue
+        shingles = _shingles(result.snippet)
+        if any(len(shingles & seen) / len(shingles | seen) >= similarity_threshold for seen in included if shingles | seen):
+            continue
+        entry = result.format(template)
+        cost = estimate_tokens(entry)
+        if used + cost > token_budget:
+            break
+        parts.append(entry)
+        included.append(shingles)
+        used += cost
+    return "".join(parts)
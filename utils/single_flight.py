@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from typing import Any, Awaitable, Callable, TypeVar
+
+R = TypeVar('R')
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent requests into a single in-flight call.
+
+    The first caller for a key starts the call; callers arriving while it is
+    still running await the same result (or exception) instead of issuing
+    their own. Once the call finishes the key is released, so this only
+    deduplicates overlapping requests and does not cache anything.
+    Callers may run on different event loops: the call runs on the loop of
+    the caller that started it, and callers on other loops wait for it
+    through a thread-safe future.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.calls = 0
+        self.deduplicated = 0
+        self._inflight: dict[str, tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._lock = threading.Lock()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[R]]) -> tuple[R, bool]:
+        """
+        Run fn() unless an identical call is in flight.
+
+        Returns the result and whether it was shared with another caller.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._inflight.get(key)
+            if entry is None:
+                self.calls += 1
+                future = asyncio.ensure_future(fn())
+                self._inflight[key] = (loop, future)
+                future.add_done_callback(lambda done: self._release(key, done))
+            else:
+                self.deduplicated += 1
+                owner, future = entry
+
+        # Shield the shared call so one caller being cancelled does not
+        # cancel it for everyone else waiting on it.
+        if entry is None:
+            return await asyncio.shield(future), False
+        self.logger.debug(f"Joining in-flight request {key[:12]}")
+        if owner is loop:
+            return await asyncio.shield(future), True
+        return await asyncio.wrap_future(self._bridge(owner, future)), True
+
+    def _release(self, key: str, future: asyncio.Future) -> None:
+        with self._lock:
+            if self._inflight.get(key, (None, None))[1] is future:
+                del self._inflight[key]
+
+    @staticmethod
+    def _bridge(owner: asyncio.AbstractEventLoop, future: asyncio.Future) -> concurrent.futures.Future:
+        """
+        Mirror the outcome of a future owned by another loop into a
+        thread-safe future. Cancelling the mirror leaves the call running.
+        """
+        mirror: concurrent.futures.Future = concurrent.futures.Future()
+
+        def copy(done: asyncio.Future) -> None:
+            if mirror.cancelled():
+                return
+            if done.cancelled():
+                mirror.cancel()
+            elif done.exception() is not None:
+                mirror.set_exception(done.exception())
+            else:
+                mirror.set_result(done.result())
+
+        owner.call_soon_threadsafe(future.add_done_callback, copy)
+        return mirror
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return how many calls were issued and how many were deduplicated.
+        """
+        return {
+            "calls": self.calls,
+            "deduplicated": self.deduplicated,
+            "in_flight": len(self._inflight),
+        }
+
+
+_default_single_flight = SingleFlight()
+
+
+def get_default_single_flight() -> SingleFlight:
+    """
+    Return the process-wide SingleFlight shared by all OpenAI API clients.
+    """
+    return _default_single_flight